@@ -0,0 +1,14 @@
+"""Stamp updated_at on events, applications and organizations written before delta sync
+
+Delta-synced caches only see these documents on a full load until they carry updated_at.
+"""
+from services import sync
+
+COLLECTIONS = sync.SYNCED_COLLECTIONS
+
+
+def migrate(db, writer, snapshot):
+    if 'updated_at' in (snapshot.to_dict() or {}):
+        return False
+    writer.update(snapshot.reference, sync.stamped({}))
+    return True
@@ -0,0 +1,17 @@
+"""Reserve emails/{email} for volunteers and organizations created before reservations
+
+Once this has run, VOL_LINK_EMAIL_LEGACY_FALLBACK=0 turns off the login email query.
+"""
+from services import email_registry
+
+COLLECTIONS = ('volunteers', 'organizations')
+ID_FIELDS = {collection: id_field for collection, id_field in email_registry.ACCOUNT_TYPES.values()}
+
+
+def migrate(db, writer, snapshot):
+    email = (snapshot.to_dict() or {}).get('email')
+    if not email:
+        return False
+    # merge keeps a reservation's other account type, e.g. an org sharing a volunteer's email
+    writer.set(email_registry.email_ref(db, email), {ID_FIELDS[snapshot.reference.parent.id]: snapshot.id}, merge=True)
+    return True
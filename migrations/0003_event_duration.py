@@ -0,0 +1,12 @@
+"""Give events created before durations existed an explicit duration_hours"""
+from services import sync
+from services.models import DEFAULT_DURATION_HOURS
+
+COLLECTIONS = ('events',)
+
+
+def migrate(db, writer, snapshot):
+    if (snapshot.to_dict() or {}).get('duration_hours'):
+        return False
+    writer.update(snapshot.reference, sync.stamped({'duration_hours': DEFAULT_DURATION_HOURS}))
+    return True
@@ -0,0 +1,29 @@
+"""Copy event snapshots onto applications created before snapshots existed
+
+My Events and the schedule-conflict index then need no event reads for them. Runs after
+0003 so the snapshots carry each event's duration.
+"""
+from services import event_snapshots, parallel, sync
+
+COLLECTIONS = ('applications',)
+
+
+def migrate_page(db, writer, page):
+    """Read every event the page needs with batched get_all calls, then snapshot each application"""
+    due = []
+    for snapshot in page:
+        data = snapshot.to_dict() or {}
+        if 'version' not in (data.get(event_snapshots.SNAPSHOT_FIELD) or {}) and data.get('event_id'):
+            due.append((snapshot, data['event_id']))
+    events = parallel.get_documents(db, 'events', [event_id for _, event_id in due])
+    migrated = 0
+    for snapshot, event_id in due:
+        event = events.get(event_id)
+        if event is None:
+            continue
+        event_data = event.to_dict() or {}
+        writer.update(snapshot.reference, sync.stamped({
+            event_snapshots.SNAPSHOT_FIELD: event_snapshots.snapshot_from_data(event_data, version=event_data.get('updated_at')),
+        }))
+        migrated += 1
+    return migrated
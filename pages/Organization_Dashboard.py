@@ -1,8 +1,19 @@
 import streamlit as st
+import heapq
 from datetime import datetime, date, time
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+import pandas as pd
+from services import metrics, firestore_instrumentation, profiling, aio, archive, async_data, auth_token, certificates, checkin, email_registry, event_changes, event_import, hours, parallel, recurrence, session_store, sync
+from services.async_mail_service import AsyncEmailService
+from services.models import Event, Application, Notification, Organization, to_naive_utc
+
+metrics.start_rerun('Organization_Dashboard')
+profiling.start_if_requested('Organization_Dashboard')
+# Log back in from the signed token cookie, else from a session saved by another replica
+if not auth_token.restore():
+    session_store.restore()
 
 # Get the absolute path to the config directory
 config_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
@@ -35,13 +46,13 @@ if not firebase_admin._apps:
 # Get Firestore database instance
 try:
     db = firestore.client()
+    firestore_instrumentation.install()
+    # Async client on the shared event loop, for writes and emails that need not hold this thread
+    adb = aio.async_db()
 except Exception as e:
     st.error(f"Error connecting to Firestore: {str(e)}")
     st.stop()
 
-# Define minimum datetime for sorting
-MIN_DATETIME = datetime(2000, 1, 1)  # Use a reasonable minimum date instead of datetime.min
-
 # Helper Functions
 def get_org_name(org_id):
     """Helper function to get organization name from org_id"""
@@ -49,33 +60,20 @@ def get_org_name(org_id):
         if not org_id:
             return "Unknown Organization"
         
-        org_ref = db.collection('organizations').document(org_id).get()
-        if org_ref.exists:
-            return org_ref.to_dict().get('name', 'Unknown Organization')
-        return "Unknown Organization"
+        org = sync.shared_cache(db, 'organizations').get(org_id)
+        return (org.name if org else None) or "Unknown Organization"
     except Exception as e:
         st.error(f"Error fetching organization name: {str(e)}")
         return "Unknown Organization"
 
-def get_event_date(event):
-    """Helper function to get event date for sorting"""
-    event_dict = event.to_dict()
-    event_date = event_dict.get('date')
-    if isinstance(event_date, datetime):
-        # Convert to naive datetime if it has timezone info
-        if event_date.tzinfo is not None:
-            event_date = event_date.replace(tzinfo=None)
-        return event_date
-    return MIN_DATETIME
-
 def format_date(date_obj):
     """Helper function to format dates consistently"""
     if date_obj is None:
         return "Date not set"
     if isinstance(date_obj, datetime):
-        # Convert to naive datetime if it has timezone info
+        # Model fields are already naive UTC; only raw Firestore values need converting
         if date_obj.tzinfo is not None:
-            date_obj = date_obj.replace(tzinfo=None)
+            date_obj = to_naive_utc(date_obj)
         return date_obj.strftime("%d-%m-%Y")
     return str(date_obj)
 
@@ -207,7 +205,7 @@ st.markdown("""
         <h1 style="color: #262626; font-size: 1.8rem; font-weight: 600;">👋 Welcome, {}</h1>
         <p style="color: #8e8e8e; font-size: 1rem;">Manage your events and connect with volunteers!</p>
     </div>
-""".format(get_org_name(st.session_state.get('org_id', ''))), unsafe_allow_html=True)
+""".format(st.session_state.get('org_name') or get_org_name(st.session_state.get('org_id', ''))), unsafe_allow_html=True)
 
 # Initialize current page in session state if not exists
 if 'current_page' not in st.session_state:
@@ -243,8 +241,10 @@ with col5:
 
 with col_logout:
     if st.button("🚪 Logout", use_container_width=True):
+        session_store.logout()
         for key in list(st.session_state.keys()):
             del st.session_state[key]
+        auth_token.logout()
         st.switch_page("pages/Organization_Login.py")
 
 st.markdown("<br>", unsafe_allow_html=True)
@@ -257,16 +257,18 @@ if 'org_id' not in st.session_state:
     st.error("⚠️ Please log in first!")
     st.switch_page("pages/Organization_Login.py")
 
+metrics.start_branch(current_page)
+
 if current_page == 'dashboard':
     try:
         # Get organization's events
         events_ref = db.collection('events').where('org_id', '==', st.session_state['org_id']).stream()
-        events_list = list(events_ref)
+        events_list = [Event.from_snapshot(snapshot) for snapshot in events_ref]
         
         # Calculate statistics
         total_events = len(events_list)
-        active_events = sum(1 for event in events_list if event.to_dict().get('status') == 'active')
-        total_applications = sum(len(event.to_dict().get('applications', [])) for event in events_list)
+        active_events = sum(1 for event in events_list if event.status == 'active')
+        total_applications = sum(event.applications_count for event in events_list)
         
         # Display statistics
         st.markdown("### 📊 Overview")
@@ -277,6 +279,68 @@ if current_page == 'dashboard':
             st.metric("Total Applications", total_applications)
         with col3:
             st.metric("Active Events", active_events)
+        
+        # Hours come from the org's running totals document: one read however many volunteers served
+        totals_doc = hours.org_totals_ref(db, st.session_state['org_id']).get()
+        totals = totals_doc.to_dict() if totals_doc.exists else {}
+        st.markdown("### ⏱️ Volunteer Hours")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Total Hours", f"{totals.get('total_hours', 0):g}")
+        with col2:
+            st.metric("Volunteer Shifts", totals.get('events', 0))
+        top_volunteers = hours.leaderboard(totals)
+        if top_volunteers:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### 🏆 Top Volunteers")
+                st.dataframe(pd.DataFrame(top_volunteers, columns=['Volunteer', 'Hours']), hide_index=True, use_container_width=True)
+            with col2:
+                st.markdown("#### 🎯 Hours by Skill")
+                st.dataframe(pd.DataFrame(hours.leaderboard(totals, 'by_skill', 'skill_names'), columns=['Skill', 'Hours']),
+                             hide_index=True, use_container_width=True)
+        
+        with st.expander("🎓 Issue Certificates"):
+            scope = st.radio("Certificates for", ["One event", "Date range"], horizontal=True, key="certificate_scope")
+            certificate_event = None
+            range_start = range_end = None
+            if scope == "One event":
+                dated_events = sorted(events_list, key=lambda event: event.sort_key, reverse=True)
+                certificate_event = st.selectbox("🎯 Event", dated_events,
+                                                 format_func=lambda event: f"{event.title} ({format_date(event.date)})",
+                                                 key="certificate_event")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    range_start = st.date_input("📅 From", key="certificate_from")
+                with col2:
+                    range_end = st.date_input("📅 To", key="certificate_to")
+            email_certificates = st.checkbox("📧 Email each volunteer their certificate", key="certificate_email")
+            if st.button("🎓 Generate Certificates", disabled=scope == "One event" and certificate_event is None):
+                with st.spinner("Generating certificates..."):
+                    to_issue = certificates.collect(
+                        db, st.session_state['org_id'], st.session_state.get('org_name') or '',
+                        event_id=certificate_event.id if certificate_event else None,
+                        start=datetime.combine(range_start, time.min) if range_start else None,
+                        end=datetime.combine(range_end, time.max) if range_end else None,
+                    )
+                    if not to_issue:
+                        st.session_state.certificates_zip = None
+                        st.info("ℹ️ No credited hours found; confirm attendance on the check-in page first.")
+                    else:
+                        zip_bytes, rendered = certificates.build_zip(to_issue)
+                        st.session_state.certificates_zip = (zip_bytes, len(rendered))
+                        if email_certificates:
+                            recipients = [(certificate.volunteer_email, certificate.volunteer_name, certificate.filename, pdf)
+                                          for certificate, pdf in rendered if certificate.volunteer_email]
+                            aio.submit(AsyncEmailService().send_certificates(recipients, st.session_state.get('org_name')),
+                                       'certificate emails')
+                            st.success(f"✅ Emailing {len(recipients)} certificates.")
+            # Kept across reruns so the download button survives its own click
+            if st.session_state.get('certificates_zip'):
+                zip_bytes, issued = st.session_state.certificates_zip
+                st.download_button(f"📥 Download {issued} Certificates (ZIP)", zip_bytes,
+                                   file_name="certificates.zip", mime="application/zip")
             
         # Display recent events
         st.markdown("### 📅 Recent Events")
@@ -284,21 +348,19 @@ if current_page == 'dashboard':
             st.info("🎯 No events created yet. Create your first event in the Events section!")
         else:
             # Sort events by date
-            sorted_events = sorted(events_list, key=get_event_date, reverse=True)[:5]  # Get 5 most recent events
+            sorted_events = heapq.nlargest(5, events_list, key=lambda event: event.sort_key)  # Get 5 most recent events
             
             for event in sorted_events:
-                event_data = event.to_dict()
-                event_date = event_data.get('date')
-                formatted_date = format_date(event_date)
+                formatted_date = format_date(event.date)
                 
                 st.markdown(f"""
                     <div class="event-card">
-                        <div class="event-title">🎯 {event_data.get('title', 'Event Title')}</div>
+                        <div class="event-title">🎯 {event.title}</div>
                         <div class="event-details">
                             <p>📅 Date: {formatted_date}</p>
-                            <p>📍 Location: {event_data.get('location', 'Location TBD')}</p>
-                            <p>👥 Applications: {len(event_data.get('applications', []))}</p>
-                            <p>✨ Status: {event_data.get('status', 'active').title()}</p>
+                            <p>📍 Location: {event.location}</p>
+                            <p>👥 Applications: {event.applications_count}</p>
+                            <p>✨ Status: {event.status.title()}</p>
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
@@ -316,9 +378,54 @@ if current_page == 'dashboard':
 elif current_page == 'events':
     st.subheader("📅 Events")
     
-    # Add new event button
-    if st.button("➕ Create New Event"):
-        st.session_state.show_event_form = True
+    # Add new event buttons
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("➕ Create New Event"):
+            st.session_state.show_event_form = True
+    with col2:
+        if st.button("📥 Import Events"):
+            st.session_state.show_import_form = True
+    
+    # Bulk import from a spreadsheet
+    if st.session_state.get('show_import_form', False):
+        st.markdown("### 📥 Import Events from CSV or Excel")
+        st.caption(f"Required columns: {', '.join(event_import.REQUIRED_COLUMNS)}. "
+                   f"Optional: {', '.join(event_import.OPTIONAL_COLUMNS)} (separate skills with ';').")
+        st.download_button("📄 Download Template", event_import.TEMPLATE_CSV,
+                           file_name="events_template.csv", mime="text/csv")
+        # Shown after the rerun that clears the uploader
+        import_result = st.session_state.pop('import_result', None)
+        if import_result:
+            created, failed_rows = import_result
+            if created:
+                st.success(f"✅ Imported {created} events!")
+            if failed_rows:
+                # Rows skipped as already imported or duplicated are listed with those that failed
+                st.warning(f"⚠️ {len(failed_rows)} rows were not imported; see the reason for each below.")
+                st.dataframe(pd.DataFrame(failed_rows), hide_index=True, use_container_width=True)
+        # A fresh key after each import empties the uploader, so the import button is not offered twice
+        uploaded_file = st.file_uploader("📤 Upload events file", type=['csv', 'xlsx'],
+                                         key=f"import_events_file_{st.session_state.get('import_round', 0)}")
+        if uploaded_file is not None:
+            try:
+                valid_rows, row_errors = event_import.validate(event_import.read_upload(uploaded_file))
+                st.info(f"✅ {len(valid_rows)} events ready to import, ❌ {len(row_errors)} row errors")
+                if row_errors:
+                    st.dataframe(pd.DataFrame(row_errors), hide_index=True, use_container_width=True)
+                if len(valid_rows) and st.button(f"💾 Import {len(valid_rows)} Events", key="import_events_submit"):
+                    events_to_create = event_import.build_events(valid_rows, st.session_state['org_id'], st.session_state['org_name'])
+                    with st.spinner("Importing events..."):
+                        st.session_state.import_result = event_import.import_events(db, events_to_create)
+                    st.session_state.import_round = st.session_state.get('import_round', 0) + 1
+                    st.experimental_rerun()
+            except event_import.EventImportError as e:
+                st.error(f"❌ {str(e)}")
+            except Exception as e:
+                st.error(f"❌ Error importing events: {str(e)}")
+        if st.button("✖️ Close Import"):
+            st.session_state.show_import_form = False
+            st.experimental_rerun()
     
     # Event creation form
     if st.session_state.get('show_event_form', False):
@@ -332,6 +439,7 @@ elif current_page == 'events':
             with col2:
                 event_time = st.time_input("⏰ Time")
             location = st.text_input("📍 Location")
+            duration_hours = st.number_input("⏳ Duration (hours)", min_value=0.5, value=2.0, step=0.5)
             required_volunteers = st.number_input("👥 Required Volunteers", min_value=1, value=1)
             skills_required = st.multiselect(
                 "🎯 Required Skills",
@@ -357,6 +465,15 @@ elif current_page == 'events':
             
             custom_skills = st.text_input("✨ Custom Skills (Optional)", help="Enter additional required skills separated by commas")
             
+            # Recurrence: the series is expanded into events a few weeks ahead and rolled forward by the scheduler
+            col1, col2 = st.columns(2)
+            with col1:
+                repeat = st.selectbox("🔁 Repeats", ["Does not repeat", "Weekly", "Monthly"])
+                repeat_until = st.date_input("🏁 Repeat Until (Optional)", value=None)
+            with col2:
+                repeat_interval = st.number_input("↔️ Every N weeks/months", min_value=1, value=1)
+                repeat_count = st.number_input("🔢 Number of Occurrences (0 = no limit)", min_value=0, value=0)
+            
             if st.form_submit_button("💾 Create Event"):
                 try:
                     # Combine date and time into datetime (ensure it's timezone naive)
@@ -373,6 +490,7 @@ elif current_page == 'events':
                         'title': title,
                         'description': description,
                         'date': event_datetime,  # This will be timezone naive
+                        'duration_hours': duration_hours,
                         'location': location,
                         'required_volunteers': required_volunteers,
                         'skills_required': all_skills,
@@ -383,8 +501,18 @@ elif current_page == 'events':
                         'created_at': datetime.now()  # This will be timezone naive
                     }
                     
-                    db.collection('events').add(event_data)
-                    st.success("✅ Event created successfully!")
+                    if repeat == "Does not repeat":
+                        db.collection('events').add(sync.stamped(event_data))
+                        st.success("✅ Event created successfully!")
+                    else:
+                        rule = recurrence.make_rule(
+                            repeat.lower(),
+                            interval=repeat_interval,
+                            until=datetime.combine(repeat_until, time.max) if repeat_until else None,
+                            count=repeat_count or None
+                        )
+                        _, created = recurrence.create_series(db, event_data, event_datetime, rule)
+                        st.success(f"✅ Recurring event created! {created} upcoming events scheduled.")
                     st.session_state.show_event_form = False
                     st.experimental_rerun()
                 except Exception as e:
@@ -393,55 +521,177 @@ elif current_page == 'events':
     try:
         # Get organization's events
         events_ref = db.collection('events').where('org_id', '==', st.session_state['org_id']).stream()
-        events_list = list(events_ref)
+        events_list = [Event.from_snapshot(snapshot) for snapshot in events_ref]
         
         if not events_list:
             st.info("🎯 No events created yet. Create your first event!")
         else:
             # Sort events by date
-            sorted_events = sorted(events_list, key=get_event_date, reverse=True)
+            sorted_events = sorted(events_list, key=lambda event: event.sort_key, reverse=True)
             
             for event in sorted_events:
-                event_data = event.to_dict()
-                event_date = event_data.get('date')
-                formatted_date = format_date(event_date)
+                formatted_date = format_date(event.date)
                 
                 st.markdown(f"""
                     <div class="event-card">
-                        <div class="event-title">🎯 {event_data.get('title', 'Event Title')}</div>
+                        <div class="event-title">🎯 {event.title}</div>
                         <div class="event-details">
                             <p>📅 Date: {formatted_date}</p>
-                            <p>📍 Location: {event_data.get('location', 'Location TBD')}</p>
-                            <p>📝 Description: {event_data.get('description', 'No description available.')}</p>
-                            <p>👥 Required Volunteers: {event_data.get('required_volunteers', 'Not specified')}</p>
-                            <p>⭐ Skills Required: {', '.join(event_data.get('skills_required', ['None specified']))}</p>
-                            <p>👥 Applications: {len(event_data.get('applications', []))}</p>
-                            <p>✨ Status: {event_data.get('status', 'active').title()}</p>
+                            <p>📍 Location: {event.location}</p>
+                            <p>📝 Description: {event.description}</p>
+                            <p>👥 Required Volunteers: {event.required_volunteers}</p>
+                            <p>⭐ Skills Required: {', '.join(event.skills_required) or 'None specified'}</p>
+                            <p>👥 Applications: {event.applications_count}</p>
+                            <p>✨ Status: {event.status.title()}</p>
+                            {'<p>🔁 Part of a recurring series</p>' if event.series_id else ''}
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
                 
-                col1, col2 = st.columns(2)
+                # Completed and cancelled events are closed and can no longer be changed
+                event_open = event.status not in ('completed', 'cancelled')
+                col1, col2, col3, col4, col5 = st.columns(5)
                 with col1:
                     if st.button("👥 View Applications", key=f"view_apps_{event.id}"):
                         st.session_state.current_page = 'applications'
                         st.session_state.selected_event = event.id
                         st.experimental_rerun()
                 
+                with col5:
+                    if event.status != 'cancelled' and st.button("📋 Check-in", key=f"checkin_{event.id}"):
+                        st.session_state.current_page = 'checkin'
+                        st.session_state.checkin_event = event.id
+                        st.session_state.pop('checkin_roster', None)
+                        st.experimental_rerun()
+                
                 with col2:
-                    current_status = event_data.get('status', 'active')
+                    current_status = event.status
                     new_status = 'inactive' if current_status == 'active' else 'active'
-                    if st.button(f"{'🔴' if current_status == 'active' else '🟢'} Mark as {new_status.title()}", key=f"status_{event.id}"):
+                    if event_open and st.button(f"{'🔴' if current_status == 'active' else '🟢'} Mark as {new_status.title()}", key=f"status_{event.id}"):
                         try:
-                            db.collection('events').document(event.id).update({
+                            db.collection('events').document(event.id).update(sync.stamped({
                                 'status': new_status
-                            })
+                            }))
                             st.success(f"✅ Event marked as {new_status}!")
                             st.experimental_rerun()
                         except Exception as e:
                             st.error(f"❌ Error updating event status: {str(e)}")
                 
+                with col3:
+                    if event_open and st.button("✏️ Edit", key=f"edit_{event.id}"):
+                        st.session_state.editing_event = event.id
+                        st.session_state.cancelling_event = None
+                
+                with col4:
+                    if event_open and st.button("🚫 Cancel Event", key=f"cancel_{event.id}"):
+                        st.session_state.cancelling_event = event.id
+                        st.session_state.editing_event = None
+                
+                if event_open and st.session_state.get('editing_event') == event.id:
+                    with st.form(f"edit_event_form_{event.id}"):
+                        st.markdown("### ✏️ Edit Event")
+                        edit_title = st.text_input("📝 Event Title", value=event.title)
+                        edit_description = st.text_area("📄 Description", value=event.description)
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            edit_date = st.date_input("📅 Date", value=event.date.date() if event.date else None)
+                        with col2:
+                            edit_time = st.time_input("⏰ Time", value=event.date.time() if event.date else None)
+                        edit_location = st.text_input("📍 Location", value=event.location)
+                        edit_duration = st.number_input("⏳ Duration (hours)", min_value=0.5, value=float(event.duration_hours), step=0.5)
+                        edit_volunteers = st.number_input(
+                            "👥 Required Volunteers", min_value=1,
+                            value=event.required_volunteers if isinstance(event.required_volunteers, int) else 1
+                        )
+                        edit_scope = "This event"
+                        if event.series_id:
+                            edit_scope = st.radio("🔁 Apply changes to", ["This event", "This and following events"], horizontal=True)
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            save_edit = st.form_submit_button("💾 Save Changes")
+                        with col2:
+                            discard_edit = st.form_submit_button("✖️ Discard")
+                    if discard_edit:
+                        st.session_state.editing_event = None
+                        st.experimental_rerun()
+                    if save_edit:
+                        try:
+                            changes = event_changes.changed_fields(
+                                {'title': event.title, 'description': event.description, 'date': event.date,
+                                 'duration_hours': event.duration_hours, 'location': event.location,
+                                 'required_volunteers': event.required_volunteers},
+                                {'title': edit_title, 'description': edit_description,
+                                 'date': datetime.combine(edit_date, edit_time) if edit_date and edit_time else event.date,
+                                 'duration_hours': edit_duration, 'location': edit_location, 'required_volunteers': edit_volunteers}
+                            )
+                            if not changes:
+                                st.info("ℹ️ Nothing changed.")
+                            elif edit_scope != "This event" and 'date' in changes:
+                                st.warning("⚠️ A new date applies to one occurrence; choose \"This event\" to move it.")
+                            else:
+                                with st.spinner("Updating event and notifying applicants..."):
+                                    if edit_scope == "This event":
+                                        notified, recipients = event_changes.edit_event(db, event.id, event.title, changes)
+                                    else:
+                                        _, notified, recipients = recurrence.update_series(db, event.series_id, changes, start=event.date)
+                                updated_event = {**event.email_data(), **{field: changes[field] for field in ('title', 'date', 'location') if field in changes}}
+                                # One SMTP session for every applicant, sent without holding up the page
+                                aio.submit(AsyncEmailService().send_event_update_notifications(
+                                    recipients, updated_event, st.session_state.get('org_name'),
+                                    [(event_changes.EDITABLE_FIELDS[field], format_date(value) if field == 'date' else value)
+                                     for field, value in changes.items()]
+                                ), 'event update emails')
+                                st.session_state.editing_event = None
+                                st.success(f"✅ Event updated! {notified} applicants notified.")
+                                st.experimental_rerun()
+                        except Exception as e:
+                            st.error(f"❌ Error updating event: {str(e)}")
+                
+                if event_open and st.session_state.get('cancelling_event') == event.id:
+                    st.warning(f"⚠️ Cancel {event.title}? Every pending and accepted applicant will be notified by email.")
+                    cancel_reason = st.text_input("📝 Reason (Optional)", key=f"cancel_reason_{event.id}")
+                    cancel_scope = "This event"
+                    if event.series_id:
+                        cancel_scope = st.radio("🔁 Cancel", ["This event", "This and following events"],
+                                                horizontal=True, key=f"cancel_scope_{event.id}")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.button("🚫 Confirm Cancellation", key=f"confirm_cancel_{event.id}", type="primary"):
+                            try:
+                                with st.spinner("Cancelling event and notifying applicants..."):
+                                    if cancel_scope == "This event":
+                                        cancelled, recipients = event_changes.cancel_event(db, event.id, event.title, cancel_reason.strip())
+                                    else:
+                                        # Ends the series too, so no further occurrences are generated
+                                        _, cancelled, recipients = recurrence.end_series(
+                                            db, event.series_id, start=event.date, reason=cancel_reason.strip())
+                                aio.submit(AsyncEmailService().send_event_cancellation_notifications(
+                                    recipients, event.email_data(), st.session_state.get('org_name'), cancel_reason.strip()
+                                ), 'event cancellation emails')
+                                st.session_state.cancelling_event = None
+                                st.success(f"✅ Event cancelled! {cancelled} applications cancelled.")
+                                st.experimental_rerun()
+                            except Exception as e:
+                                st.error(f"❌ Error cancelling event: {str(e)}")
+                    with col2:
+                        if st.button("↩️ Keep Event", key=f"keep_event_{event.id}"):
+                            st.session_state.cancelling_event = None
+                            st.experimental_rerun()
+                
                 st.markdown("<br>", unsafe_allow_html=True)
+        
+        # Past events moved out of Firestore by the archive job; read-only
+        if st.checkbox("🗄️ Show archived events", key="show_archived_events"):
+            archived_events = sorted((Event.from_dict(doc_id, data) for doc_id, data in archive.archived_events(st.session_state['org_id'])),
+                                     key=lambda event: event.sort_key, reverse=True)
+            if not archived_events:
+                st.info("📭 No archived events.")
+            else:
+                st.dataframe(pd.DataFrame([
+                    {'Title': event.title, 'Date': format_date(event.date), 'Location': event.location,
+                     'Status': event.status.title(), 'Applications': event.applications_count}
+                    for event in archived_events
+                ]), hide_index=True, use_container_width=True)
                 
     except Exception as e:
         st.error(f"❌ Error loading events: {str(e)}")
@@ -451,48 +701,47 @@ elif current_page == 'applications':
     
     try:
         if 'selected_event' in st.session_state:
-            # Get event details
-            event_ref = db.collection('events').document(st.session_state['selected_event']).get()
+            # The event and its applications are independent reads; fetch them concurrently
+            event_ref, application_snapshots = parallel.run_parallel(
+                lambda: db.collection('events').document(st.session_state['selected_event']).get(),
+                lambda: parallel.stream_list(db.collection('applications').where('event_id', '==', st.session_state['selected_event']))
+            )
             if event_ref.exists:
-                event_data = event_ref.to_dict()
+                event = Event.from_snapshot(event_ref)
                 
                 st.markdown(f"""
                     <div class="event-card">
-                        <div class="event-title">🎯 {event_data.get('title', 'Event Title')}</div>
+                        <div class="event-title">🎯 {event.title}</div>
                         <div class="event-details">
-                            <p>📅 Date: {format_date(event_data.get('date'))}</p>
-                            <p>📍 Location: {event_data.get('location', 'Location TBD')}</p>
-                            <p>👥 Applications: {len(event_data.get('applications', []))}</p>
+                            <p>📅 Date: {format_date(event.date)}</p>
+                            <p>📍 Location: {event.location}</p>
+                            <p>👥 Applications: {event.applications_count}</p>
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
                 
-                # Get applications for this event
-                applications_ref = db.collection('applications').where('event_id', '==', st.session_state['selected_event']).stream()
-                applications_list = list(applications_ref)
+                applications_list = [Application.from_snapshot(application) for application in application_snapshots]
                 
                 if not applications_list:
                     st.info("📭 No applications received yet for this event.")
                 else:
+                    # Get volunteer details to ensure we have complete information, in batched reads
+                    volunteers = parallel.get_documents(db, 'volunteers', [application.volunteer_id for application in applications_list])
                     for application in applications_list:
-                        app_data = application.to_dict()
-                        
-                        # Get volunteer details to ensure we have complete information
-                        volunteer_ref = db.collection('volunteers').document(app_data.get('volunteer_id')).get()
-                        volunteer_data = volunteer_ref.to_dict() if volunteer_ref.exists else {}
+                        volunteer_ref = volunteers.get(application.volunteer_id)
+                        volunteer_data = volunteer_ref.to_dict() if volunteer_ref is not None else {}
                         
                         # Get phone and format application date
-                        phone = volunteer_data.get('phone') or app_data.get('volunteer_phone', 'Phone not provided')
-                        applied_date = app_data.get('created_at') or app_data.get('applied_at')
-                        formatted_applied_date = format_date(applied_date) if applied_date else 'Date not available'
+                        phone = volunteer_data.get('phone') or application.volunteer_phone or 'Phone not provided'
+                        formatted_applied_date = format_date(application.applied_at) if application.applied_at else 'Date not available'
                         
                         st.markdown(f"""
                             <div class="event-card">
-                                <div class="event-title">👤 {app_data.get('volunteer_name', 'Volunteer')}</div>
+                                <div class="event-title">👤 {application.volunteer_name}</div>
                                 <div class="event-details">
-                                    <p>📧 Email: {app_data.get('volunteer_email', 'Email not provided')}</p>
+                                    <p>📧 Email: {application.volunteer_email or 'Email not provided'}</p>
                                     <p>📱 Phone: {phone}</p>
-                                    <p>✨ Status: {app_data.get('status', 'pending').title()}</p>
+                                    <p>✨ Status: {application.status.title()}</p>
                                 </div>
                             </div>
                         """, unsafe_allow_html=True)
@@ -502,32 +751,28 @@ elif current_page == 'applications':
                         with col1:
                             if st.button("✅ Accept", key=f"accept_{application.id}"):
                                 try:
-                                    # Update application status
-                                    db.collection('applications').document(application.id).update({
-                                        'status': 'accepted'
-                                    })
-                                    
-                                    # Create notification and send email for volunteer
+                                    # Update application status and notify the volunteer concurrently
                                     notification_data = {
-                                        'volunteer_id': app_data.get('volunteer_id'),
+                                        'volunteer_id': application.volunteer_id,
                                         'title': 'Application Accepted',
-                                        'message': f"Your application for {event_data.get('title')} has been accepted!",
+                                        'message': f"Your application for {event.title} has been accepted!",
                                         'timestamp': datetime.now(),
                                         'read': False,
                                         'type': 'application_accepted',
                                         'event_id': st.session_state['selected_event']
                                     }
-                                    db.collection('notifications').add(notification_data)
+                                    aio.run(async_data.update_with_notification(
+                                        adb, 'applications', application.id,
+                                        sync.stamped({'status': 'accepted'}), notification_data
+                                    ))
                                     
-                                    # Send acceptance email
-                                    from services.mail_service import EmailService
-                                    email_service = EmailService()
-                                    email_service.send_volunteer_acceptance_notification(
-                                        volunteer_email=app_data.get('volunteer_email'),
-                                        volunteer_name=app_data.get('volunteer_name'),
-                                        event_name=event_data.get('title'),
+                                    # Send acceptance email in the background
+                                    aio.submit(AsyncEmailService().send_volunteer_acceptance_notification(
+                                        volunteer_email=application.volunteer_email,
+                                        volunteer_name=application.volunteer_name,
+                                        event_name=event.title,
                                         org_name=st.session_state.get('org_name')
-                                    )
+                                    ), 'acceptance email')
                                     
                                     st.success("✅ Application accepted!")
                                     st.experimental_rerun()
@@ -537,32 +782,28 @@ elif current_page == 'applications':
                         with col2:
                             if st.button("❌ Reject", key=f"reject_{application.id}"):
                                 try:
-                                    # Update application status
-                                    db.collection('applications').document(application.id).update({
-                                        'status': 'rejected'
-                                    })
-                                    
-                                    # Create notification and send email for volunteer
+                                    # Update application status and notify the volunteer concurrently
                                     notification_data = {
-                                        'volunteer_id': app_data.get('volunteer_id'),
+                                        'volunteer_id': application.volunteer_id,
                                         'title': 'Application Status Update',
-                                        'message': f"Your application for {event_data.get('title')} was not accepted at this time.",
+                                        'message': f"Your application for {event.title} was not accepted at this time.",
                                         'timestamp': datetime.now(),
                                         'read': False,
                                         'type': 'application_rejected',
                                         'event_id': st.session_state['selected_event']
                                     }
-                                    db.collection('notifications').add(notification_data)
+                                    aio.run(async_data.update_with_notification(
+                                        adb, 'applications', application.id,
+                                        sync.stamped({'status': 'rejected'}), notification_data
+                                    ))
                                     
-                                    # Send rejection email
-                                    from services.mail_service import EmailService
-                                    email_service = EmailService()
-                                    email_service.send_volunteer_rejection_notification(
-                                        volunteer_email=app_data.get('volunteer_email'),
-                                        volunteer_name=app_data.get('volunteer_name'),
-                                        event_name=event_data.get('title'),
+                                    # Send rejection email in the background
+                                    aio.submit(AsyncEmailService().send_volunteer_rejection_notification(
+                                        volunteer_email=application.volunteer_email,
+                                        volunteer_name=application.volunteer_name,
+                                        event_name=event.title,
                                         org_name=st.session_state.get('org_name')
-                                    )
+                                    ), 'rejection email')
                                     
                                     st.success("✅ Application rejected!")
                                     st.experimental_rerun()
@@ -575,22 +816,19 @@ elif current_page == 'applications':
         else:
             # Get all applications for organization's events
             events_ref = db.collection('events').where('org_id', '==', st.session_state['org_id']).stream()
-            events_list = list(events_ref)
+            events_list = [Event.from_snapshot(event) for event in events_ref]
             
             if not events_list:
                 st.info("🎯 No events created yet. Create your first event in the Events section!")
             else:
                 for event in events_list:
-                    event_data = event.to_dict()
-                    applications = event_data.get('applications', [])
-                    
-                    if applications:
+                    if event.applications_count:
                         st.markdown(f"""
                             <div class="event-card">
-                                <div class="event-title">🎯 {event_data.get('title', 'Event Title')}</div>
+                                <div class="event-title">🎯 {event.title}</div>
                                 <div class="event-details">
-                                    <p>📅 Date: {format_date(event_data.get('date'))}</p>
-                                    <p>👥 Applications: {len(applications)}</p>
+                                    <p>📅 Date: {format_date(event.date)}</p>
+                                    <p>👥 Applications: {event.applications_count}</p>
                                 </div>
                             </div>
                         """, unsafe_allow_html=True)
@@ -601,7 +839,7 @@ elif current_page == 'applications':
                         
                         st.markdown("<br>", unsafe_allow_html=True)
                 
-                if not any(event.to_dict().get('applications', []) for event in events_list):
+                if not any(event.applications_count for event in events_list):
                     st.info("📭 No applications received yet for any events.")
                     
     except Exception as e:
@@ -611,32 +849,46 @@ elif current_page == 'profile':
     st.subheader("👤 Organization Profile")
     try:
         # Get organization details
-        org_ref = db.collection('organizations').document(st.session_state['org_id']).get()
-        if org_ref.exists:
-            org_data = org_ref.to_dict()
+        # Prefill from the signed token's profile snapshot; read Firestore only without one
+        snapshot = auth_token.profile_snapshot()
+        if snapshot is not None:
+            org = Organization.from_dict(st.session_state['org_id'], snapshot)
+        else:
+            org_ref = db.collection('organizations').document(st.session_state['org_id']).get()
+            org = Organization.from_snapshot(org_ref) if org_ref.exists else None
+        if org is not None:
             
             # Create form for editing profile
             with st.form("edit_profile_form"):
-                name = st.text_input("Organization Name", value=org_data.get('name', ''))
-                email = st.text_input("Email", value=org_data.get('email', ''))
-                phone = st.text_input("Contact Number", value=org_data.get('phone', ''))
-                description = st.text_area("Description", value=org_data.get('description', ''))
-                website = st.text_input("Website", value=org_data.get('website', ''))
+                name = st.text_input("Organization Name", value=org.name)
+                email = st.text_input("Email", value=org.email)
+                phone = st.text_input("Contact Number", value=org.phone)
+                description = st.text_area("Description", value=org.description)
+                website = st.text_input("Website", value=org.website)
                 
                 if st.form_submit_button("💾 Save Changes"):
                     try:
-                        # Update organization details
-                        db.collection('organizations').document(st.session_state['org_id']).update({
+                        # Update organization details, moving the email reservation if the email changed
+                        email_registry.update_account(db, 'organization', st.session_state['org_id'], org.email, sync.stamped({
                             'name': name,
                             'email': email,
                             'phone': phone,
                             'description': description,
-                            'website': website,
-                            'updated_at': datetime.now()
-                        })
+                            'website': website
+                        }))
                         st.success("✅ Profile updated successfully!")
                         st.session_state.org_name = name  # Update session state
+                        auth_token.update_profile('organization', st.session_state['org_id'], {
+                            'name': name,
+                            'email': email,
+                            'phone': phone,
+                            'contact_number': org.contact_number,
+                            'description': description,
+                            'website': website
+                        })
                         st.experimental_rerun()
+                    except email_registry.EmailAlreadyRegistered:
+                        st.error("❌ An organization with this email already exists")
                     except Exception as e:
                         st.error(f"❌ Error updating profile: {str(e)}")
         else:
@@ -647,75 +899,154 @@ elif current_page == 'profile':
 elif current_page == 'notifications':
     st.subheader("🔔 Notifications")
     try:
-        # Get notifications for organization's events
-        notifications_ref = db.collection('notifications').where('org_id', '==', st.session_state['org_id']).stream()
-        notifications_list = list(notifications_ref)
-        
-        # Get applications for organization's events
-        applications_ref = db.collection('applications').where('org_id', '==', st.session_state['org_id']).where('status', '==', 'pending').stream()
-        applications_list = list(applications_ref)
+        # Notifications and pending applications for organization's events, fetched concurrently
+        notification_snapshots, application_snapshots = aio.run(async_data.gather(
+            async_data.query_list(adb.collection('notifications').where('org_id', '==', st.session_state['org_id'])),
+            async_data.query_list(adb.collection('applications').where('org_id', '==', st.session_state['org_id']).where('status', '==', 'pending'))
+        ))
+        notifications_list = [Notification.from_snapshot(notification) for notification in notification_snapshots]
+        applications_list = [Application.from_snapshot(application) for application in application_snapshots]
         
         if not notifications_list and not applications_list:
             st.info("📭 No notifications at the moment.")
         else:
-            # Display pending applications first
+            # Display pending applications first, looking their events up in batched reads
+            events = aio.run(async_data.get_documents(adb, 'events', [application.event_id for application in applications_list]))
             for application in applications_list:
-                app_data = application.to_dict()
-                event_ref = db.collection('events').document(app_data.get('event_id')).get()
-                event_data = event_ref.to_dict() if event_ref.exists else {}
+                event_ref = events.get(application.event_id)
+                event_title = Event.from_snapshot(event_ref).title if event_ref is not None else 'an event'
                 
                 st.markdown(f"""
                     <div class="event-card">
                         <div class="event-title">🔵 New Application</div>
                         <div class="event-details">
-                            <p>👤 {app_data.get('volunteer_name')} has applied for {event_data.get('title', 'an event')}</p>
-                            <p>📧 Email: {app_data.get('volunteer_email')}</p>
+                            <p>👤 {application.volunteer_name} has applied for {event_title}</p>
+                            <p>📧 Email: {application.volunteer_email}</p>
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
             
             # Sort other notifications by timestamp in memory
-            sorted_notifications = sorted(
-                notifications_list,
-                key=lambda x: x.to_dict().get('timestamp', MIN_DATETIME).replace(tzinfo=None) if x.to_dict().get('timestamp') and x.to_dict().get('timestamp').tzinfo else x.to_dict().get('timestamp', MIN_DATETIME),
-                reverse=True
-            )
+            sorted_notifications = sorted(notifications_list, key=lambda n: n.sort_key, reverse=True)
             
             for notification in sorted_notifications:
-                notif_data = notification.to_dict()
-                # Format timestamp
-                timestamp = notif_data.get('timestamp')
-                if timestamp:
-                    if isinstance(timestamp, datetime):
-                        # Convert to naive datetime if it has timezone info
-                        if timestamp.tzinfo is not None:
-                            timestamp = timestamp.replace(tzinfo=None)
-                        formatted_time = timestamp.strftime('%d-%m-%Y %H:%M:%S')
-                    else:
-                        formatted_time = str(timestamp)
-                else:
-                    formatted_time = 'Recent'
-                
                 # Mark notification as read
-                if not notif_data.get('read', False):
+                if not notification.read:
                     db.collection('notifications').document(notification.id).update({'read': True})
                 
                 # Get notification status indicator
-                status_icon = '🔵' if not notif_data.get('read', False) else '⚪'
+                status_icon = '🔵' if not notification.read else '⚪'
                 
                 st.markdown(f"""
                     <div class="event-card">
-                        <div class="event-title">{status_icon} {notif_data.get('title', 'Notification')}</div>
+                        <div class="event-title">{status_icon} {notification.title}</div>
                         <div class="event-details">
-                            <p>📝 {notif_data.get('message', '')}</p>
-                            <p>⏰ {formatted_time}</p>
-                            <p>🏷️ Type: {notif_data.get('type', 'general').replace('_', ' ').title()}</p>
+                            <p>📝 {notification.message}</p>
+                            <p>⏰ {notification.time_label}</p>
+                            <p>🏷️ Type: {notification.type_label}</p>
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
     except Exception as e:
         st.error(f"❌ Error loading notifications: {str(e)}")
 
+elif current_page == 'checkin':
+    st.subheader("📋 Event Check-in")
+    try:
+        event_id = st.session_state.get('checkin_event')
+        if not event_id:
+            st.info("🎯 Pick an event to check in from the Events page.")
+        else:
+            checkin_log = checkin.get_log()
+            # Roster of accepted applicants, loaded once per event so scans need no Firestore reads
+            roster = st.session_state.get('checkin_roster')
+            if roster is None or roster.event_id != event_id:
+                roster = checkin.Roster.load(db, event_id)
+                st.session_state.checkin_roster = roster
+            roster.apply_log(checkin_log.for_event(event_id))
+            
+            event = sync.shared_cache(db, 'events').get(event_id)
+            st.markdown(f"### 🎯 {event.title if event else 'Event'}")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("✅ Checked In", roster.checked_in)
+            col2.metric("👥 Expected", len(roster.entries))
+            col3.metric("⏳ Waiting to Sync", len(checkin_log.pending(event_id)))
+            
+            # A form submits on Enter, so a handheld QR scanner that types the code works as-is
+            with st.form("checkin_form", clear_on_submit=True):
+                scanned = st.text_input("🔎 Scan QR code or enter short code / name")
+                submitted = st.form_submit_button("✅ Check In")
+            
+            def check_in(entry):
+                if entry['checked_in_at'] is not None or not checkin_log.mark(event_id, entry['application_id']):
+                    st.warning(f"⚠️ {entry['name']} is already checked in.")
+                else:
+                    entry['checked_in_at'] = datetime.now()
+                    st.success(f"✅ {entry['name']} checked in!")
+            
+            if submitted:
+                matches = roster.lookup(scanned)
+                st.session_state.checkin_matches = None
+                if not matches:
+                    st.error("❌ No accepted volunteer matches that code.")
+                elif len(matches) > 1:
+                    st.session_state.checkin_matches = [entry['application_id'] for entry in matches]
+                else:
+                    check_in(matches[0])
+            
+            # Several name matches: kept across the rerun the pick button triggers
+            if st.session_state.get('checkin_matches'):
+                st.info(f"🔍 {len(st.session_state.checkin_matches)} volunteers match; check in the right one below.")
+                for application_id in st.session_state.checkin_matches:
+                    entry = roster.entries[application_id]
+                    if st.button(f"✅ {entry['name']} ({entry['code']})", key=f"checkin_pick_{application_id}"):
+                        st.session_state.checkin_matches = None
+                        check_in(entry)
+            
+            # Batch the buffered marks to Firestore; anything that fails stays in the local log
+            if checkin_log.flush_due(event_id):
+                checkin_log.flush(db, event_id)
+            dropped = checkin_log.dead(event_id)
+            if dropped:
+                st.warning(f"⚠️ {dropped} check-ins were skipped because their applications no longer exist.")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("🔄 Sync Now"):
+                    written = checkin_log.flush(db, event_id)
+                    if checkin_log.pending(event_id):
+                        st.warning("⚠️ Could not reach the database; check-ins are saved locally and will sync later.")
+                    else:
+                        st.success(f"✅ Synced {written} check-ins.")
+            with col2:
+                # Credits each checked-in volunteer once; confirming again only picks up late arrivals
+                if st.button("🏅 Confirm Attendance & Credit Hours", disabled=event is None):
+                    checkin_log.flush(db, event_id)
+                    if checkin_log.pending(event_id):
+                        st.warning("⚠️ Could not reach the database; sync check-ins before crediting hours.")
+                    else:
+                        applications = (db.collection('applications')
+                                        .where('event_id', '==', event_id)
+                                        .where('status', 'in', list(checkin.CHECKIN_STATUSES))
+                                        .stream())
+                        credited, credited_hours, failed = hours.credit_event(
+                            db, event, [(application.id, application.to_dict() or {}) for application in applications])
+                        if failed:
+                            st.warning(f"⚠️ {failed} volunteers could not be credited; confirm again to retry.")
+                        st.success(f"✅ Credited {credited_hours:g} hours to {credited} volunteers.")
+            with col3:
+                if st.button("⬅️ Back to Events"):
+                    st.session_state.current_page = 'events'
+                    st.experimental_rerun()
+            
+            with st.expander(f"📜 Roster ({len(roster.entries)})"):
+                st.dataframe(pd.DataFrame([
+                    {'Name': entry['name'], 'Code': entry['code'],
+                     'Checked In': entry['checked_in_at'].strftime('%H:%M') if entry['checked_in_at'] else ''}
+                    for entry in sorted(roster.entries.values(), key=lambda entry: entry['name'])
+                ]), hide_index=True, use_container_width=True)
+    except Exception as e:
+        st.error(f"❌ Error loading check-in: {str(e)}")
+
 st.markdown("""
     <style>
         [data-testid="stSidebar"] {
@@ -726,3 +1057,12 @@ st.markdown("""
         }
     </style>
 """, unsafe_allow_html=True)
+
+# Save auth/navigation state for other replicas and hand out the signed token
+session_store.persist()
+auth_token.persist()
+
+# Optional ?debug=perf panel, then close out this rerun's profile and metrics
+metrics.render_debug_panel()
+profiling.finish()
+metrics.finish_rerun()
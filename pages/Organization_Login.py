@@ -3,6 +3,9 @@ import firebase_admin
 from firebase_admin import firestore
 from firebase_admin import credentials
 import os
+from services import metrics, firestore_instrumentation, auth_token, email_registry
+
+metrics.start_rerun('Organization_Login')
 
 # Get the absolute path to the config directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,12 +22,18 @@ if not firebase_admin._apps:
 
 try:
     db = firestore.client()
+    firestore_instrumentation.install()
 except Exception as e:
     st.error(f"Error connecting to Firestore: {str(e)}")
     st.stop()
 
 st.set_page_config(page_title="Organization Login", layout="centered")
 
+# A valid token cookie logs the browser straight back in without a database read
+restored_user_type = auth_token.restore()
+if restored_user_type:
+    st.switch_page(auth_token.DASHBOARDS[restored_user_type])
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -207,17 +216,18 @@ with col2:
     if st.button("Login"):
         if email and password:
             try:
-                # Query the organizations collection
-                org_ref = db.collection('organizations').where('email', '==', email).limit(1).get()
+                # Point read through the emails/{email} reservation
+                org_ref = email_registry.find_account(db, 'organization', email)
                 
-                if not org_ref:
+                if org_ref is None:
                     st.error("No account found with this email")
                 else:
-                    org_data = org_ref[0].to_dict()
+                    org_data = org_ref.to_dict()
                     if org_data.get('password') == password:
                         # Store organization info in session state
-                        st.session_state['org_id'] = org_ref[0].id
+                        st.session_state['org_id'] = org_ref.id
                         st.session_state['org_name'] = org_data.get('name', '')
+                        auth_token.issue_organization(org_ref.id, org_data)
                         st.success("Login successful!")
                         st.switch_page("pages/Organization_Dashboard.py")
                     else:
@@ -235,3 +245,7 @@ with col2:
 
     if st.button("Sign Up", key="signup_btn", type="secondary"):
         st.switch_page("pages/Organization_Signup.py")
+
+# Clears the token cookie after a logout
+auth_token.persist()
+metrics.finish_rerun()
@@ -3,6 +3,9 @@ import firebase_admin
 from firebase_admin import firestore
 from firebase_admin import credentials
 import os
+from services import metrics, firestore_instrumentation, email_registry, sync
+
+metrics.start_rerun('Organization_Signup')
 
 # Get the absolute path to the config directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +23,7 @@ if not firebase_admin._apps:
 
 # Initialize Firestore
 db = firestore.client()
+firestore_instrumentation.install()
 
 st.set_page_config(page_title="Organization Signup")
 
@@ -200,22 +204,19 @@ with col2:
         if name and email and password and confirm_password and description and contact_number:
             if password == confirm_password:
                 try:
-                    # Check if email already exists
-                    existing_org = db.collection('organizations').where('email', '==', email).get()
-                    if not existing_org:
-                        # Add organization to Firestore
-                        org_ref = db.collection('organizations').add({
-                            'name': name,
-                            'email': email,
-                            'password': password,
-                            'description': description,
-                            'contact_number': contact_number,
-                            'website': website
-                        })
-                        st.success("Organization registered successfully!")
-                        st.switch_page("pages/Organization_Login.py")
-                    else:
-                        st.error("An organization with this email already exists")
+                    # Reserve the email and add the organization in one transaction
+                    email_registry.register_account(db, 'organization', sync.stamped({
+                        'name': name,
+                        'email': email,
+                        'password': password,
+                        'description': description,
+                        'contact_number': contact_number,
+                        'website': website
+                    }))
+                    st.success("Organization registered successfully!")
+                    st.switch_page("pages/Organization_Login.py")
+                except email_registry.EmailAlreadyRegistered:
+                    st.error("An organization with this email already exists")
                 except Exception as e:
                     st.error(f"Error during registration: {str(e)}")
             else:
@@ -234,3 +235,5 @@ st.markdown("""
         }
     </style>
 """, unsafe_allow_html=True)
+
+metrics.finish_rerun()
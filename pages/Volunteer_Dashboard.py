@@ -3,6 +3,15 @@ from datetime import datetime, date, time
 import firebase_admin
 from firebase_admin import credentials, firestore
 import os
+from services import metrics, firestore_instrumentation, profiling, aio, archive, async_data, auth_token, checkin, event_snapshots, hours, interval_index, parallel, session_store, sync
+from services.async_mail_service import AsyncEmailService
+from services.models import MIN_DATETIME, Event, Application, Notification, Volunteer, to_naive_utc
+
+metrics.start_rerun('Volunteer_Dashboard')
+profiling.start_if_requested('Volunteer_Dashboard')
+# Log back in from the signed token cookie, else from a session saved by another replica
+if not auth_token.restore():
+    session_store.restore()
 
 # Get the absolute path to the config directory
 config_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config'))
@@ -20,13 +29,13 @@ if not firebase_admin._apps:
 # Get Firestore database instance
 try:
     db = firestore.client()
+    firestore_instrumentation.install()
+    # Async client on the shared event loop, for writes and emails that need not hold this thread
+    adb = aio.async_db()
 except Exception as e:
     st.error(f"Error connecting to Firestore: {str(e)}")
     st.stop()
 
-# Define minimum datetime for sorting
-MIN_DATETIME = datetime(2000, 1, 1)  # Use a reasonable minimum date instead of datetime.min
-
 # Helper Functions
 def get_org_name(org_id):
     """Helper function to get organization name from org_id"""
@@ -34,62 +43,51 @@ def get_org_name(org_id):
         if not org_id:
             return "Unknown Organization"
         
-        org_ref = db.collection('organizations').document(org_id).get()
-        if org_ref.exists:
-            return org_ref.to_dict().get('name', 'Unknown Organization')
-        return "Unknown Organization"
+        # Served from the delta-synced catalogue instead of one read per event card
+        org = sync.shared_cache(db, 'organizations').get(org_id)
+        return (org.name if org else None) or "Unknown Organization"
     except Exception as e:
         st.error(f"Error fetching organization name: {str(e)}")
         return "Unknown Organization"
 
-def get_event_date(event):
-    """Helper function to get event date for sorting"""
-    event_dict = event.to_dict()
-    event_date = event_dict.get('date')
-    if isinstance(event_date, datetime):
-        # Convert to naive datetime if it has timezone info
-        if event_date.tzinfo is not None:
-            event_date = event_date.replace(tzinfo=None)
-        return event_date
-    return MIN_DATETIME
-
 def format_date(date_obj):
     """Helper function to format dates consistently"""
     if date_obj is None:
         return "Date not set"
     if isinstance(date_obj, datetime):
-        # Convert to naive datetime if it has timezone info
+        # Model fields are already naive UTC; only raw Firestore values need converting
         if date_obj.tzinfo is not None:
-            date_obj = date_obj.replace(tzinfo=None)
+            date_obj = to_naive_utc(date_obj)
         return date_obj.strftime("%d-%m-%Y")
     return str(date_obj)
 
-def get_event_status(event_date, current_status='pending'):
-    """Helper function to determine event status based on date"""
+def get_event_status(event_status, current_status='pending'):
+    """Helper function to determine application status from the stored event status
+
+    The lifecycle sweep (scripts/scheduler.py) marks past events as completed; cancelling
+    an event also cancels its pending and accepted applications.
+    """
     current_status = current_status.lower()
     if current_status == 'rejected':
         return 'Rejected'
-    elif current_status == 'approved':
-        if event_date is None:
-            return 'Approved'
-        if isinstance(event_date, datetime):
-            if event_date.tzinfo is not None:
-                event_date = event_date.replace(tzinfo=None)
-            if event_date < datetime.now():
-                return 'Completed'
-            return 'Approved'
-    
-    if event_date is None:
-        return current_status.capitalize()
-        
-    if isinstance(event_date, datetime):
-        if event_date.tzinfo is not None:
-            event_date = event_date.replace(tzinfo=None)
-        if event_date < datetime.now():
-            return 'Completed'
-    
+    if event_status == 'completed':
+        return 'Completed'
+    if event_status == 'cancelled' or current_status == 'cancelled':
+        return 'Cancelled'
     return current_status.capitalize()
 
+def schedule_conflicts(event):
+    """Titles of the volunteer's pending and accepted events that overlap `event`"""
+    if event.date is None:
+        return []
+    index = interval_index.for_volunteer(db, st.session_state.volunteer_id)
+    return [label for _, label, _, _ in index.overlapping(event.date, event.end_date, exclude=event.id)]
+
+def record_commitment(event):
+    """Add a just-applied event to the volunteer's interval index"""
+    if event.date is not None:
+        interval_index.for_volunteer(db, st.session_state.volunteer_id).add(event.id, event.date, event.end_date, event.title)
+
 # Initialize session state variables
 if 'volunteer_id' not in st.session_state:
     st.session_state.volunteer_id = None
@@ -271,44 +269,58 @@ with col5:
 
 with col_logout:
     if st.button("🚪 Logout", use_container_width=True):
+        session_store.logout()
         for key in list(st.session_state.keys()):
             del st.session_state[key]
+        auth_token.logout()
         st.switch_page("pages/Volunteer_Login.py")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
+metrics.start_branch(current_page)
+
 if current_page == 'my_events':
     st.subheader("📅 My Events")
     try:
+        include_archived = st.checkbox("🗄️ Include archived events", key="my_events_archived")
         # Fetch user's applications
         applications_ref = db.collection('applications').where('volunteer_id', '==', st.session_state.volunteer_id).get()
+        applications = [Application.from_snapshot(app_snapshot) for app_snapshot in applications_ref]
+        if include_archived:
+            # Archived applications carry their event snapshot, so they need no event reads
+            applications += [Application.from_dict(doc_id, data)
+                             for doc_id, data in archive.archived_applications(st.session_state.volunteer_id)]
         
-        if not applications_ref:
+        if not applications:
             st.info("🎯 You haven't applied to any events yet! 🔍")
         else:
+            # Applications carry an event snapshot; only ones from before snapshots need their event read
+            events = parallel.get_documents(db, 'events', [application.event_id for application in applications
+                                                           if application.event_status is None])
             applications_list = []
-            for app in applications_ref:
-                app_data = app.to_dict()
-                event_ref = db.collection('events').document(app_data['event_id']).get()
-                if event_ref.exists:
-                    event_data = event_ref.to_dict()
-                    event_date = event_data.get('date')
-                    current_status = app_data.get('status', 'Pending')
-                    applications_list.append({
-                        'event_title': app_data.get('event_title', 'Unknown Event'),
-                        'event_date': format_date(event_date),
-                        'event_location': event_data.get('location', 'No location'),
-                        'org_name': app_data.get('organization_name', 'Unknown Organization'),
-                        'status': get_event_status(event_date, current_status),
-                        'applied_at': format_date(app_data.get('applied_at'))
-                    })
+            for application in applications:
+                if application.event_status is not None:
+                    event_date, event_location, event_status = application.event_date, application.event_location, application.event_status
+                else:
+                    event_ref = events.get(application.event_id)
+                    if event_ref is None:
+                        continue
+                    event = Event.from_snapshot(event_ref)
+                    event_date, event_location, event_status = event.date, event.location, event.status
+                applications_list.append((event_date or MIN_DATETIME, {
+                    'event_title': application.event_title,
+                    'event_date': format_date(event_date),
+                    'event_location': event_location or 'Location TBD',
+                    'org_name': application.organization_name,
+                    'status': get_event_status(event_status, application.status),
+                    'applied_at': format_date(application.applied_at),
+                    # Shown at the door, typed or scanned into the organization's check-in mode
+                    'checkin_code': checkin.short_code(application.id) if application.status == 'accepted' else None
+                }))
             
-            # Sort applications by date
-            sorted_applications = sorted(
-                applications_list,
-                key=lambda x: x['event_date'],
-                reverse=True
-            )
+            # Sort applications by event date, newest first
+            applications_list.sort(key=lambda item: item[0], reverse=True)
+            sorted_applications = [app for _, app in applications_list]
             
             # Display applications
             for app in sorted_applications:
@@ -322,6 +334,7 @@ if current_page == 'my_events':
                             <p>📅 <strong>Event Date:</strong> {app['event_date']}</p>
                             <p>📝 <strong>Applied On:</strong> {app['applied_at']}</p>
                             <p>✨ <strong>Status:</strong> {app['status']}</p>
+                            {f"<p>🎟️ <strong>Check-in Code:</strong> {app['checkin_code']}</p>" if app['checkin_code'] else ''}
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
@@ -334,103 +347,86 @@ if current_page == 'my_events':
 elif current_page == 'feed':
     st.subheader("📰 Event Feed")
     try:
-        # Fetch all events
-        events_ref = db.collection('events').stream()
-        events_list = list(events_ref)
+        # Active upcoming events from the delta-synced catalogue; the date check covers events the
+        # lifecycle sweep has not marked completed yet
+        now = datetime.now()
+        events_list = [event for event in sync.shared_cache(db, 'events').values()
+                       if event.status == 'active' and (event.date is None or event.date >= now)]
+        if st.checkbox("🙈 Hide events that clash with my schedule", key=f"hide_conflicts_{st.session_state.volunteer_id}"):
+            events_list = [event for event in events_list if not schedule_conflicts(event)]
         
         if not events_list:
-            st.info("🎯 No events available at the moment. Check back later!")
+            st.info("🎯 No upcoming events available at the moment. Check back later!")
         else:
-            # Filter out past events and sort remaining events by date
-            current_events = []
-            for event in events_list:
-                event_data = event.to_dict()
-                event_date = event_data.get('date')
-                
-                # Skip events that have already ended
-                if event_date and isinstance(event_date, datetime):
-                    if event_date.tzinfo is not None:
-                        event_date = event_date.replace(tzinfo=None)
-                    if event_date < datetime.now():
-                        continue
-                
-                current_events.append(event)
-            
-            # Sort events by date
-            sorted_events = sorted(
-                current_events,
-                key=lambda x: get_event_date(x),
-                reverse=True
-            )
+            sorted_events = sorted(events_list, key=lambda event: event.sort_key, reverse=True)
             
-            if not current_events:
-                st.info("🎯 No upcoming events available at the moment. Check back later!")
-            else:
-                for event in sorted_events:
-                    event_data = event.to_dict()
-                    org_id = event_data.get('org_id')
-                    org_name = get_org_name(org_id)
-                    
-                    st.markdown(f"""
-                        <div class=\"event-card\">
-                            <div class=\"event-title\">🎯 {event_data.get('title', 'Event Title')}</div>
-                            <div class=\"event-details\">
-                                <p>🏢 Organization: {org_name}</p>
-                                <p>📅 Date: {format_date(event_data.get('date', ''))}</p>
-                                <p>📍 Location: {event_data.get('location', 'Location TBD')}</p>
-                                <p>👥 Volunteers Needed: {event_data.get('required_volunteers', 'Not specified')}</p>
-                                <p>🔧 Required Skills: {', '.join(event_data.get('skills_required', ['No specific skills required']))}</p>
-                                <p>📝 Description: {event_data.get('description', 'No description available.')}</p>
-                            </div>
+            for event in sorted_events:
+                org_id = event.org_id
+                org_name = get_org_name(org_id)
+                conflicts = schedule_conflicts(event)
+                
+                st.markdown(f"""
+                    <div class=\"event-card\">
+                        <div class=\"event-title\">🎯 {event.title}</div>
+                        <div class=\"event-details\">
+                            <p>🏢 Organization: {org_name}</p>
+                            <p>📅 Date: {format_date(event.date)}</p>
+                            <p>📍 Location: {event.location}</p>
+                            <p>👥 Volunteers Needed: {event.required_volunteers}</p>
+                            <p>🔧 Required Skills: {', '.join(event.skills_required) or 'No specific skills required'}</p>
+                            <p>📝 Description: {event.description}</p>
+                            {f"<p>⚠️ Overlaps with: {', '.join(conflicts)}</p>" if conflicts else ''}
                         </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Generate a unique key for each apply button
-                    unique_key = f"feed_apply_{event.id}_{st.session_state.volunteer_id}"
-                    
-                    if st.button(f"Apply for {event_data.get('title', 'Event')}", key=unique_key):
-                        try:
-                            # Check if already applied
-                            application_ref = db.collection('applications').where('event_id', '==', event.id).where('volunteer_id', '==', st.session_state.volunteer_id).get()
+                    </div>
+                """, unsafe_allow_html=True)
+                
+                # Generate a unique key for each apply button
+                unique_key = f"feed_apply_{event.id}_{st.session_state.volunteer_id}"
+                
+                if st.button(f"Apply for {event.title}", key=unique_key):
+                    try:
+                        # Check if already applied
+                        application_ref = db.collection('applications').where('event_id', '==', event.id).where('volunteer_id', '==', st.session_state.volunteer_id).get()
+                        
+                        if not application_ref:
+                            # Create application with timestamp
+                            application_data = {
+                                'event_id': event.id,
+                                'volunteer_id': st.session_state.volunteer_id,
+                                'volunteer_name': st.session_state.volunteer_name,
+                                'volunteer_email': st.session_state.volunteer_email,
+                                'event_title': event.title,
+                                'org_id': org_id,
+                                'organization_name': org_name,
+                                'status': 'pending',
+                                'applied_at': datetime.now(),
+                                'event_snapshot': event_snapshots.snapshot_from_event(event)
+                            }
+                            aio.run(async_data.add_with_notification(adb, 'applications', sync.stamped(application_data)))
                             
-                            if not application_ref:
-                                # Create application with timestamp
-                                application_data = {
-                                    'event_id': event.id,
-                                    'volunteer_id': st.session_state.volunteer_id,
-                                    'volunteer_name': st.session_state.volunteer_name,
-                                    'volunteer_email': st.session_state.volunteer_email,
-                                    'event_title': event_data.get('title', 'Untitled Event'),
-                                    'org_id': org_id,
-                                    'organization_name': org_name,
-                                    'status': 'pending',
-                                    'applied_at': datetime.now()
-                                }
-                                db.collection('applications').add(application_data)
-                                
-                                # Send confirmation email
-                                from services.mail_service import EmailService
-                                email_service = EmailService()
-                                email_service.send_event_registration_confirmation(
-                                    volunteer_email=st.session_state.volunteer_email,
-                                    volunteer_name=st.session_state.volunteer_name,
-                                    event_data=event_data,
-                                    org_name=org_name
-                                )
-                                
-                                # Send notification to organization
-                                email_service.send_organization_event_notification(
-                                    org_email=event_data.get('org_email'),
-                                    volunteer_name=st.session_state.volunteer_name,
-                                    event_name=event_data.get('title'),
-                                    action='applied'
-                                )
-                                
-                                st.success("Successfully applied for the event!")
-                            else:
-                                st.warning("You have already applied for this event.")
-                        except Exception as e:
-                            st.error(f"Error applying for event: {str(e)}")
+                            # Email the volunteer and the organization in the background
+                            email_service = AsyncEmailService()
+                            aio.submit(email_service.send_event_registration_confirmation(
+                                volunteer_email=st.session_state.volunteer_email,
+                                volunteer_name=st.session_state.volunteer_name,
+                                event_data=event.email_data(),
+                                org_name=org_name
+                            ), 'registration confirmation email')
+                            aio.submit(email_service.send_organization_event_notification(
+                                org_email=event.org_email,
+                                volunteer_name=st.session_state.volunteer_name,
+                                event_name=event.title,
+                                action='applied'
+                            ), 'organization application email')
+                            
+                            record_commitment(event)
+                            st.success("Successfully applied for the event!")
+                            if conflicts:
+                                st.warning(f"⚠️ Heads up: this event overlaps with {', '.join(conflicts)}.")
+                        else:
+                            st.warning("You have already applied for this event.")
+                    except Exception as e:
+                        st.error(f"Error applying for event: {str(e)}")
     except Exception as e:
         st.error(f"❌ Error loading events: {str(e)}")
 
@@ -440,38 +436,29 @@ elif current_page == 'search':
     if search_query:
         try:
             # Simple search implementation
-            events_ref = db.collection('events').stream()
             found_events = False
-            for event in events_ref:
-                event_data = event.to_dict()
-                if search_query.lower() in event_data.get('title', '').lower() or search_query.lower() in event_data.get('description', '').lower():
+            needle = search_query.lower()
+            for event in sync.shared_cache(db, 'events').values():
+                if event.status != 'cancelled' and needle in event.search_text:
                     found_events = True
                     
                     # Get organization name
-                    org_id = event_data.get('org_id')
-                    org_name = "Unknown Organization"
-                    if org_id:
-                        try:
-                            org_ref = db.collection('organizations').document(org_id).get()
-                            if org_ref.exists:
-                                org_data = org_ref.to_dict()
-                                org_name = org_data.get('name', 'Unknown Organization')
-                        except Exception as e:
-                            st.error(f"❌ Error fetching organization details: {str(e)}")
+                    org_id = event.org_id
+                    org_name = get_org_name(org_id)
                     
                     st.markdown(f"""
                         <div class="event-card">
-                            <div class="event-title">🎯 {event_data.get('title', 'Event Title')}</div>
+                            <div class="event-title">🎯 {event.title}</div>
                             <div class="event-details">
                                 <p>🏢 Organization: {org_name}</p>
-                                <p>📅 Date: {format_date(event_data.get('date', ''))}</p>
-                                <p>📍 Location: {event_data.get('location', 'Location TBD')}</p>
-                                <p>📝 Description: {event_data.get('description', 'No description available.')}</p>
+                                <p>📅 Date: {format_date(event.date)}</p>
+                                <p>📍 Location: {event.location}</p>
+                                <p>📝 Description: {event.description}</p>
                             </div>
                         </div>
                     """, unsafe_allow_html=True)
                     
-                    if st.button(f"Apply for {event_data.get('title', 'Event')}", key=f"search_apply_{event.id}_{st.session_state.volunteer_id}_{current_page}"):
+                    if st.button(f"Apply for {event.title}", key=f"search_apply_{event.id}_{st.session_state.volunteer_id}_{current_page}"):
                         try:
                             # Check if already applied
                             application_ref = db.collection('applications').where('event_id', '==', event.id).where('volunteer_id', '==', st.session_state.volunteer_id).get()
@@ -483,42 +470,43 @@ elif current_page == 'search':
                                     'volunteer_id': st.session_state.volunteer_id,
                                     'volunteer_name': st.session_state.volunteer_name,
                                     'volunteer_email': st.session_state.volunteer_email,
-                                    'event_title': event_data.get('title', 'Untitled Event'),
+                                    'event_title': event.title,
                                     'org_id': org_id,
                                     'organization_name': org_name,
                                     'status': 'pending',
-                                    'applied_at': datetime.now()  # This will be timezone naive
+                                    'applied_at': datetime.now(),  # This will be timezone naive
+                                    'event_snapshot': event_snapshots.snapshot_from_event(event)
                                 }
                                 
-                                # Add application to database
-                                db.collection('applications').add(application_data)
-
-                                # Send confirmation email
-                                try:
-                                    from services.mail_service import MailService
-                                    mail_service = MailService()
-                                    mail_service.send_event_registration_confirmation(
-                                        volunteer_email=st.session_state.volunteer_email,
-                                        volunteer_name=st.session_state.volunteer_name,
-                                        event_data=event_data,
-                                        org_name=org_name
-                                    )
-                                except Exception as e:
-                                    st.warning(f"⚠️ Application submitted but email notification failed: {str(e)}")
-                                
                                 # Create notification for organization
                                 notification_data = {
                                     'org_id': org_id,
                                     'title': 'New Volunteer Application',
-                                    'message': f"{st.session_state.volunteer_name} has applied for {event_data.get('title', 'Untitled Event')}",
+                                    'message': f"{st.session_state.volunteer_name} has applied for {event.title}",
                                     'timestamp': datetime.now(),
                                     'read': False,
                                     'type': 'new_application',
-                                    'event_id': event_id
+                                    'event_id': event.id
                                 }
                                 
-                                db.collection('notifications').add(notification_data)
+                                # Add application and notification to database concurrently
+                                aio.run(async_data.add_with_notification(
+                                    adb, 'applications', sync.stamped(application_data), notification_data
+                                ))
+
+                                # Send confirmation email in the background; aio.submit logs a failed send
+                                aio.submit(AsyncEmailService().send_event_registration_confirmation(
+                                    volunteer_email=st.session_state.volunteer_email,
+                                    volunteer_name=st.session_state.volunteer_name,
+                                    event_data=event.email_data(),
+                                    org_name=org_name
+                                ), 'registration confirmation email')
+                                
+                                record_commitment(event)
                                 st.success("✅ Application submitted successfully!")
+                                conflicts = schedule_conflicts(event)
+                                if conflicts:
+                                    st.warning(f"⚠️ Heads up: this event overlaps with {', '.join(conflicts)}.")
                             else:
                                 st.warning("⚠️ You have already applied for this event")
                         except Exception as e:
@@ -533,50 +521,72 @@ elif current_page == 'search':
 elif current_page == 'profile':
     st.subheader("👤 My Profile")
     try:
-        # Fetch volunteer profile
-        volunteer_ref = db.collection('volunteers').document(st.session_state.volunteer_id).get()
-        if volunteer_ref.exists:
-            volunteer_data = volunteer_ref.to_dict()
-
+        # Prefill from the signed token's profile snapshot; read Firestore only without one
+        snapshot = auth_token.profile_snapshot()
+        if snapshot is not None:
+            volunteer = Volunteer.from_dict(st.session_state.volunteer_id, snapshot)
+        else:
+            volunteer_ref = db.collection('volunteers').document(st.session_state.volunteer_id).get()
+            volunteer = Volunteer.from_snapshot(volunteer_ref) if volunteer_ref.exists else None
+        if volunteer is not None:
+            # Totals are kept on one running document, so this is a single read
+            totals_doc = hours.volunteer_totals_ref(db, st.session_state.volunteer_id).get()
+            totals = totals_doc.to_dict() if totals_doc.exists else {}
+            st.markdown("### ⏱️ My Volunteer Hours")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Hours", f"{totals.get('total_hours', 0):g}")
+            with col2:
+                st.metric("Events Served", totals.get('events', 0))
+            if totals.get('by_org'):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("#### 🏢 By Organization")
+                    for org_name, org_hours in hours.leaderboard(totals, 'by_org', 'org_names'):
+                        st.markdown(f"- {org_name}: **{org_hours:g}h**")
+                with col2:
+                    st.markdown("#### 🎯 By Skill")
+                    for skill, skill_hours in hours.leaderboard(totals, 'by_skill', 'skill_names'):
+                        st.markdown(f"- {skill}: **{skill_hours:g}h**")
             
             with st.form(f"update_profile_form_{st.session_state.volunteer_id}"):
                 st.markdown("### 👤 Personal Information")
-                name = st.text_input("📛 Full Name", value=volunteer_data.get('name', ''), key=f"profile_name_{st.session_state.volunteer_id}")
-                email = st.text_input("📧 Email", value=volunteer_data.get('email', ''), disabled=True, key=f"profile_email_{st.session_state.volunteer_id}")
-                phone = st.text_input("📱 Phone Number", value=volunteer_data.get('phone', ''), key=f"profile_phone_{st.session_state.volunteer_id}")
+                name = st.text_input("📛 Full Name", value=volunteer.name, key=f"profile_name_{st.session_state.volunteer_id}")
+                email = st.text_input("📧 Email", value=volunteer.email, disabled=True, key=f"profile_email_{st.session_state.volunteer_id}")
+                phone = st.text_input("📱 Phone Number", value=volunteer.phone, key=f"profile_phone_{st.session_state.volunteer_id}")
                 
                 st.markdown("### ℹ️ Additional Information")
-                bio = st.text_area("📝 Bio", value=volunteer_data.get('bio', ''), key=f"profile_bio_{st.session_state.volunteer_id}")
+                bio = st.text_area("📝 Bio", value=volunteer.bio, key=f"profile_bio_{st.session_state.volunteer_id}")
                 # Organize skills into categories
                 st.markdown("#### 🎯 Skills & Expertise")
                 leadership_skills = st.multiselect(
                     "Leadership & Management",
                     ["Team Leadership", "Event Planning", "Project Management", "Conflict Resolution", "Decision Making", "Fundraising"],
-                    default=[skill for skill in volunteer_data.get('skills', []) if skill in ["Team Leadership", "Event Planning", "Project Management", "Conflict Resolution", "Decision Making", "Fundraising"]],
+                    default=[skill for skill in volunteer.skills if skill in ["Team Leadership", "Event Planning", "Project Management", "Conflict Resolution", "Decision Making", "Fundraising"]],
                     key=f"profile_leadership_skills_{st.session_state.volunteer_id}"
                 )
                 communication_skills = st.multiselect(
                     "Communication & Media",
                     ["Public Speaking", "Writing", "Social Media", "Photography", "Videography", "Translation", "Sign Language"],
-                    default=[skill for skill in volunteer_data.get('skills', []) if skill in ["Public Speaking", "Writing", "Social Media", "Photography", "Videography", "Translation", "Sign Language"]],
+                    default=[skill for skill in volunteer.skills if skill in ["Public Speaking", "Writing", "Social Media", "Photography", "Videography", "Translation", "Sign Language"]],
                     key=f"profile_communication_skills_{st.session_state.volunteer_id}"
                 )
                 teaching_skills = st.multiselect(
                     "Education & Training",
                     ["Teaching", "Tutoring", "Mentoring", "Curriculum Development", "Special Education", "ESL Teaching"],
-                    default=[skill for skill in volunteer_data.get('skills', []) if skill in ["Teaching", "Tutoring", "Mentoring", "Curriculum Development", "Special Education", "ESL Teaching"]],
+                    default=[skill for skill in volunteer.skills if skill in ["Teaching", "Tutoring", "Mentoring", "Curriculum Development", "Special Education", "ESL Teaching"]],
                     key=f"profile_teaching_skills_{st.session_state.volunteer_id}"
                 )
                 technical_skills = st.multiselect(
                     "Technical & Professional",
                     ["First Aid", "CPR", "IT Support", "Web Development", "Data Analysis", "Graphic Design", "Legal Knowledge"],
-                    default=[skill for skill in volunteer_data.get('skills', []) if skill in ["First Aid", "CPR", "IT Support", "Web Development", "Data Analysis", "Graphic Design", "Legal Knowledge"]],
+                    default=[skill for skill in volunteer.skills if skill in ["First Aid", "CPR", "IT Support", "Web Development", "Data Analysis", "Graphic Design", "Legal Knowledge"]],
                     key=f"profile_technical_skills_{st.session_state.volunteer_id}"
                 )
                 support_skills = st.multiselect(
                     "Support & Care",
                     ["Counseling", "Elder Care", "Child Care", "Animal Care", "Crisis Support", "Mental Health Support"],
-                    default=[skill for skill in volunteer_data.get('skills', []) if skill in ["Counseling", "Elder Care", "Child Care", "Animal Care", "Crisis Support", "Mental Health Support"]],
+                    default=[skill for skill in volunteer.skills if skill in ["Counseling", "Elder Care", "Child Care", "Animal Care", "Crisis Support", "Mental Health Support"]],
                     key=f"profile_support_skills_{st.session_state.volunteer_id}"
                 )
                 
@@ -595,6 +605,14 @@ elif current_page == 'profile':
                         })
                         st.success("✅ Profile updated successfully!")
                         st.session_state.volunteer_name = name
+                        auth_token.update_profile('volunteer', st.session_state.volunteer_id, {
+                            'name': name,
+                            'email': volunteer.email,
+                            'phone': phone,
+                            'contact_number': volunteer.contact_number,
+                            'bio': bio,
+                            'skills': skills
+                        })
                     except Exception as e:
                         st.error(f"❌ Error updating profile: {str(e)}")
     except Exception as e:
@@ -605,47 +623,29 @@ elif current_page == 'notifications':
     try:
         # Fetch notifications without ordering in the query
         notifications_ref = db.collection('notifications').where('volunteer_id', '==', st.session_state.volunteer_id).stream()
-        notifications_list = list(notifications_ref)
+        notifications_list = [Notification.from_snapshot(snapshot) for snapshot in notifications_ref]
         
         if not notifications_list:
             st.info("📭 No notifications at the moment.")
         else:
             # Sort notifications by timestamp in memory
-            sorted_notifications = sorted(
-                notifications_list,
-                key=lambda x: x.to_dict().get('timestamp', MIN_DATETIME).replace(tzinfo=None) if x.to_dict().get('timestamp') and x.to_dict().get('timestamp').tzinfo else x.to_dict().get('timestamp', MIN_DATETIME),
-                reverse=True
-            )
+            sorted_notifications = sorted(notifications_list, key=lambda n: n.sort_key, reverse=True)
             
             for notification in sorted_notifications:
-                notif_data = notification.to_dict()
-                # Format timestamp
-                timestamp = notif_data.get('timestamp')
-                if timestamp:
-                    if isinstance(timestamp, datetime):
-                        # Convert to naive datetime if it has timezone info
-                        if timestamp.tzinfo is not None:
-                            timestamp = timestamp.replace(tzinfo=None)
-                        formatted_time = timestamp.strftime('%d-%m-%Y %H:%M:%S')
-                    else:
-                        formatted_time = str(timestamp)
-                else:
-                    formatted_time = 'Recent'
-                
                 # Mark notification as read
-                if not notif_data.get('read', False):
+                if not notification.read:
                     db.collection('notifications').document(notification.id).update({'read': True})
                 
                 # Get notification status indicator
-                status_icon = '🔵' if not notif_data.get('read', False) else '⚪'
+                status_icon = '🔵' if not notification.read else '⚪'
                 
                 st.markdown(f"""
                     <div class="event-card">
-                        <div class="event-title">{status_icon} {notif_data.get('title', 'Notification')}</div>
+                        <div class="event-title">{status_icon} {notification.title}</div>
                         <div class="event-details">
-                            <p>📝 {notif_data.get('message', '')}</p>
-                            <p>⏰ {formatted_time}</p>
-                            <p>🏷️ Type: {notif_data.get('type', 'general').replace('_', ' ').title()}</p>
+                            <p>📝 {notification.message}</p>
+                            <p>⏰ {notification.time_label}</p>
+                            <p>🏷️ Type: {notification.type_label}</p>
                         </div>
                     </div>
                 """, unsafe_allow_html=True)
@@ -655,3 +655,12 @@ elif current_page == 'notifications':
 st.markdown("<br>", unsafe_allow_html=True)
 
 st.markdown("<br>", unsafe_allow_html=True)
+
+# Save auth/navigation state for other replicas and hand out the signed token
+session_store.persist()
+auth_token.persist()
+
+# Optional ?debug=perf panel, then close out this rerun's profile and metrics
+metrics.render_debug_panel()
+profiling.finish()
+metrics.finish_rerun()
@@ -3,6 +3,9 @@ import firebase_admin
 from firebase_admin import firestore
 from firebase_admin import credentials
 import os
+from services import metrics, firestore_instrumentation, auth_token, email_registry
+
+metrics.start_rerun('Volunteer_Login')
 
 # Get the absolute path to the config directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,12 +23,18 @@ if not firebase_admin._apps:
 
 try:
     db = firestore.client()
+    firestore_instrumentation.install()
 except Exception as e:
     st.error(f"Error connecting to Firestore: {str(e)}")
     st.stop()
 
 st.set_page_config(page_title="Volunteer Login")
 
+# A valid token cookie logs the browser straight back in without a database read
+restored_user_type = auth_token.restore()
+if restored_user_type:
+    st.switch_page(auth_token.DASHBOARDS[restored_user_type])
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -205,21 +214,22 @@ with col2:
     if st.button("Login"):
         if email and password:
             try:
-                # Query the volunteers collection
-                volunteer_ref = db.collection('volunteers').where('email', '==', email).limit(1).get()
+                # Point read through the emails/{email} reservation
+                volunteer_ref = email_registry.find_account(db, 'volunteer', email)
                 
-                if not volunteer_ref:
+                if volunteer_ref is None:
                     st.error("No account found with this email")
                 else:
-                    volunteer_data = volunteer_ref[0].to_dict()
+                    volunteer_data = volunteer_ref.to_dict()
                     if volunteer_data.get('password') == password:
                         # Store volunteer info in session state
                         st.session_state.authenticated = True
                         st.session_state.user_type = 'volunteer'
-                        st.session_state.volunteer_id = volunteer_ref[0].id
+                        st.session_state.volunteer_id = volunteer_ref.id
                         st.session_state.volunteer_name = volunteer_data.get('name', '')
                         st.session_state.volunteer_email = email
                         st.session_state.selected_tab = "Feed"
+                        auth_token.issue_volunteer(volunteer_ref.id, volunteer_data)
                         st.success("Login successful!")
                         st.switch_page("pages/Volunteer_Dashboard.py")
                     else:
@@ -237,3 +247,7 @@ with col2:
 
     if st.button("Sign Up", key="volunteer_signup_btn", type="secondary"):
         st.switch_page("pages/Volunteer_Signup.py")
+
+# Clears the token cookie after a logout
+auth_token.persist()
+metrics.finish_rerun()
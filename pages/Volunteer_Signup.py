@@ -3,6 +3,9 @@ import firebase_admin
 from firebase_admin import firestore
 from firebase_admin import credentials
 import os
+from services import metrics, firestore_instrumentation, email_registry
+
+metrics.start_rerun('Volunteer_Signup')
 
 # Get the absolute path to the config directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +23,7 @@ if not firebase_admin._apps:
 
 try:
     db = firestore.client()
+    firestore_instrumentation.install()
 except Exception as e:
     st.error(f"Error connecting to Firestore: {str(e)}")
     st.stop()
@@ -222,20 +226,17 @@ with col2:
         if name and email and password and confirm_password and contact_number:
             if password == confirm_password:
                 try:
-                    # Check if email already exists
-                    existing_volunteer = db.collection('volunteers').where('email', '==', email).get()
-                    if not existing_volunteer:
-                        # Add volunteer to Firestore
-                        volunteer_ref = db.collection('volunteers').add({
-                            'name': name,
-                            'email': email,
-                            'password': password,
-                            'contact_number': contact_number
-                        })
-                        st.success("Volunteer registered successfully!")
-                        st.switch_page("pages/Volunteer_Login.py")
-                    else:
-                        st.error("A volunteer with this email already exists")
+                    # Reserve the email and add the volunteer in one transaction
+                    email_registry.register_account(db, 'volunteer', {
+                        'name': name,
+                        'email': email,
+                        'password': password,
+                        'contact_number': contact_number
+                    })
+                    st.success("Volunteer registered successfully!")
+                    st.switch_page("pages/Volunteer_Login.py")
+                except email_registry.EmailAlreadyRegistered:
+                    st.error("A volunteer with this email already exists")
                 except Exception as e:
                     st.error(f"Error during registration: {str(e)}")
             else:
@@ -244,3 +245,5 @@ with col2:
             st.warning("Please fill in all fields")
         
         st.markdown('</div>', unsafe_allow_html=True)
+
+metrics.finish_rerun()
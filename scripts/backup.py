@@ -0,0 +1,262 @@
+"""Back up Firestore collections to compressed JSONL and restore them.
+
+    python -m scripts.backup export backups/2026-01-31
+    python -m scripts.backup restore backups/2026-01-31
+    python -m scripts.backup restore backups/2026-01-31 --collections events applications
+
+Export runs one paginated reader per collection concurrently and writes each collection to
+<dir>/<collection>.jsonl.gz. manifest.json, written last, lists document counts and sha256
+checksums, so a directory without one is an incomplete backup.
+
+The event archive (VOL_LINK_ARCHIVE_DIR, see services.archive) is copied to <dir>/archive with
+its own checksums, since archived documents no longer exist in Firestore.
+
+Restore verifies the checksums, then writes each collection with a pool of batched writers.
+Progress is checkpointed to <dir>/restore_state.json; re-running an interrupted restore
+resumes where it stopped (pass --restart to begin again, e.g. for another project). The
+archive files are copied back into VOL_LINK_ARCHIVE_DIR last. Pointed at the Firestore
+emulator it also seeds staging and benchmark environments from a real snapshot.
+"""
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from scripts.common import get_db
+from services import archive, email_registry, hours, recurrence, sync
+from services.batch_writer import MAX_BATCH_SIZE, BatchWriter
+from services.serialization import dumps, loads
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Restored in this order, so e.g. events exist before the applications that point at them
+COLLECTIONS = ('volunteers', 'organizations', email_registry.EMAILS_COLLECTION, recurrence.SERIES_COLLECTION,
+               'events', 'applications', 'notifications', hours.LEDGER_COLLECTION, hours.TOTALS_COLLECTION)
+MANIFEST_FILE = 'manifest.json'
+STATE_FILE = 'restore_state.json'
+# Subdirectory of a backup holding the copy of the event archive
+ARCHIVE_SUBDIR = 'archive'
+PAGE_SIZE = 1000
+
+
+def _path(directory, collection):
+    return os.path.join(directory, f'{collection}.jsonl.gz')
+
+
+def _write_json(path, data):
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_collection(db, collection, directory, page_size=PAGE_SIZE):
+    """Stream a collection page by page (ordered by document id) into gzip JSONL"""
+    started = time.perf_counter()
+    path = _path(directory, collection)
+    count = 0
+    after = None
+    with gzip.open(f'{path}.tmp', 'wt', encoding='utf-8') as f:
+        while True:
+            query = db.collection(collection).order_by('__name__').limit(page_size)
+            if after is not None:
+                query = query.start_after(after)
+            page = list(query.stream())
+            for snapshot in page:
+                f.write(dumps({'id': snapshot.id, 'data': snapshot.to_dict() or {}}) + '\n')
+            count += len(page)
+            if len(page) < page_size:
+                break
+            after = page[-1]
+    os.replace(f'{path}.tmp', path)
+    logger.info(f"Exported {count} documents from '{collection}' in {time.perf_counter() - started:.1f}s")
+    return {'file': os.path.basename(path), 'documents': count, 'bytes': os.path.getsize(path),
+            'sha256': sha256_file(path)}
+
+
+def export_archive(directory, archive_dir=archive.ARCHIVE_DIR):
+    """Copy the event archive's files into the backup; returns {file: {'bytes', 'sha256'}}"""
+    if not os.path.isdir(archive_dir):
+        logger.warning(f'No event archive at {archive_dir}; nothing archived is backed up')
+        return {}
+    target = os.path.join(directory, ARCHIVE_SUBDIR)
+    os.makedirs(target, exist_ok=True)
+    entries = {}
+    for filename in sorted(os.listdir(archive_dir)):
+        if not (filename.endswith('.jsonl.gz') or filename == archive.INDEX_FILE):
+            continue
+        path = os.path.join(target, filename)
+        shutil.copyfile(os.path.join(archive_dir, filename), path)
+        entries[filename] = {'bytes': os.path.getsize(path), 'sha256': sha256_file(path)}
+    logger.info(f'Copied {len(entries)} archive files from {archive_dir}')
+    return entries
+
+
+def export(db, directory, collections=COLLECTIONS, page_size=PAGE_SIZE, archive_dir=archive.ARCHIVE_DIR):
+    """Export `collections` concurrently, one reader each, copy the archive, then write the manifest"""
+    os.makedirs(directory, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=len(collections)) as executor:
+        futures = {collection: executor.submit(export_collection, db, collection, directory, page_size)
+                   for collection in collections}
+        entries = {collection: future.result() for collection, future in futures.items()}
+    manifest = {'created_at': datetime.now().isoformat(), 'collections': entries,
+                'archive': export_archive(directory, archive_dir) if archive_dir else {}}
+    _write_json(os.path.join(directory, MANIFEST_FILE), manifest)
+    logger.info(f"Backup of {sum(entry['documents'] for entry in entries.values())} documents written to {directory}")
+    return manifest
+
+
+def load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise SystemExit(f'{directory} has no {MANIFEST_FILE}; the backup is missing or incomplete')
+
+
+def _verify_file(path, sha256):
+    if not os.path.exists(path) or sha256_file(path) != sha256:
+        raise SystemExit(f'{path} is missing or does not match its checksum')
+
+
+def verify(directory, manifest, collections, with_archive=False):
+    """Raise SystemExit if any collection's (or archive) file is missing or fails its checksum"""
+    for collection in collections:
+        entry = manifest['collections'].get(collection)
+        if entry is None:
+            raise SystemExit(f"'{collection}' is not in this backup")
+        _verify_file(os.path.join(directory, entry['file']), entry['sha256'])
+    if with_archive:
+        for filename, entry in manifest.get('archive', {}).items():
+            _verify_file(os.path.join(directory, ARCHIVE_SUBDIR, filename), entry['sha256'])
+
+
+def commit_chunk(db, collection, chunk):
+    # Restamp synced collections so running apps' delta caches pick the restored documents up
+    stamp = collection in sync.SYNCED_COLLECTIONS
+    with BatchWriter(db) as writer:
+        for doc_id, data in chunk:
+            writer.set(db.collection(collection).document(doc_id), sync.stamped(data) if stamp else data)
+    return len(chunk)
+
+
+def restore_collection(db, collection, directory, state, state_path, workers):
+    """Write one collection from its backup file, skipping documents an earlier run restored
+
+    Chunks commit out of order, so the checkpoint only advances past chunks whose
+    predecessors have all committed; on resume at most the in-flight chunks are rewritten,
+    which is harmless because every write is a set().
+    """
+    started = time.perf_counter()
+    done = state.get(collection, 0)
+    if done == 'complete':
+        logger.info(f"'{collection}' already restored; skipping")
+        return 0
+    with gzip.open(_path(directory, collection), 'rt', encoding='utf-8') as f:
+        records = ((record['id'], record['data'])
+                   for record in (loads(line, db) for line in itertools.islice(f, done, None)))
+        chunk_end = {}
+        finished = set()
+        in_flight = {}
+        next_start = done
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                chunk = list(itertools.islice(records, MAX_BATCH_SIZE))
+                if chunk:
+                    future = executor.submit(commit_chunk, db, collection, chunk)
+                    in_flight[future] = next_start
+                    chunk_end[next_start] = next_start + len(chunk)
+                    next_start += len(chunk)
+                if not in_flight:
+                    break
+                # Keep memory bounded; drain everything once the file is exhausted
+                if len(in_flight) < workers * 2 and chunk:
+                    continue
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    future.result()
+                    finished.add(in_flight.pop(future))
+                while done in finished:
+                    finished.discard(done)
+                    done = chunk_end.pop(done)
+                state[collection] = done
+                _write_json(state_path, state)
+    state[collection] = 'complete'
+    _write_json(state_path, state)
+    logger.info(f"Restored {done} documents to '{collection}' in {time.perf_counter() - started:.1f}s")
+    return done
+
+
+def restore_archive(directory, manifest, archive_dir=archive.ARCHIVE_DIR):
+    """Copy the backed-up archive files into `archive_dir`, replacing files of the same name"""
+    files = manifest.get('archive', {})
+    if not files:
+        return 0
+    os.makedirs(archive_dir, exist_ok=True)
+    for filename in files:
+        target = os.path.join(archive_dir, filename)
+        shutil.copyfile(os.path.join(directory, ARCHIVE_SUBDIR, filename), f'{target}.tmp')
+        os.replace(f'{target}.tmp', target)
+    logger.info(f'Restored {len(files)} archive files to {archive_dir}')
+    return len(files)
+
+
+def restore(db, directory, collections=None, workers=8, restart=False, archive_dir=archive.ARCHIVE_DIR):
+    """Restore `collections` (default: all), and the archive unless `archive_dir` is None"""
+    manifest = load_manifest(directory)
+    collections = [collection for collection in COLLECTIONS if collection in manifest['collections']
+                   and (not collections or collection in collections)]
+    verify(directory, manifest, collections, with_archive=bool(archive_dir))
+    state_path = os.path.join(directory, STATE_FILE)
+    state = {}
+    if not restart and os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+        logger.info(f'Resuming restore from {state_path}')
+    for collection in collections:
+        restore_collection(db, collection, directory, state, state_path, workers)
+    if archive_dir:
+        restore_archive(directory, manifest, archive_dir)
+    logger.info(f"Restore of {', '.join(collections)} finished")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='back up collections to a directory')
+    export_parser.add_argument('directory')
+    export_parser.add_argument('--collections', nargs='+', choices=COLLECTIONS, default=list(COLLECTIONS))
+    export_parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    export_parser.add_argument('--skip-archive', action='store_true', help="Do not copy the event archive")
+    restore_parser = subparsers.add_parser('restore', help='restore collections from a backup directory')
+    restore_parser.add_argument('directory')
+    restore_parser.add_argument('--collections', nargs='+', choices=COLLECTIONS)
+    restore_parser.add_argument('--workers', type=int, default=8, help="Concurrent batch writers")
+    restore_parser.add_argument('--restart', action='store_true', help="Ignore saved progress and restore everything")
+    restore_parser.add_argument('--skip-archive', action='store_true', help="Do not copy the event archive back")
+    args = parser.parse_args()
+
+    archive_dir = None if args.skip_archive else archive.ARCHIVE_DIR
+    if args.command == 'export':
+        export(get_db(), args.directory, args.collections, args.page_size, archive_dir)
+    else:
+        restore(get_db(), args.directory, args.collections, args.workers, args.restart, archive_dir)
+
+
+if __name__ == '__main__':
+    main()
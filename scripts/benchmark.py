@@ -0,0 +1,221 @@
+"""Page-level benchmarks for the volunteer and organization dashboards.
+
+Each case runs one page branch through streamlit's AppTest against whatever Firestore
+FIRESTORE_EMULATOR_HOST points at (seed it first with scripts.seed_data), and records
+wall time, Firestore reads/queries/writes and peak Python memory.
+
+    python -m scripts.benchmark                       # compare against benchmarks/baseline.json
+    python -m scripts.benchmark --save-baseline       # record a new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from google.cloud.firestore_v1 import document, query, batch, transaction
+
+from scripts.common import ROOT_DIR, get_db
+
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+VOLUNTEER_PAGE = os.path.join(ROOT_DIR, 'pages', 'Volunteer_Dashboard.py')
+ORG_PAGE = os.path.join(ROOT_DIR, 'pages', 'Organization_Dashboard.py')
+METRICS = ['wall_time_s', 'reads', 'queries', 'writes', 'peak_memory_mb']
+
+
+def volunteer_state(volunteer_id, page):
+    return {
+        'authenticated': True,
+        'user_type': 'volunteer',
+        'volunteer_id': volunteer_id,
+        'volunteer_name': 'Benchmark Volunteer',
+        'volunteer_email': 'benchmark@example.org',
+        'current_page': page,
+    }
+
+
+def org_state(org_id, page):
+    return {
+        'authenticated': True,
+        'org_id': org_id,
+        'org_name': 'Benchmark Organization',
+        'current_page': page,
+    }
+
+
+def search_events(at, volunteer_id, term):
+    at.text_input(key=f"search_events_input_{volunteer_id}_search").input(term).run()
+
+
+def build_cases(volunteer_id, org_id, search_term):
+    return {
+        'volunteer.feed': (VOLUNTEER_PAGE, volunteer_state(volunteer_id, 'feed'), None),
+        'volunteer.search': (VOLUNTEER_PAGE, volunteer_state(volunteer_id, 'search'),
+                             lambda at: search_events(at, volunteer_id, search_term)),
+        'volunteer.my_events': (VOLUNTEER_PAGE, volunteer_state(volunteer_id, 'my_events'), None),
+        'volunteer.notifications': (VOLUNTEER_PAGE, volunteer_state(volunteer_id, 'notifications'), None),
+        'org.dashboard': (ORG_PAGE, org_state(org_id, 'dashboard'), None),
+        'org.applications': (ORG_PAGE, org_state(org_id, 'applications'), None),
+        'org.notifications': (ORG_PAGE, org_state(org_id, 'notifications'), None),
+    }
+
+
+class OpCounter:
+    """Counts Firestore traffic by patching the client library for the duration of a run"""
+
+    def __init__(self):
+        self.reads = 0
+        self.queries = 0
+        self.writes = 0
+
+    @contextmanager
+    def patched(self):
+        counter = self
+        originals = {
+            (document.DocumentSnapshot, '__init__'): document.DocumentSnapshot.__init__,
+            (query.Query, 'stream'): query.Query.stream,
+            (batch.WriteBatch, 'commit'): batch.WriteBatch.commit,
+            (transaction.Transaction, '_commit'): transaction.Transaction._commit,
+        }
+
+        def snapshot_init(self, *args, **kwargs):
+            counter.reads += 1
+            originals[(document.DocumentSnapshot, '__init__')](self, *args, **kwargs)
+
+        def query_stream(self, *args, **kwargs):
+            counter.queries += 1
+            return originals[(query.Query, 'stream')](self, *args, **kwargs)
+
+        def batch_commit(self, *args, **kwargs):
+            counter.writes += len(self._write_pbs)
+            return originals[(batch.WriteBatch, 'commit')](self, *args, **kwargs)
+
+        def transaction_commit(self, *args, **kwargs):
+            counter.writes += len(self._write_pbs)
+            return originals[(transaction.Transaction, '_commit')](self, *args, **kwargs)
+
+        patches = {
+            (document.DocumentSnapshot, '__init__'): snapshot_init,
+            (query.Query, 'stream'): query_stream,
+            (batch.WriteBatch, 'commit'): batch_commit,
+            (transaction.Transaction, '_commit'): transaction_commit,
+        }
+        for (owner, name), replacement in patches.items():
+            setattr(owner, name, replacement)
+        try:
+            yield self
+        finally:
+            for (owner, name), original in originals.items():
+                setattr(owner, name, original)
+
+
+def run_case(script, session_state, interaction, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(script, default_timeout=timeout)
+    for key, value in session_state.items():
+        at.session_state[key] = value
+
+    counter = OpCounter()
+    tracemalloc.start()
+    started = time.perf_counter()
+    with counter.patched():
+        at.run()
+        if interaction:
+            interaction(at)
+    wall_time = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if at.exception:
+        raise RuntimeError(f"{script} raised: {at.exception[0].message}")
+    return {
+        'wall_time_s': wall_time,
+        'reads': counter.reads,
+        'queries': counter.queries,
+        'writes': counter.writes,
+        'peak_memory_mb': peak / (1024 * 1024),
+    }
+
+
+def run_benchmarks(cases, repeat, timeout):
+    results = {}
+    for name, (script, session_state, interaction) in cases.items():
+        runs = [run_case(script, session_state, interaction, timeout) for _ in range(repeat)]
+        # Median wall time, but the counts from the first (cold) run
+        results[name] = dict(runs[0], wall_time_s=statistics.median(run['wall_time_s'] for run in runs))
+        print(f"{name:<26} {results[name]['wall_time_s']:>8.3f}s  reads={results[name]['reads']:<8} "
+              f"queries={results[name]['queries']:<5} writes={results[name]['writes']:<6} "
+              f"peak={results[name]['peak_memory_mb']:.1f}MB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return human readable regressions, where a metric grew by more than the tolerance"""
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric in METRICS:
+            before = baseline[name].get(metric)
+            after = metrics[metric]
+            if before is None:
+                continue
+            if after > before * (1 + tolerance) and after - before > 1e-3:
+                regressions.append(f"{name}.{metric}: {before:.3f} -> {after:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard page branches with AppTest")
+    parser.add_argument('--volunteer-id', default='vol-000000')
+    parser.add_argument('--org-id', default='org-000000')
+    parser.add_argument('--search-term', default='food')
+    parser.add_argument('--case', action='append', help="Run only the named case(s)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=600, help="Per-run AppTest timeout in seconds")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative growth per metric")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    # Pages initialize Firebase themselves; doing it once here keeps that out of the timings
+    get_db()
+    sys.path.insert(0, ROOT_DIR)
+
+    cases = build_cases(args.volunteer_id, args.org_id, args.search_term)
+    if args.case:
+        cases = {name: case for name, case in cases.items() if name in args.case}
+    results = run_benchmarks(cases, args.repeat, args.timeout)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import os
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_KEY_PATH = os.path.join(ROOT_DIR, 'config', 'demo.json')
+
+
+def get_db(key_path=None):
+    """Initialize Firebase Admin SDK for command line tools and return a Firestore client
+
+    Set FIRESTORE_EMULATOR_HOST (e.g. localhost:8080) to run against a local emulator
+    instead of the production project.
+    """
+    if not firebase_admin._apps:
+        key_path = key_path or os.environ.get('VOL_LINK_SERVICE_ACCOUNT', DEFAULT_KEY_PATH)
+        cred = credentials.Certificate(key_path)
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
@@ -0,0 +1,48 @@
+"""Run versioned schema migrations (migrations/NNNN_name.py) against Firestore.
+
+    python -m scripts.migrate status                     # list migrations and their progress
+    python -m scripts.migrate run                        # run every incomplete migration in order
+    python -m scripts.migrate run --to 0002 --dry-run    # count what 0001-0002 would write, change nothing
+    python -m scripts.migrate run --rate 200             # at most 200 documents scanned per second
+
+Progress is checkpointed to schema_migrations/{version} after every page, so an interrupted
+run picks up after the last committed page; completed migrations are never re-run.
+"""
+import argparse
+import logging
+
+from scripts.common import get_db
+from services import migrations
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def show_status(runner, scripts):
+    for script in scripts:
+        state = runner.state(script)
+        status = state.get('status', 'pending')
+        progress = f" - {state.get('migrated', 0)} of {state.get('scanned', 0)} documents migrated" if state else ''
+        print(f"{script.version}  {status:<9} {script.name}{progress}\n      {script.description}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('status', help='list migrations and their progress')
+    run_parser = subparsers.add_parser('run', help='run incomplete migrations in version order')
+    run_parser.add_argument('--to', help='last version to run, e.g. 0002')
+    run_parser.add_argument('--dry-run', action='store_true', help='count the writes without making them')
+    run_parser.add_argument('--rate', type=float, help='maximum documents scanned per second')
+    run_parser.add_argument('--page-size', type=int, default=migrations.PAGE_SIZE)
+    args = parser.parse_args()
+
+    scripts = migrations.discover()
+    if args.command == 'status':
+        show_status(migrations.MigrationRunner(get_db()), scripts)
+        return
+    runner = migrations.MigrationRunner(get_db(), page_size=args.page_size, rate=args.rate, dry_run=args.dry_run)
+    runner.run_pending(scripts, args.to)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Run periodic background jobs against Firestore outside the Streamlit process.
+
+    python -m scripts.scheduler                # loop forever, sweeping every 5 minutes
+    python -m scripts.scheduler --once         # run every job once and exit (cron style)
+
+Jobs:
+    lifecycle  - mark past events and their accepted applications as completed
+    snapshots  - copy event date, location and status changes into their applications' event snapshots
+    archive    - move events older than VOL_LINK_ARCHIVE_AFTER_MONTHS (default 12), with their applications
+                 and notifications, into gzip JSONL files under VOL_LINK_ARCHIVE_DIR (default data/archive)
+    series     - generate recurring series' events up to VOL_LINK_SERIES_HORIZON_WEEKS (default 8) ahead
+    reminders  - email accepted volunteers 24h and 2h before their event (VOL_LINK_REMINDER_OFFSETS);
+                 runs on its own thread and wakes exactly when the next reminder is due
+"""
+import argparse
+import logging
+import signal
+import threading
+import time
+
+from scripts.common import get_db
+from services import archive, event_snapshots, lifecycle, recurrence, reminders
+from services.mail_service import EmailService
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300
+
+
+def run_lifecycle(db):
+    totals = lifecycle.sweep_completed_events(db)
+    logger.info(f"Lifecycle sweep completed {totals['events']} events and {totals['applications']} applications")
+
+
+def run_reminders_once(db):
+    scheduler = reminders.ReminderScheduler(db, EmailService())
+    scheduler.refresh()
+    logger.info(f'Sent {scheduler.run_due()} reminder emails')
+
+
+def run_snapshots(db):
+    totals = event_snapshots.SnapshotPropagator(db).run()
+    logger.info(f"Snapshot propagation checked {totals['events']} events and updated {totals['applications']} applications")
+
+
+def run_archive(db):
+    archive.EventArchiver(db).run()
+
+
+def run_series(db):
+    logger.info(f'Series expansion created {recurrence.extend_all_series(db)} events')
+
+
+JOBS = {
+    'lifecycle': run_lifecycle,
+    'archive': run_archive,
+    'series': run_series,
+    'snapshots': run_snapshots,
+}
+# Not interval based: the reminder heap decides when it next needs to wake up
+THREADED_JOBS = {
+    'reminders': run_reminders_once,
+}
+
+
+def run_jobs(db, names):
+    for name in names:
+        started = time.perf_counter()
+        try:
+            JOBS[name](db)
+        except Exception as e:
+            # One failing job must not stop the others or the loop
+            logger.error(f'Job {name} failed: {str(e)}')
+        else:
+            logger.info(f'Job {name} finished in {time.perf_counter() - started:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='seconds between runs')
+    parser.add_argument('--once', action='store_true', help='run the jobs once and exit')
+    parser.add_argument('--jobs', nargs='+', choices=sorted({**JOBS, **THREADED_JOBS}),
+                        default=sorted({**JOBS, **THREADED_JOBS}))
+    parser.add_argument('--reminder-refresh', type=float, default=900,
+                        help='seconds between reloads of upcoming events for reminders')
+    args = parser.parse_args()
+    periodic_jobs = [name for name in args.jobs if name in JOBS]
+
+    db = get_db()
+    if args.once:
+        run_jobs(db, periodic_jobs)
+        for name in args.jobs:
+            if name in THREADED_JOBS:
+                THREADED_JOBS[name](db)
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    threads = []
+    if 'reminders' in args.jobs:
+        scheduler = reminders.ReminderScheduler(db, EmailService())
+        thread = threading.Thread(target=scheduler.run_forever, args=(stop, args.reminder_refresh),
+                                  name='vol-link-reminders', daemon=True)
+        thread.start()
+        threads.append(thread)
+    logger.info(f"Scheduler started: {', '.join(args.jobs)}; periodic jobs every {args.interval:.0f}s")
+    while not stop.is_set():
+        started = time.monotonic()
+        run_jobs(db, periodic_jobs)
+        stop.wait(max(0.0, args.interval - (time.monotonic() - started)))
+    for thread in threads:
+        thread.join(timeout=30)
+    logger.info('Scheduler stopped')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""Generate synthetic volunteers, organizations, events, applications and notifications.
+
+Meant for benchmark and staging environments; point it at the Firestore emulator:
+
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python -m scripts.seed_data --events 10000 \
+        --applications 100000 --notifications 1000000
+
+Document IDs are deterministic (vol-000000, org-000000, ...) and activity follows a
+Zipf-like distribution, so vol-000000 and org-000000 are always the busiest accounts.
+"""
+import argparse
+import bisect
+import itertools
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+
+from scripts.common import get_db
+from services.batch_writer import BatchWriter, MAX_BATCH_SIZE
+from services import email_registry, sync
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Meera", "Arjun", "Divya", "Karthik", "Sneha",
+               "Rohan", "Kavya", "Aditya", "Lakshmi", "Sanjay", "Nisha", "Ravi", "Pooja", "Manoj", "Deepa"]
+LAST_NAMES = ["Sharma", "Iyer", "Patel", "Reddy", "Nair", "Gupta", "Menon", "Singh", "Rao", "Kumar",
+              "Das", "Joshi", "Pillai", "Verma", "Chopra"]
+ORG_PREFIXES = ["Green", "Helping", "Bright", "United", "Hope", "Community", "Open", "Kind", "Rising", "Shared"]
+ORG_SUFFIXES = ["Hands Foundation", "Futures Trust", "Earth Collective", "Hearts Society", "Food Bank",
+                "Learning Circle", "Care Network", "Animal Rescue", "Youth Club", "Relief Fund"]
+EVENT_KINDS = ["Beach Cleanup", "Food Drive", "Tree Plantation", "Tutoring Session", "Blood Donation Camp",
+               "Shelter Meal Service", "Senior Home Visit", "Fundraising Walk", "Book Donation Drive",
+               "Animal Shelter Day", "Health Awareness Camp", "Coding Workshop", "Disaster Relief Packing"]
+LOCATIONS = ["Chennai", "Bengaluru", "Mumbai", "Hyderabad", "Pune", "Delhi", "Kochi", "Coimbatore",
+             "Madurai", "Mysuru", "Kolkata", "Ahmedabad"]
+SKILLS = ["Teaching", "First Aid", "Event Planning", "Social Media", "Photography", "Leadership",
+          "Communication", "Fundraising", "Public Speaking", "Counseling", "Animal Care", "Elderly Care",
+          "Child Care", "Food Service", "Logistics", "IT Support", "Driving", "Cooking", "Gardening",
+          "Environmental Conservation", "Tutoring", "Disaster Response", "Community Outreach"]
+APPLICATION_STATUSES = ['pending', 'accepted', 'rejected']
+APPLICATION_STATUS_WEIGHTS = [0.5, 0.35, 0.15]
+# Consecutive repeat draws after which application pairs stop being sampled
+MAX_REJECTIONS = 1000
+
+
+def zipf_cum_weights(n):
+    """Cumulative 1/rank weights so low IDs receive most of the activity"""
+    return list(itertools.accumulate(1.0 / (rank + 1) for rank in range(n)))
+
+
+def pick(rng, cum_weights):
+    """Draw an index from cumulative weights in O(log n)"""
+    return bisect.bisect_left(cum_weights, rng.random() * cum_weights[-1])
+
+
+def volunteer_docs(rng, count):
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield f"vol-{i:06d}", {
+            'name': name,
+            'email': f"volunteer{i}@example.org",
+            'password': 'password',
+            'contact_number': f"9{rng.randrange(10 ** 9):09d}",
+            'phone': f"9{rng.randrange(10 ** 9):09d}",
+            'bio': f"{name} enjoys volunteering in {rng.choice(LOCATIONS)}.",
+            'skills': rng.sample(SKILLS, rng.randint(1, 5)),
+        }
+
+
+def organization_docs(rng, count):
+    for i in range(count):
+        yield f"org-{i:06d}", {
+            'name': f"{rng.choice(ORG_PREFIXES)} {rng.choice(ORG_SUFFIXES)} {i}",
+            'email': f"org{i}@example.org",
+            'password': 'password',
+            'description': 'A community organization running volunteer programs.',
+            'contact_number': f"8{rng.randrange(10 ** 9):09d}",
+            'website': f"https://org{i}.example.org",
+        }
+
+
+def event_docs(rng, count, orgs, now):
+    org_weights = zipf_cum_weights(len(orgs))
+    for i in range(count):
+        org_id, org_name = orgs[pick(rng, org_weights)]
+        kind = rng.choice(EVENT_KINDS)
+        location = rng.choice(LOCATIONS)
+        event_date = (now + timedelta(days=rng.randint(-180, 180))).replace(
+            hour=rng.choice([8, 9, 10, 14, 16, 18]), minute=0, second=0, microsecond=0)
+        yield f"evt-{i:06d}", {
+            'title': f"{kind} - {location}",
+            'description': f"Join us for a {kind.lower()} in {location}.",
+            'date': event_date,
+            'location': location,
+            'required_volunteers': rng.randint(5, 100),
+            'skills_required': rng.sample(SKILLS, rng.randint(0, 4)),
+            'org_id': org_id,
+            'org_name': org_name,
+            'status': 'active',
+            'applications': [],
+            'created_at': event_date - timedelta(days=rng.randint(7, 60)),
+        }
+
+
+def application_pairs(rng, volunteers, events, seen):
+    """Distinct (volunteer index, event index) pairs, skewed by Zipf weights
+
+    Once MAX_REJECTIONS samples in a row hit pairs in `seen` (the rest of the Zipf tail is
+    rarely drawn), the unused pairs are walked in shuffled order instead.
+    """
+    volunteer_weights = zipf_cum_weights(len(volunteers))
+    event_weights = zipf_cum_weights(len(events))
+    rejections = 0
+    while rejections < MAX_REJECTIONS:
+        pair = (pick(rng, volunteer_weights), pick(rng, event_weights))
+        if pair in seen:
+            rejections += 1
+            continue
+        rejections = 0
+        yield pair
+    logger.info(f"Application sampling saturated after {len(seen)} pairs; filling from the unused pairs")
+    event_order = list(range(len(events)))
+    rng.shuffle(event_order)
+    for event_index in event_order:
+        volunteer_order = list(range(len(volunteers)))
+        rng.shuffle(volunteer_order)
+        for volunteer_index in volunteer_order:
+            if (volunteer_index, event_index) not in seen:
+                yield volunteer_index, event_index
+
+
+def application_docs(rng, count, volunteers, events, now):
+    seen = set()
+    generated = 0
+    for volunteer_index, event_index in application_pairs(rng, volunteers, events, seen):
+        if generated >= count:
+            break
+        seen.add((volunteer_index, event_index))
+        volunteer_id, volunteer_name, volunteer_email = volunteers[volunteer_index]
+        event_id, event_title, org_id, org_name, event_date = events[event_index]
+        yield f"app-{generated:07d}", {
+            'event_id': event_id,
+            'volunteer_id': volunteer_id,
+            'volunteer_name': volunteer_name,
+            'volunteer_email': volunteer_email,
+            'event_title': event_title,
+            'org_id': org_id,
+            'organization_name': org_name,
+            'status': rng.choices(APPLICATION_STATUSES, APPLICATION_STATUS_WEIGHTS)[0],
+            'applied_at': min(event_date, now) - timedelta(days=rng.randint(1, 30)),
+        }
+        generated += 1
+
+
+def notification_docs(rng, count, volunteers, orgs, events, now):
+    volunteer_weights = zipf_cum_weights(len(volunteers))
+    org_weights = zipf_cum_weights(len(orgs))
+    for i in range(count):
+        event_id, event_title, _, _, _ = rng.choice(events)
+        data = {
+            'timestamp': now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+            'read': rng.random() < 0.7,
+            'event_id': event_id,
+        }
+        if rng.random() < 0.5:
+            volunteer_id = volunteers[pick(rng, volunteer_weights)][0]
+            accepted = rng.random() < 0.7
+            data.update({
+                'volunteer_id': volunteer_id,
+                'title': 'Application Accepted' if accepted else 'Application Status Update',
+                'message': f"Your application for {event_title} has been accepted!" if accepted
+                else f"Your application for {event_title} was not accepted at this time.",
+                'type': 'application_accepted' if accepted else 'application_rejected',
+            })
+        else:
+            org_id = orgs[pick(rng, org_weights)][0]
+            volunteer_name = rng.choice(volunteers)[1]
+            data.update({
+                'org_id': org_id,
+                'title': 'New Volunteer Application',
+                'message': f"{volunteer_name} has applied for {event_title}",
+                'type': 'new_application',
+            })
+        yield f"ntf-{i:07d}", data
+
+
+def email_reservation_docs(volunteers, org_emails):
+    """emails/{normalized email} reservations so logins are point reads"""
+    for volunteer_id, _, email in volunteers:
+        yield email_registry.normalize_email(email), {'volunteer_id': volunteer_id}
+    for org_id, email in org_emails:
+        yield email_registry.normalize_email(email), {'org_id': org_id}
+
+
+def commit_chunk(db, collection, chunk):
+    stamp = collection in sync.SYNCED_COLLECTIONS
+    with BatchWriter(db) as writer:
+        for doc_id, data in chunk:
+            writer.set(db.collection(collection).document(doc_id), sync.stamped(data) if stamp else data)
+    return len(chunk)
+
+
+def write_collection(db, collection, docs, workers):
+    """Write (doc_id, data) pairs in 500-op batches on a bounded pool of writer threads"""
+    started = time.perf_counter()
+    written = 0
+    in_flight = set()
+    docs = iter(docs)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            chunk = list(itertools.islice(docs, MAX_BATCH_SIZE))
+            if not chunk:
+                break
+            in_flight.add(executor.submit(commit_chunk, db, collection, chunk))
+            # Keep memory bounded when generating millions of documents
+            if len(in_flight) >= workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                written += sum(future.result() for future in done)
+        written += sum(future.result() for future in in_flight)
+    logger.info(f"Wrote {written} documents to '{collection}' in {time.perf_counter() - started:.1f}s")
+    return written
+
+
+def seed(db, volunteers, orgs, events, applications, notifications, seed_value=42, workers=8):
+    rng = random.Random(seed_value)
+    now = datetime.now().replace(microsecond=0)
+
+    volunteer_rows = []
+    def track_volunteers():
+        for doc_id, data in volunteer_docs(rng, volunteers):
+            volunteer_rows.append((doc_id, data['name'], data['email']))
+            yield doc_id, data
+    write_collection(db, 'volunteers', track_volunteers(), workers)
+
+    org_rows = []
+    org_emails = []
+    def track_orgs():
+        for doc_id, data in organization_docs(rng, orgs):
+            org_rows.append((doc_id, data['name']))
+            org_emails.append((doc_id, data['email']))
+            yield doc_id, data
+    write_collection(db, 'organizations', track_orgs(), workers)
+    write_collection(db, email_registry.EMAILS_COLLECTION,
+                     email_reservation_docs(volunteer_rows, org_emails), workers)
+
+    event_rows = []
+    def track_events():
+        for doc_id, data in event_docs(rng, events, org_rows, now):
+            event_rows.append((doc_id, data['title'], data['org_id'], data['org_name'], data['date']))
+            yield doc_id, data
+    write_collection(db, 'events', track_events(), workers)
+
+    max_applications = len(volunteer_rows) * len(event_rows)
+    if applications > max_applications:
+        logger.warning(f"Only {max_applications} distinct applications possible; capping")
+        applications = max_applications
+    write_collection(db, 'applications', application_docs(rng, applications, volunteer_rows, event_rows, now), workers)
+    write_collection(db, 'notifications',
+                     notification_docs(rng, notifications, volunteer_rows, org_rows, event_rows, now), workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed Firestore with synthetic Vol-Link data")
+    parser.add_argument('--volunteers', type=int, default=5000)
+    parser.add_argument('--orgs', type=int, default=200)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--applications', type=int, default=100000)
+    parser.add_argument('--notifications', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible datasets")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent batch writers")
+    args = parser.parse_args()
+
+    seed(get_db(), args.volunteers, args.orgs, args.events, args.applications, args.notifications,
+         seed_value=args.seed, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
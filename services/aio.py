@@ -0,0 +1,101 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+
+from firebase_admin import firestore_async
+
+logger = logging.getLogger(__name__)
+
+# Seconds a page waits on a bridged coroutine before giving up
+BRIDGE_TIMEOUT = float(os.environ.get('VOL_LINK_ASYNC_TIMEOUT', '30'))
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+_async_db = None
+_async_db_lock = threading.Lock()
+
+
+def loop():
+    """The process-wide event loop, started on a daemon thread on first use
+
+    Every session's async Firestore and SMTP work is multiplexed on this one thread,
+    instead of each in-flight request holding a thread of its own.
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            new_loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(new_loop)
+                new_loop.call_soon(ready.set)
+                new_loop.run_forever()
+
+            _loop_thread = threading.Thread(target=run, name='vol-link-aio', daemon=True)
+            _loop_thread.start()
+            ready.wait()
+            _loop = new_loop
+    return _loop
+
+
+def _schedule(coro):
+    """Start `coro` on the loop in a copy of the caller's context; returns a concurrent Future"""
+    result = concurrent.futures.Future()
+
+    def copy_outcome(task):
+        if task.cancelled():
+            result.set_exception(concurrent.futures.CancelledError())
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+
+    def start():
+        # The task copies this callback's context, so metrics still see the caller's rerun
+        asyncio.ensure_future(coro).add_done_callback(copy_outcome)
+
+    loop().call_soon_threadsafe(start, context=contextvars.copy_context())
+    return result
+
+
+def run(coro, timeout=BRIDGE_TIMEOUT):
+    """Run `coro` on the shared loop and block the calling (script) thread for its result"""
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError('aio.run() called from the event loop thread; await the coroutine instead')
+    return _schedule(coro).result(timeout)
+
+
+def submit(coro, description='background task'):
+    """Run `coro` on the shared loop without waiting; failures are logged, not raised
+
+    A coroutine that returns False (as the email senders do when a send fails) counts as failed.
+    """
+    future = _schedule(coro)
+
+    def log_failure(done):
+        if done.exception() is not None:
+            logger.error(f'Error in {description}: {str(done.exception())}')
+        elif done.result() is False:
+            logger.warning(f'{description} failed')
+
+    future.add_done_callback(log_failure)
+    return future
+
+
+async def _create_async_db():
+    return firestore_async.client()
+
+
+def async_db():
+    """The Firestore AsyncClient, created on the loop thread so its channel binds to that loop"""
+    global _async_db
+    with _async_db_lock:
+        if _async_db is None:
+            _async_db = run(_create_async_db())
+    return _async_db
@@ -0,0 +1,213 @@
+import functools
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+
+from services import event_snapshots, parallel, sync
+from services.batch_writer import BatchWriter
+from services.models import to_naive_utc
+from services.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# One gzip JSONL file per event month, e.g. data/archive/2024-03.jsonl.gz, plus index.json
+ARCHIVE_DIR = os.environ.get('VOL_LINK_ARCHIVE_DIR', os.path.join('data', 'archive'))
+# Events dated before the first day of the month this many months back are archived
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('VOL_LINK_ARCHIVE_AFTER_MONTHS', '12'))
+PAGE_SIZE = 100
+INDEX_FILE = 'index.json'
+
+
+def cutoff(months=ARCHIVE_AFTER_MONTHS, now=None):
+    now = now or datetime.now()
+    month_index = now.year * 12 + now.month - 1 - months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _month(value):
+    value = to_naive_utc(value)
+    return value.strftime('%Y-%m') if value else 'undated'
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_index(archive_dir):
+    """{'orgs': {org_id: [months]}, 'volunteers': {volunteer_id: [months]}}"""
+    try:
+        with open(os.path.join(archive_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'orgs': {}, 'volunteers': {}}
+
+
+class EventArchiver:
+    """Moves past events, their applications and notifications from Firestore to gzip JSONL
+
+    Each page is appended to its month files and fsynced before anything is deleted, so a
+    crash can only leave documents both archived and live; the next run archives them again
+    and readers keep the last copy of each document. Notifications with no event_id go by
+    their own timestamp.
+    """
+
+    def __init__(self, db, archive_dir=ARCHIVE_DIR, page_size=PAGE_SIZE):
+        self.db = db
+        self.archive_dir = archive_dir
+        self.page_size = page_size
+
+    def _query(self, before, after):
+        query = self.db.collection('events').where('date', '<', before).order_by('date')
+        if after is not None:
+            query = query.start_after(after)
+        return list(query.limit(self.page_size).stream())
+
+    def _related(self, event_ids):
+        """(applications, notifications) snapshots of `event_ids`, read in parallel 'in' chunks"""
+        calls = []
+        for collection in ('applications', 'notifications'):
+            for chunk in _chunks(event_ids, event_snapshots.IN_QUERY_LIMIT):
+                query = self.db.collection(collection).where('event_id', 'in', chunk)
+                calls.append(lambda query=query: parallel.stream_list(query))
+        results = parallel.run_parallel(*calls)
+        half = len(results) // 2
+        return ([snapshot for result in results[:half] for snapshot in result],
+                [snapshot for result in results[half:] for snapshot in result])
+
+    def _unlinked_notifications(self, before, after):
+        """(page, notifications without an event_id) of notifications sent before `before`"""
+        query = self.db.collection('notifications').where('timestamp', '<', before).order_by('timestamp')
+        if after is not None:
+            query = query.start_after(after)
+        page = list(query.limit(self.page_size).stream())
+        return page, [snapshot for snapshot in page if not (snapshot.to_dict() or {}).get('event_id')]
+
+    def _event_records(self, events, applications, notifications):
+        months = {event.id: _month((event.to_dict() or {}).get('date')) for event in events}
+        records = [('events', event, months[event.id]) for event in events]
+        for collection, snapshots in (('applications', applications), ('notifications', notifications)):
+            records.extend((collection, snapshot, months[(snapshot.to_dict() or {}).get('event_id')])
+                           for snapshot in snapshots)
+        return records
+
+    def _write(self, records):
+        """Append (collection, snapshot, month) records to their month files and update the index"""
+        lines = {}
+        index = _load_index(self.archive_dir)
+        for collection, snapshot, month in records:
+            data = snapshot.to_dict() or {}
+            lines.setdefault(month, []).append(dumps({'collection': collection, 'id': snapshot.id, 'data': data}))
+            for key, owner in (('orgs', data.get('org_id')), ('volunteers', data.get('volunteer_id'))):
+                if owner and month not in index[key].setdefault(owner, []):
+                    index[key][owner].append(month)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for month, month_lines in lines.items():
+            # Appending adds a gzip member; readers decompress every member in turn
+            with open(os.path.join(self.archive_dir, f'{month}.jsonl.gz'), 'ab') as f:
+                with gzip.GzipFile(fileobj=f, mode='wb') as member:
+                    member.write(('\n'.join(month_lines) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+        index_path = os.path.join(self.archive_dir, INDEX_FILE)
+        with open(f'{index_path}.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(f'{index_path}.tmp', index_path)
+
+    def _delete(self, events=(), applications=(), notifications=()):
+        with BatchWriter(self.db) as writer:
+            for application in applications:
+                sync.delete_with_tombstone(writer, application.reference)
+            for notification in notifications:
+                writer.delete(notification.reference)
+            # Events go last so a failed run never leaves applications pointing at a missing event
+            for event in events:
+                sync.delete_with_tombstone(writer, event.reference)
+
+    def run(self, before=None, dry_run=False):
+        """Archive every event dated before `before` (default: cutoff()); returns counts per collection"""
+        before = before or cutoff()
+        totals = {'events': 0, 'applications': 0, 'notifications': 0}
+        after = None
+        while True:
+            events = self._query(before, after)
+            if not events:
+                break
+            applications, notifications = self._related([event.id for event in events])
+            if not dry_run:
+                self._write(self._event_records(events, applications, notifications))
+                self._delete(events, applications, notifications)
+            totals['events'] += len(events)
+            totals['applications'] += len(applications)
+            totals['notifications'] += len(notifications)
+            after = events[-1]
+            if len(events) < self.page_size:
+                break
+        after = None
+        while True:
+            page, notifications = self._unlinked_notifications(before, after)
+            if notifications and not dry_run:
+                self._write([('notifications', notification, _month((notification.to_dict() or {}).get('timestamp')))
+                             for notification in notifications])
+                self._delete(notifications=notifications)
+            totals['notifications'] += len(notifications)
+            if len(page) < self.page_size:
+                break
+            after = page[-1]
+        logger.info(f"{'Would archive' if dry_run else 'Archived'} {totals['events']} events, "
+                    f"{totals['applications']} applications and {totals['notifications']} notifications "
+                    f"dated before {before:%Y-%m-%d}")
+        return totals
+
+
+@functools.lru_cache(maxsize=32)
+def _read_month(path, mtime, size):
+    """{(collection, doc_id): data} of one month file; mtime and size key the cache"""
+    documents = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = loads(line)
+                documents[(record['collection'], record['id'])] = record['data']
+    return documents
+
+
+def _documents(archive_dir, months):
+    documents = {}
+    for month in months:
+        path = os.path.join(archive_dir, f'{month}.jsonl.gz')
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        documents.update(_read_month(path, stat.st_mtime, stat.st_size))
+    return documents
+
+
+def archived_events(org_id, archive_dir=ARCHIVE_DIR):
+    """(event_id, data) of an organization's archived events, reading only that org's months"""
+    months = _load_index(archive_dir)['orgs'].get(org_id, [])
+    return [(doc_id, data) for (collection, doc_id), data in _documents(archive_dir, months).items()
+            if collection == 'events' and data.get('org_id') == org_id]
+
+
+def archived_applications(volunteer_id, archive_dir=ARCHIVE_DIR):
+    """(application_id, data) of a volunteer's archived applications
+
+    Applications without an event snapshot get one from the archived event, so callers
+    never need the (deleted) event document.
+    """
+    months = _load_index(archive_dir)['volunteers'].get(volunteer_id, [])
+    documents = _documents(archive_dir, months)
+    applications = []
+    for (collection, doc_id), data in documents.items():
+        if collection != 'applications' or data.get('volunteer_id') != volunteer_id:
+            continue
+        event_data = documents.get(('events', data.get('event_id')))
+        if 'version' not in (data.get(event_snapshots.SNAPSHOT_FIELD) or {}) and event_data is not None:
+            data = {**data, event_snapshots.SNAPSHOT_FIELD: event_snapshots.snapshot_from_data(
+                event_data, version=event_data.get('updated_at'))}
+        applications.append((doc_id, data))
+    return applications
@@ -0,0 +1,48 @@
+import asyncio
+
+from services.parallel import GET_ALL_CHUNK
+
+
+async def gather(*awaitables):
+    """Await independent Firestore calls concurrently and return their results in order"""
+    return list(await asyncio.gather(*awaitables))
+
+
+async def query_list(query):
+    """Materialize an AsyncQuery"""
+    return [snapshot async for snapshot in query.stream()]
+
+
+async def _get_chunk(adb, refs):
+    return [snapshot async for snapshot in adb.get_all(refs)]
+
+
+async def get_documents(adb, collection, doc_ids):
+    """Fetch documents by id with batched get_all calls; returns {doc_id: snapshot} for those that exist"""
+    unique_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id))
+    if not unique_ids:
+        return {}
+    collection_ref = adb.collection(collection)
+    results = await gather(*[
+        _get_chunk(adb, [collection_ref.document(doc_id) for doc_id in unique_ids[start:start + GET_ALL_CHUNK]])
+        for start in range(0, len(unique_ids), GET_ALL_CHUNK)
+    ])
+    return {snapshot.id: snapshot for snapshots in results for snapshot in snapshots if snapshot.exists}
+
+
+async def update_with_notification(adb, collection, doc_id, update, notification_data):
+    """Update a document and add the notification describing it in one round trip of latency"""
+    await gather(
+        adb.collection(collection).document(doc_id).update(update),
+        adb.collection('notifications').add(notification_data),
+    )
+
+
+async def add_with_notification(adb, collection, data, notification_data=None):
+    """Add a document, plus an optional notification, concurrently; returns the new document id"""
+    calls = [adb.collection(collection).add(data)]
+    if notification_data is not None:
+        calls.append(adb.collection('notifications').add(notification_data))
+    results = await gather(*calls)
+    _, doc_ref = results[0]
+    return doc_ref.id
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import time
+
+from services import metrics
+from services.mail_service import BulkSend, EmailService
+
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEmailService(EmailService):
+    """EmailService whose send methods are coroutines
+
+    The message templates are inherited, so e.g. `send_volunteer_acceptance_notification(...)`
+    returns an awaitable; hand it to `aio.submit` to send without blocking the page. Uses
+    aiosmtplib when installed, otherwise runs the blocking smtplib code in a worker thread.
+    """
+
+    async def _send_email(self, to_email, subject, body):
+        started = time.perf_counter()
+        success = await self._deliver(to_email, subject, body)
+        metrics.record_smtp(to_email, subject, time.perf_counter() - started, success)
+        return success
+
+    def _smtp(self):
+        return aiosmtplib.SMTP(hostname=self.smtp_server, port=self.smtp_port, use_tls=True, timeout=10)
+
+    async def _deliver(self, to_email, subject, body):
+        if aiosmtplib is None:
+            return await asyncio.to_thread(EmailService._deliver, self, to_email, subject, body)
+        if not self.sender_email or not self.app_password:
+            logger.error(f'Email credentials not properly configured. Sender: {self.sender_email is not None}, Password: {self.app_password is not None}')
+            return False
+        try:
+            async with self._smtp() as server:
+                await server.login(self.sender_email, self.app_password)
+                await server.send_message(self._create_message(to_email, subject, body))
+            logger.info(f'Email sent successfully to {to_email}')
+            return True
+        except aiosmtplib.SMTPAuthenticationError as e:
+            logger.error(f'SMTP Authentication failed. Please check your email and app password. Error: {str(e)}')
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            logger.error(f'Invalid recipient email address {to_email}: {str(e)}')
+        except Exception as e:
+            logger.error(f'Unexpected error while sending email to {to_email}: {str(e)}')
+        return False
+
+    async def send_bulk(self, messages):
+        """Send many (to_email, subject, body[, attachments]) messages over a single SMTP session"""
+        if aiosmtplib is None:
+            return await asyncio.to_thread(EmailService.send_bulk, self, messages)
+        run = BulkSend(self, messages)
+        while run.remaining:
+            try:
+                async with self._smtp() as server:
+                    await server.login(self.sender_email, self.app_password)
+                    while run.remaining:
+                        to_email, subject, body, attachments = run.next()
+                        try:
+                            await server.send_message(self._create_message(to_email, subject, body, attachments))
+                            run.sent()
+                        except aiosmtplib.SMTPServerDisconnected:
+                            raise
+                        except aiosmtplib.SMTPException as e:
+                            run.failed(e)
+            except aiosmtplib.SMTPServerDisconnected as e:
+                if not run.reconnect(e):
+                    break
+            except aiosmtplib.SMTPAuthenticationError as e:
+                logger.error(f'SMTP Authentication failed. Please check your email and app password. Error: {str(e)}')
+                break
+            except Exception as e:
+                logger.error(f'Unexpected error during bulk send: {str(e)}')
+                break
+        return run.finish()
@@ -0,0 +1,168 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+
+import streamlit as st
+
+from services import browser_cookies
+
+logger = logging.getLogger(__name__)
+
+COOKIE_NAME = 'vol_link_auth'
+TOKEN_TTL = int(os.environ.get('VOL_LINK_AUTH_TOKEN_TTL', str(12 * 3600)))
+TOKEN_VERSION = 1
+# Profile fields cached in the token so dashboards can skip the profile read
+PROFILE_FIELDS = {
+    'volunteer': ('name', 'email', 'phone', 'contact_number', 'bio', 'skills'),
+    'organization': ('name', 'email', 'phone', 'contact_number', 'description', 'website'),
+}
+DASHBOARDS = {
+    'volunteer': 'pages/Volunteer_Dashboard.py',
+    'organization': 'pages/Organization_Dashboard.py',
+}
+
+
+def _auth_secret():
+    try:
+        secret = st.secrets.get('VOL_LINK_AUTH_SECRET')
+    except Exception:
+        secret = None
+    return secret or os.environ.get('VOL_LINK_AUTH_SECRET')
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def encode(claims, secret):
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    signature = _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+    return f'{payload}.{signature}'
+
+
+def decode(token, secret, now=None):
+    """Claims of a valid, unexpired token, or None; checked locally without any database read"""
+    payload, _, signature = (token or '').partition('.')
+    if not payload or not signature:
+        return None
+    expected = _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+    if not hmac.compare_digest(expected, signature):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims.get('v') != TOKEN_VERSION or claims.get('exp', 0) < (now or time.time()):
+        return None
+    return claims
+
+
+def _issue(user_type, user_id, data, complete=True):
+    """Sign a token for the user; `complete` says `data` holds the whole profile, not just identity"""
+    secret = _auth_secret()
+    if not secret:
+        return None
+    profile = {field: data.get(field) for field in PROFILE_FIELDS[user_type] if data.get(field) is not None}
+    claims = {'v': TOKEN_VERSION, 'typ': user_type, 'sub': user_id,
+              'exp': int(time.time()) + TOKEN_TTL, 'profile': profile, 'full': complete}
+    token = encode(claims, secret)
+    if len(token) > browser_cookies.MAX_COOKIE_VALUE:
+        # A long bio or description would overflow the cookie; keep identity only
+        claims['profile'] = {field: profile[field] for field in ('name', 'email') if field in profile}
+        claims['full'] = False
+        token = encode(claims, secret)
+    if claims['full']:
+        st.session_state['profile_snapshot'] = profile
+    else:
+        # Pages must not prefill an edit form from a partial profile
+        st.session_state.pop('profile_snapshot', None)
+    st.session_state['_auth_token'] = token
+    st.session_state['_auth_exp'] = claims['exp']
+    st.session_state['_auth_cookie_pending'] = True
+    st.session_state.pop('_auth_logged_out', None)
+    return token
+
+
+def issue_volunteer(volunteer_id, volunteer_data):
+    """Call after a successful volunteer login"""
+    return _issue('volunteer', volunteer_id, volunteer_data)
+
+
+def issue_organization(org_id, org_data):
+    """Call after a successful organization login"""
+    return _issue('organization', org_id, org_data)
+
+
+def _apply(claims):
+    profile = claims.get('profile', {})
+    if claims['typ'] == 'volunteer':
+        st.session_state.authenticated = True
+        st.session_state.user_type = 'volunteer'
+        st.session_state.volunteer_id = claims['sub']
+        st.session_state.volunteer_name = profile.get('name', '')
+        st.session_state.volunteer_email = profile.get('email', '')
+    else:
+        st.session_state['org_id'] = claims['sub']
+        st.session_state['org_name'] = profile.get('name', '')
+    if claims.get('full'):
+        st.session_state['profile_snapshot'] = profile
+
+
+def restore():
+    """Log the browser back in from its token cookie; returns the user type or None"""
+    if st.session_state.get('authenticated') or st.session_state.get('org_id'):
+        return st.session_state.get('user_type') or 'organization'
+    if st.session_state.get('_auth_logged_out'):
+        return None
+    secret = _auth_secret()
+    token = browser_cookies.read_cookie(COOKIE_NAME)
+    if not secret or not token:
+        return None
+    claims = decode(token, secret)
+    if claims is None or claims.get('typ') not in PROFILE_FIELDS:
+        return None
+    _apply(claims)
+    st.session_state['_auth_token'] = token
+    st.session_state['_auth_exp'] = claims['exp']
+    return claims['typ']
+
+
+def profile_snapshot():
+    return st.session_state.get('profile_snapshot')
+
+
+def update_profile(user_type, user_id, profile):
+    """Re-issue the token after the user saved `profile`, their complete edited profile"""
+    if st.session_state.get('_auth_token'):
+        _issue(user_type, user_id, profile)
+
+
+def persist():
+    """Write a newly issued token to the browser, re-issuing it once half its lifetime has passed"""
+    if st.session_state.get('_auth_logged_out'):
+        # The flag stays until the next login: this connection keeps sending the old cookie
+        if st.session_state.get('_auth_logged_out') != 'cleared':
+            browser_cookies.delete_cookie(COOKIE_NAME)
+            st.session_state['_auth_logged_out'] = 'cleared'
+        return
+    exp = st.session_state.get('_auth_exp')
+    if exp and exp - time.time() < TOKEN_TTL / 2:
+        secret = _auth_secret()
+        claims = decode(st.session_state.get('_auth_token'), secret) if secret else None
+        if claims is not None:
+            _issue(claims['typ'], claims['sub'], claims.get('profile', {}), complete=claims.get('full', False))
+    if st.session_state.pop('_auth_cookie_pending', False):
+        browser_cookies.write_cookie(COOKIE_NAME, st.session_state['_auth_token'], TOKEN_TTL)
+
+
+def logout():
+    """Mark the session logged out; the next page's persist() clears the cookie"""
+    st.session_state['_auth_logged_out'] = True
@@ -0,0 +1,62 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects a WriteBatch with more than 500 operations
+MAX_BATCH_SIZE = 500
+
+
+class BatchWriter:
+    """Queues writes and commits them in WriteBatch chunks of at most 500 ops"""
+
+    def __init__(self, db, chunk_size=MAX_BATCH_SIZE):
+        self.db = db
+        self.chunk_size = min(chunk_size, MAX_BATCH_SIZE)
+        self.writes = 0
+        self.commits = 0
+        self._batch = None
+        self._pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def _queue(self):
+        if self._batch is None:
+            self._batch = self.db.batch()
+        self._pending += 1
+        return self._batch
+
+    def _maybe_commit(self):
+        if self._pending >= self.chunk_size:
+            self.flush()
+
+    def set(self, ref, data, merge=False):
+        self._queue().set(ref, data, merge=merge)
+        self._maybe_commit()
+
+    def create(self, ref, data):
+        self._queue().create(ref, data)
+        self._maybe_commit()
+
+    def update(self, ref, data):
+        self._queue().update(ref, data)
+        self._maybe_commit()
+
+    def delete(self, ref):
+        self._queue().delete(ref)
+        self._maybe_commit()
+
+    def flush(self):
+        """Commit whatever is queued; safe to call with nothing pending"""
+        if not self._pending:
+            return
+        self._batch.commit()
+        self.writes += self._pending
+        self.commits += 1
+        logger.debug(f'Committed batch of {self._pending} writes')
+        self._batch = None
+        self._pending = 0
@@ -0,0 +1,37 @@
+import json
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+# Browsers drop cookies over 4096 bytes; leave room for the name and attributes
+MAX_COOKIE_VALUE = 3800
+
+
+def read_cookie(name):
+    """Value of cookie `name` sent with this session's websocket handshake, or None"""
+    try:
+        from streamlit.web.server.websocket_headers import _get_websocket_headers
+        headers = _get_websocket_headers() or {}
+    except Exception:
+        return None
+    for part in headers.get('Cookie', '').split(';'):
+        key, _, value = part.strip().partition('=')
+        if key == name:
+            return value
+    return None
+
+
+def write_cookie(name, value, max_age):
+    """Set a cookie on the app's page
+
+    Streamlit cannot set response cookies, so a zero-height component writes it on the
+    parent document; such cookies cannot be HttpOnly and are only sent to the server
+    on the next websocket connection.
+    """
+    secure = '; Secure' if st.get_option('server.sslCertFile') else ''
+    cookie = f'{name}={value}; path=/; max-age={int(max_age)}; SameSite=Strict{secure}'
+    components.html(f'<script>window.parent.document.cookie = {json.dumps(cookie)};</script>', height=0)
+
+
+def delete_cookie(name):
+    write_cookie(name, '', 0)
@@ -0,0 +1,112 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+# Rendering only: this module is what the certificate worker processes import, so it
+# must stay free of Streamlit and Firestore imports.
+
+PAGE_WIDTH, PAGE_HEIGHT = 792, 612  # US Letter, landscape
+MARGIN = 72
+# (font, size, baseline y, text) lines, formatted with a certificate's fields and centered
+TEMPLATE = (
+    ('bold', 34, 470, 'Certificate of Appreciation'),
+    ('regular', 14, 415, 'This certificate is proudly presented to'),
+    ('bold', 30, 360, '{volunteer_name}'),
+    ('regular', 14, 310, 'in recognition of {hours} hours of volunteer service with'),
+    ('bold', 20, 275, '{org_name}'),
+    ('regular', 12, 235, '{events}'),
+    ('regular', 11, 120, 'Issued {issued}'),
+)
+FONTS = {'regular': ('F1', 'Helvetica'), 'bold': ('F2', 'Helvetica-Bold')}
+
+# Standard Helvetica advance widths (1/1000 em) for printable ASCII, used to center lines
+_REGULAR_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+_WIDTHS = {'regular': _REGULAR_WIDTHS, 'bold': _BOLD_WIDTHS}
+
+
+@dataclass(slots=True)
+class Certificate:
+    volunteer_id: str
+    volunteer_name: str
+    volunteer_email: str | None
+    org_name: str
+    event_titles: list
+    hours: float
+
+    @property
+    def filename(self):
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', self.volunteer_name).strip('_') or 'volunteer'
+        return f'certificate_{slug}_{self.volunteer_id[:6]}.pdf'
+
+    def fields(self, issued):
+        titles = self.event_titles
+        if len(titles) > 3:
+            events = f"{', '.join(titles[:3])} and {len(titles) - 3} more"
+        else:
+            events = ', '.join(titles)
+        return {'volunteer_name': self.volunteer_name, 'hours': f'{self.hours:g}',
+                'org_name': self.org_name, 'events': events, 'issued': issued}
+
+
+def _text_width(text, font, size):
+    widths = _WIDTHS[font]
+    return sum(widths[ord(char) - 32] if 32 <= ord(char) < 127 else 556 for char in text) * size / 1000
+
+
+def _fit(text, font, size):
+    """Trim `text` with an ellipsis until it fits between the margins"""
+    available = PAGE_WIDTH - 2 * MARGIN
+    if _text_width(text, font, size) <= available:
+        return text
+    while text and _text_width(text + '...', font, size) > available:
+        text = text[:-1]
+    return text.rstrip() + '...'
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render(certificate, template=TEMPLATE, issued=None):
+    """A one-page PDF certificate, written by hand with the two standard Helvetica fonts"""
+    fields = certificate.fields(issued or datetime.now().strftime('%B %d, %Y'))
+    commands = ['0.2 0.3 0.5 RG 4 w 36 36 720 540 re S', '1 w 46 46 700 520 re S']
+    for font, size, y, text in template:
+        line = _fit(text.format(**fields), font, size)
+        x = (PAGE_WIDTH - _text_width(line, font, size)) / 2
+        commands.append(f'BT /{FONTS[font][0]} {size} Tf {x:.1f} {y} Td ({_escape(line)}) Tj ET')
+    stream = '\n'.join(commands).encode('cp1252', errors='replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+         f'/Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> /Contents 4 0 R >>').encode(),
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+    ] + [f'<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>'.encode()
+         for _, name in FONTS.values()]
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(pdf)
@@ -0,0 +1,107 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from services import parallel
+from services.certificate_pdf import TEMPLATE, Certificate, render
+from services.hours import LEDGER_COLLECTION
+from services.models import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for rendering; defaults to one per core
+WORKERS = int(os.environ.get('VOL_LINK_CERT_WORKERS', '0')) or os.cpu_count() or 1
+# Below this many certificates, handing work to the pool costs more than rendering inline
+PARALLEL_THRESHOLD = 20
+CHUNK_SIZE = 25
+
+
+def collect(db, org_id, org_name, event_id=None, start=None, end=None):
+    """One Certificate per volunteer credited for `event_id`, or for events dated in [start, end)
+
+    Reads the hours ledger, so only attendance confirmed on the check-in page counts.
+    """
+    if event_id:
+        query = db.collection(LEDGER_COLLECTION).where('event_id', '==', event_id)
+    else:
+        query = db.collection(LEDGER_COLLECTION).where('org_id', '==', org_id)
+    by_volunteer = {}
+    for entry in query.stream():
+        data = entry.to_dict() or {}
+        event_date = to_naive_utc(data.get('event_date'))
+        if not event_id and (event_date is None or (start and event_date < start) or (end and event_date >= end)):
+            continue
+        volunteer_id = data.get('volunteer_id')
+        if not volunteer_id:
+            continue
+        certificate = by_volunteer.setdefault(volunteer_id, Certificate(
+            volunteer_id, data.get('volunteer_name', 'Volunteer'), None, org_name, [], 0.0))
+        certificate.hours += data.get('hours', 0)
+        if data.get('event_title') not in certificate.event_titles:
+            certificate.event_titles.append(data.get('event_title', 'Event'))
+    volunteers = parallel.get_documents(db, 'volunteers', by_volunteer)
+    for volunteer_id, certificate in by_volunteer.items():
+        snapshot = volunteers.get(volunteer_id)
+        if snapshot is not None:
+            certificate.volunteer_email = (snapshot.to_dict() or {}).get('email')
+    return sorted(by_volunteer.values(), key=lambda certificate: certificate.volunteer_name.lower())
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool():
+    """Process pool shared by every session, started lazily
+
+    Uses forkserver where available: forking the multi-threaded Streamlit server directly
+    can deadlock the children.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=context)
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def render_all(certificates, issued=None):
+    """Yield (certificate, pdf bytes) in order, rendering across the process pool"""
+    issued = issued or datetime.now().strftime('%B %d, %Y')
+    if len(certificates) < PARALLEL_THRESHOLD or WORKERS < 2:
+        for certificate in certificates:
+            yield certificate, render(certificate, issued=issued)
+        return
+    try:
+        rendered = pool().map(render, certificates, [TEMPLATE] * len(certificates),
+                              [issued] * len(certificates), chunksize=CHUNK_SIZE)
+        yield from zip(certificates, rendered)
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next batch starts a fresh one
+        _reset_pool()
+        raise
+
+
+def build_zip(certificates, issued=None):
+    """(zip bytes, [(certificate, pdf bytes)]) with each PDF added as it finishes rendering"""
+    buffer = io.BytesIO()
+    rendered = []
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for certificate, pdf in render_all(certificates, issued):
+            archive.writestr(certificate.filename, pdf)
+            rendered.append((certificate, pdf))
+    logger.info(f'Built {len(rendered)} certificates')
+    return buffer.getvalue(), rendered
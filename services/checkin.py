@@ -0,0 +1,233 @@
+import base64
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+from google.api_core.exceptions import NotFound
+
+from services import sync
+from services.batch_writer import MAX_BATCH_SIZE, BatchWriter
+from services.models import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Local SQLite (WAL) log of check-ins not yet written to Firestore
+LOG_PATH = os.environ.get('VOL_LINK_CHECKIN_LOG', os.path.join('data', 'checkins.db'))
+# Flush once this many check-ins are waiting, or the oldest has waited FLUSH_INTERVAL seconds
+FLUSH_SIZE = 25
+FLUSH_INTERVAL = 5.0
+# Synced and dead rows are kept this long so other door devices' rosters still see them
+PRUNE_AFTER = timedelta(days=2)
+# Values of the `flushed` column; dead rows point at applications that no longer exist
+PENDING, FLUSHED, DEAD = 0, 1, -1
+CODE_LENGTH = 6
+# Applications that may be checked in at the door
+CHECKIN_STATUSES = ('accepted', 'completed')
+
+
+def short_code(application_id):
+    """Six-character code for an application, stable so it can be printed or put in a QR code"""
+    digest = hashlib.sha1(application_id.encode()).digest()
+    return base64.b32encode(digest).decode()[:CODE_LENGTH]
+
+
+class Roster:
+    """Accepted applicants of one event, loaded once so each scan is a dict lookup"""
+
+    def __init__(self, event_id, applications):
+        self.event_id = event_id
+        self.entries = {}
+        self._by_code = {}
+        for application in applications:
+            data = application.to_dict() or {}
+            entry = {
+                'application_id': application.id,
+                'volunteer_id': data.get('volunteer_id'),
+                'name': data.get('volunteer_name', 'Volunteer'),
+                'email': data.get('volunteer_email'),
+                'code': short_code(application.id),
+                'checked_in_at': to_naive_utc(data.get('checked_in_at')),
+            }
+            self.entries[application.id] = entry
+            self._by_code.setdefault(entry['code'], []).append(entry)
+
+    @classmethod
+    def load(cls, db, event_id):
+        query = (db.collection('applications')
+                 .where('event_id', '==', event_id)
+                 .where('status', 'in', list(CHECKIN_STATUSES)))
+        return cls(event_id, list(query.stream()))
+
+    def lookup(self, text):
+        """Entries matching a scanned QR payload, an application id, a short code or a name"""
+        text = (text or '').strip()
+        if not text:
+            return []
+        if text in self.entries:
+            return [self.entries[text]]
+        matches = self._by_code.get(text.upper())
+        if matches:
+            return matches
+        needle = text.lower()
+        return [entry for entry in self.entries.values() if needle in entry['name'].lower()]
+
+    def apply_log(self, logged):
+        """Overlay check-ins from the local log that Firestore may not have yet"""
+        for application_id, checked_in_at in logged.items():
+            entry = self.entries.get(application_id)
+            if entry is not None and entry['checked_in_at'] is None:
+                entry['checked_in_at'] = checked_in_at
+
+    @property
+    def checked_in(self):
+        return sum(1 for entry in self.entries.values() if entry['checked_in_at'] is not None)
+
+
+class CheckinLog:
+    """Check-ins recorded on local disk first, then flushed to Firestore in batches
+
+    A mark is durable as soon as it is committed to SQLite, so losing connectivity (or
+    restarting) only delays the Firestore write; unflushed rows are retried on the next flush.
+    Rows whose application is gone (e.g. archived) are marked dead rather than retried forever.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS checkins '
+                           '(application_id TEXT PRIMARY KEY, event_id TEXT NOT NULL, '
+                           'checked_in_at TEXT NOT NULL, flushed INTEGER NOT NULL DEFAULT 0)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS checkins_pending ON checkins (flushed, checked_in_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS checkins_event ON checkins (event_id, flushed)')
+
+    def mark(self, event_id, application_id, now=None):
+        """Record a check-in; returns False if this application was already checked in"""
+        now = now or datetime.now()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO checkins (application_id, event_id, checked_in_at) VALUES (?, ?, ?)',
+                (application_id, event_id, now.isoformat()))
+        return cursor.rowcount == 1
+
+    def for_event(self, event_id):
+        """{application_id: checked_in_at} logged for an event, flushed or not"""
+        with self._lock:
+            rows = self._conn.execute('SELECT application_id, checked_in_at FROM checkins WHERE event_id = ?',
+                                      (event_id,)).fetchall()
+        return {application_id: datetime.fromisoformat(checked_in_at) for application_id, checked_in_at in rows}
+
+    def _where(self, state, event_id):
+        if event_id is None:
+            return 'flushed = ?', (state,)
+        return 'flushed = ? AND event_id = ?', (state, event_id)
+
+    def pending(self, event_id=None):
+        """(application_id, event_id, checked_in_at) not yet written, optionally for one event"""
+        where, params = self._where(PENDING, event_id)
+        with self._lock:
+            return self._conn.execute(
+                f'SELECT application_id, event_id, checked_in_at FROM checkins WHERE {where} '
+                'ORDER BY checked_in_at', params).fetchall()
+
+    def dead(self, event_id=None):
+        """How many check-ins were dropped because their application no longer exists"""
+        where, params = self._where(DEAD, event_id)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM checkins WHERE {where}', params).fetchone()[0]
+
+    def flush_due(self, event_id=None):
+        where, params = self._where(PENDING, event_id)
+        with self._lock:
+            count, oldest = self._conn.execute(
+                f'SELECT COUNT(*), MIN(checked_in_at) FROM checkins WHERE {where}', params).fetchone()
+        if not count:
+            return False
+        waited = (datetime.now() - datetime.fromisoformat(oldest)).total_seconds()
+        return count >= FLUSH_SIZE or waited >= FLUSH_INTERVAL
+
+    @staticmethod
+    def _write(writer, db, application_id, checked_in_at):
+        writer.update(db.collection('applications').document(application_id), sync.stamped({
+            'attendance': 'present',
+            'checked_in_at': datetime.fromisoformat(checked_in_at),
+        }))
+
+    def _retry_rows(self, db, rows):
+        """Write a failed chunk's rows one at a time; returns (flushed ids, dead ids)
+
+        Stops at the first error other than NotFound, which means the database is unreachable.
+        """
+        flushed, dead = [], []
+        for application_id, _, checked_in_at in rows:
+            try:
+                with BatchWriter(db) as writer:
+                    self._write(writer, db, application_id, checked_in_at)
+                flushed.append(application_id)
+            except NotFound:
+                logger.warning(f'Dropping check-in for missing application {application_id}')
+                dead.append(application_id)
+            except Exception as e:
+                logger.error(f'Error flushing check-in {application_id}, will retry: {str(e)}')
+                break
+        return flushed, dead
+
+    def _set_state(self, state, application_ids):
+        if application_ids:
+            with self._lock, self._conn:
+                self._conn.executemany('UPDATE checkins SET flushed = ? WHERE application_id = ?',
+                                       [(state, application_id) for application_id in application_ids])
+
+    def prune(self, now=None):
+        """Delete synced and dead rows older than PRUNE_AFTER"""
+        before = ((now or datetime.now()) - PRUNE_AFTER).isoformat()
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM checkins WHERE flushed != ? AND checked_in_at < ?',
+                                        (PENDING, before))
+        return cursor.rowcount
+
+    def flush(self, db, event_id=None):
+        """Write pending check-ins to their applications in batches; returns how many were written
+
+        A chunk that fails is retried row by row, so one bad row cannot hold back the rest;
+        rows that still fail stay pending for the next call. Rewriting any that did commit is harmless.
+        """
+        with self._flush_lock:
+            rows = self.pending(event_id)
+            if not rows:
+                return 0
+            started = time.perf_counter()
+            written = 0
+            for start in range(0, len(rows), MAX_BATCH_SIZE):
+                chunk = rows[start:start + MAX_BATCH_SIZE]
+                try:
+                    with BatchWriter(db) as writer:
+                        for application_id, _, checked_in_at in chunk:
+                            self._write(writer, db, application_id, checked_in_at)
+                    flushed, dead = [application_id for application_id, _, _ in chunk], []
+                except Exception as e:
+                    logger.error(f'Error flushing {len(chunk)} check-ins, retrying one at a time: {str(e)}')
+                    flushed, dead = self._retry_rows(db, chunk)
+                self._set_state(FLUSHED, flushed)
+                self._set_state(DEAD, dead)
+                written += len(flushed)
+                if len(flushed) + len(dead) < len(chunk):
+                    break
+            self.prune()
+            logger.info(f'Flushed {written} of {len(rows)} check-ins in {time.perf_counter() - started:.2f}s')
+            return written
+
+
+@st.cache_resource
+def get_log():
+    """The process-wide check-in log shared by every door device's session"""
+    return CheckinLog(LOG_PATH)
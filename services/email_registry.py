@@ -0,0 +1,116 @@
+import logging
+import os
+
+from firebase_admin import firestore
+
+logger = logging.getLogger(__name__)
+
+EMAILS_COLLECTION = 'emails'
+# account type -> (collection, field on the emails/{email} document holding the account id)
+ACCOUNT_TYPES = {
+    'volunteer': ('volunteers', 'volunteer_id'),
+    'organization': ('organizations', 'org_id'),
+}
+# Accounts created before email reservations existed are only found by an email query;
+# set to 0 once the reservation backfill migration has run
+LEGACY_FALLBACK = os.environ.get('VOL_LINK_EMAIL_LEGACY_FALLBACK', '1') != '0'
+
+
+class EmailAlreadyRegistered(Exception):
+    """An account of this type already uses the email address"""
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def email_ref(db, email):
+    return db.collection(EMAILS_COLLECTION).document(normalize_email(email))
+
+
+def register_account(db, account_type, data):
+    """Create the account and reserve its email in one transaction; returns the new account id
+
+    Concurrent signups with the same email conflict on the emails/{email} document, so
+    Firestore retries the loser, which then sees the reservation and raises
+    EmailAlreadyRegistered.
+    """
+    collection, id_field = ACCOUNT_TYPES[account_type]
+    reservation_ref = email_ref(db, data['email'])
+    account_ref = db.collection(collection).document()
+
+    @firestore.transactional
+    def create(transaction):
+        reservation = reservation_ref.get(transaction=transaction)
+        if reservation.exists and (reservation.to_dict() or {}).get(id_field):
+            raise EmailAlreadyRegistered(data['email'])
+        if LEGACY_FALLBACK:
+            legacy = db.collection(collection).where('email', '==', data['email']).limit(1)
+            if any(True for _ in transaction.get(legacy)):
+                raise EmailAlreadyRegistered(data['email'])
+        transaction.set(reservation_ref, {id_field: account_ref.id}, merge=True)
+        transaction.create(account_ref, data)
+
+    create(db.transaction())
+    return account_ref.id
+
+
+def update_account(db, account_type, account_id, old_email, data):
+    """Update the account with `data`, moving its email reservation if data['email'] changed
+
+    The new address is checked and reserved, the old reservation released and the account
+    updated in one transaction, so a conflicting signup either wins outright or sees the
+    new reservation. Raises EmailAlreadyRegistered if another account holds the address.
+    """
+    collection, id_field = ACCOUNT_TYPES[account_type]
+    account_ref = db.collection(collection).document(account_id)
+    new_email = data.get('email', old_email)
+    if normalize_email(new_email) == normalize_email(old_email):
+        account_ref.update(data)
+        return
+    new_ref = email_ref(db, new_email)
+    old_ref = email_ref(db, old_email)
+
+    @firestore.transactional
+    def move(transaction):
+        reservation = new_ref.get(transaction=transaction)
+        holder = (reservation.to_dict() or {}).get(id_field) if reservation.exists else None
+        if holder and holder != account_id:
+            raise EmailAlreadyRegistered(new_email)
+        if LEGACY_FALLBACK:
+            legacy = db.collection(collection).where('email', '==', new_email).limit(1)
+            if any(snapshot.id != account_id for snapshot in transaction.get(legacy)):
+                raise EmailAlreadyRegistered(new_email)
+        old = old_ref.get(transaction=transaction)
+        old_data = (old.to_dict() or {}) if old.exists else {}
+        transaction.set(new_ref, {id_field: account_id}, merge=True)
+        if old_data.get(id_field) == account_id:
+            # The other account type may share the reservation document
+            if set(old_data) == {id_field}:
+                transaction.delete(old_ref)
+            else:
+                transaction.update(old_ref, {id_field: firestore.DELETE_FIELD})
+        transaction.update(account_ref, data)
+
+    move(db.transaction())
+
+
+def find_account(db, account_type, email):
+    """Account snapshot for `email` via a point read of its reservation, or None"""
+    collection, id_field = ACCOUNT_TYPES[account_type]
+    reservation = email_ref(db, email).get()
+    account_id = (reservation.to_dict() or {}).get(id_field) if reservation.exists else None
+    if account_id:
+        account = db.collection(collection).document(account_id).get()
+        return account if account.exists else None
+    if not LEGACY_FALLBACK:
+        return None
+    legacy = db.collection(collection).where('email', '==', email).limit(1).get()
+    if not legacy:
+        return None
+    # Reserve the legacy account's email so its next login is a point read
+    try:
+        email_ref(db, email).set({id_field: legacy[0].id}, merge=True)
+    except Exception as e:
+        logger.error(f'Error backfilling email reservation for {account_type} {legacy[0].id}: {str(e)}')
+    return legacy[0]
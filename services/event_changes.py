@@ -0,0 +1,116 @@
+import logging
+from datetime import datetime
+
+from services import event_snapshots, sync
+from services.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+EDITABLE_FIELDS = {
+    'title': 'Title',
+    'description': 'Description',
+    'date': 'Date',
+    'duration_hours': 'Duration (hours)',
+    'location': 'Location',
+    'required_volunteers': 'Required Volunteers',
+}
+# Event field -> the copy of it kept on each application
+DENORMALIZED_FIELDS = {'title': 'event_title'}
+# Applicants who hear about edits and cancellations; rejected ones are left alone
+ACTIVE_APPLICATION_STATUSES = ('pending', 'accepted')
+
+
+def changed_fields(current, proposed):
+    """Subset of `proposed` that differs from the event's `current` data"""
+    return {field: value for field, value in proposed.items()
+            if field in EDITABLE_FIELDS and current.get(field) != value}
+
+
+def active_applications(db, event_id):
+    return [snapshot for snapshot in db.collection('applications').where('event_id', '==', event_id).stream()
+            if (snapshot.to_dict() or {}).get('status', 'pending') in ACTIVE_APPLICATION_STATUSES]
+
+
+def recipients(applications):
+    """(email, name) of each applicant with an email, once per address"""
+    found = {}
+    for snapshot in applications:
+        data = snapshot.to_dict() or {}
+        if data.get('volunteer_email'):
+            found.setdefault(data['volunteer_email'], data.get('volunteer_name', 'Volunteer'))
+    return list(found.items())
+
+
+def _notification(data, event_id, title, message, kind, now):
+    return {
+        'volunteer_id': data.get('volunteer_id'),
+        'title': title,
+        'message': message,
+        'timestamp': now,
+        'read': False,
+        'type': kind,
+        'event_id': event_id,
+    }
+
+
+def queue_edit(db, writer, event_id, event_title, changes, applications, now):
+    """Queue an edit of one event: its applications and notifications first, the event last"""
+    application_changes = {DENORMALIZED_FIELDS[field]: value for field, value in changes.items()
+                           if field in DENORMALIZED_FIELDS}
+    # Keep My Events current right away instead of waiting for the snapshot propagator
+    application_changes.update({f'{event_snapshots.SNAPSHOT_FIELD}.{field}': value for field, value in changes.items()
+                                if field in event_snapshots.SNAPSHOT_FIELDS})
+    title = changes.get('title', event_title)
+    message = f"{title} was updated: {', '.join(EDITABLE_FIELDS[field] for field in changes)} changed."
+    for snapshot in applications:
+        if application_changes:
+            writer.update(snapshot.reference, sync.stamped(application_changes))
+        writer.set(db.collection('notifications').document(),
+                   _notification(snapshot.to_dict() or {}, event_id, 'Event Updated', message, 'event_updated', now))
+    writer.update(db.collection('events').document(event_id), sync.stamped({**changes, 'edited_at': now}))
+
+
+def queue_cancel(db, writer, event_id, event_title, reason, applications, now):
+    """Queue a cancellation of one event: its active applications and notifications first, the event last"""
+    message = f"{event_title} has been cancelled." + (f" Reason: {reason}" if reason else '')
+    for snapshot in applications:
+        writer.update(snapshot.reference, sync.stamped({
+            'status': 'cancelled',
+            'cancelled_at': now,
+            f'{event_snapshots.SNAPSHOT_FIELD}.status': 'cancelled',
+        }))
+        writer.set(db.collection('notifications').document(),
+                   _notification(snapshot.to_dict() or {}, event_id, 'Event Cancelled', message, 'event_cancelled', now))
+    writer.update(db.collection('events').document(event_id), sync.stamped({
+        'status': 'cancelled',
+        'cancelled_at': now,
+        'cancellation_reason': reason,
+    }))
+
+
+def edit_event(db, event_id, event_title, changes, now=None):
+    """Apply `changes` to the event and fan them out to its applications in batched writes
+
+    Each active applicant gets a notification. The event document is written last, so it
+    only shows the edit once every application and notification write has been committed.
+    Returns (applications touched, email recipients).
+    """
+    now = now or datetime.now()
+    applications = active_applications(db, event_id)
+    with BatchWriter(db) as writer:
+        queue_edit(db, writer, event_id, event_title, changes, applications, now)
+    logger.info(f'Edited event {event_id}: {len(applications)} applications notified')
+    return len(applications), recipients(applications)
+
+
+def cancel_event(db, event_id, event_title, reason='', now=None):
+    """Cancel the event and its active applications in batched writes, notifying each applicant
+
+    Returns (applications cancelled, email recipients).
+    """
+    now = now or datetime.now()
+    applications = active_applications(db, event_id)
+    with BatchWriter(db) as writer:
+        queue_cancel(db, writer, event_id, event_title, reason, applications, now)
+    logger.info(f'Cancelled event {event_id}: {len(applications)} applications cancelled')
+    return len(applications), recipients(applications)
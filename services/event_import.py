@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from services import parallel, sync
+from services.batch_writer import MAX_BATCH_SIZE
+from services.models import DEFAULT_DURATION_HOURS
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ('title', 'date', 'location')
+OPTIONAL_COLUMNS = ('time', 'duration_hours', 'description', 'required_volunteers', 'skills_required')
+MAX_IMPORT_ROWS = 5000
+# Header row plus 1-based numbering, so reported rows match what the spreadsheet shows
+FIRST_DATA_ROW = 2
+# A time followed by Z or +hh:mm / -hhmm
+OFFSET_PATTERN = r'\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}:?\d{2})$'
+TEMPLATE_CSV = (
+    'title,date,time,duration_hours,location,description,required_volunteers,skills_required\n'
+    'Beach Cleanup,2025-06-07,09:00,3,Ocean Beach,Bring gloves,10,Environmental Conservation;Logistics\n'
+)
+
+
+class EventImportError(ValueError):
+    """The upload cannot be imported at all, e.g. unreadable or missing required columns"""
+
+
+def read_upload(uploaded_file):
+    """DataFrame of an uploaded .csv or .xlsx file, every cell read as text"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    try:
+        if extension == '.csv':
+            frame = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+        elif extension == '.xlsx':
+            frame = pd.read_excel(uploaded_file, dtype=str, keep_default_na=False, engine='openpyxl')
+        else:
+            raise EventImportError(f'Unsupported file type {extension or "(none)"}; upload a .csv or .xlsx file')
+    except EventImportError:
+        raise
+    except ImportError:
+        raise EventImportError('Reading .xlsx files needs openpyxl; pip install openpyxl or upload a CSV')
+    except Exception as e:
+        raise EventImportError(f'Could not read {uploaded_file.name}: {str(e)}')
+    frame.columns = [str(column).strip().lower().replace(' ', '_') for column in frame.columns]
+    missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+    if missing:
+        raise EventImportError(f"Missing required column(s): {', '.join(missing)}")
+    if len(frame) > MAX_IMPORT_ROWS:
+        raise EventImportError(f'{len(frame)} rows is more than the {MAX_IMPORT_ROWS} allowed per import')
+    for column in OPTIONAL_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = ''
+    return frame.fillna('').astype(str).apply(lambda column: column.str.strip())
+
+
+def validate(frame, now=None):
+    """Split rows into (valid, errors) with whole-column checks
+
+    `valid` gains parsed `starts_at`, `volunteers` and `duration` columns; `errors` is a list of
+    {'row', 'error'} dicts, one per failed check.
+    """
+    now = now or datetime.now()
+    date_text = (frame['date'] + ' ' + frame['time']).str.strip()
+    # One vectorized ISO pass; only rows in other formats pay for per-value inference.
+    # Values with a UTC offset are parsed on their own (pandas would apply one row's offset to
+    # the naive rows after it) and converted to naive UTC, as to_naive_utc does
+    has_offset = date_text.str.contains(OFFSET_PATTERN)
+    starts_at = pd.to_datetime(date_text.where(~has_offset), errors='coerce', format='ISO8601')
+    if has_offset.any():
+        starts_at[has_offset] = pd.to_datetime(date_text[has_offset], errors='coerce', format='ISO8601',
+                                               utc=True).dt.tz_localize(None)
+    unparsed = starts_at.isna() & (frame['date'] != '') & ~has_offset
+    if unparsed.any():
+        # Day first, matching the dd-mm-YYYY dates the app shows: 07/06/2025 is 7 June
+        starts_at[unparsed] = pd.to_datetime(date_text[unparsed], errors='coerce', format='mixed', dayfirst=True)
+    volunteers = pd.to_numeric(frame['required_volunteers'].replace('', '1'), errors='coerce')
+    duration = pd.to_numeric(frame['duration_hours'].replace('', str(DEFAULT_DURATION_HOURS)), errors='coerce')
+
+    checks = [
+        (frame['title'] == '', 'title is empty'),
+        (frame['location'] == '', 'location is empty'),
+        (frame['date'] == '', 'date is empty'),
+        ((frame['date'] != '') & starts_at.isna(), 'date/time could not be parsed'),
+        (starts_at < pd.Timestamp(now), 'date is in the past'),
+        (volunteers.isna() | (volunteers < 1) | (volunteers % 1 != 0), 'required_volunteers must be a whole number of at least 1'),
+        (duration.isna() | (duration <= 0), 'duration_hours must be a positive number'),
+    ]
+    errors = []
+    failed = pd.Series(False, index=frame.index)
+    for mask, message in checks:
+        failed |= mask
+        errors.extend({'row': int(position) + FIRST_DATA_ROW, 'error': message}
+                      for position in frame.index[mask])
+    errors.sort(key=lambda error: error['row'])
+
+    valid = frame[~failed].copy()
+    valid['starts_at'] = starts_at[~failed]
+    valid['volunteers'] = volunteers[~failed].astype(int)
+    valid['duration'] = duration[~failed]
+    return valid, errors
+
+
+def _skills(text):
+    return [skill.strip() for skill in text.replace(';', ',').split(',') if skill.strip()]
+
+
+def import_id(org_id, title, starts_at):
+    """Deterministic event id, so importing the same row twice cannot create a second event"""
+    key = f'{org_id}\n{title.strip().lower()}\n{starts_at.isoformat()}'
+    return f"import_{hashlib.sha1(key.encode()).hexdigest()[:20]}"
+
+
+def build_events(valid, org_id, org_name, now=None):
+    """(row, event_id, event_data) shaped like the events the create-event form writes"""
+    now = now or datetime.now()
+    events = []
+    for position, row in zip(valid.index, valid.itertuples(index=False)):
+        starts_at = row.starts_at.to_pydatetime()
+        events.append((int(position) + FIRST_DATA_ROW, import_id(org_id, row.title, starts_at), {
+            'title': row.title,
+            'description': row.description,
+            'date': starts_at,
+            'duration_hours': float(row.duration),
+            'location': row.location,
+            'required_volunteers': int(row.volunteers),
+            'skills_required': _skills(row.skills_required),
+            'org_id': org_id,
+            'org_name': org_name,
+            'status': 'active',
+            'applications': [],
+            'created_at': now,
+        }))
+    return events
+
+
+def import_events(db, events, chunk_size=MAX_BATCH_SIZE):
+    """Create events in WriteBatch chunks; returns (created, errors)
+
+    Rows already imported (or repeated within the file) are reported instead of written, so
+    uploading the same file again creates nothing. A chunk that fails to commit is reported
+    row by row so the org can re-upload just those.
+    """
+    created = 0
+    errors = []
+    existing = parallel.get_documents(db, 'events', [event_id for _, event_id, _ in events])
+    first_row = {}
+    to_create = []
+    for row, event_id, event_data in events:
+        if event_id in existing:
+            errors.append({'row': row, 'error': 'already imported'})
+        elif event_id in first_row:
+            errors.append({'row': row, 'error': f'duplicate of row {first_row[event_id]}'})
+        else:
+            first_row[event_id] = row
+            to_create.append((row, event_id, event_data))
+    collection_ref = db.collection('events')
+    for start in range(0, len(to_create), chunk_size):
+        chunk = to_create[start:start + chunk_size]
+        batch = db.batch()
+        for _, event_id, event_data in chunk:
+            batch.create(collection_ref.document(event_id), sync.stamped(event_data))
+        try:
+            batch.commit()
+            created += len(chunk)
+        except Exception as e:
+            logger.error(f'Error committing import batch of {len(chunk)} events: {str(e)}')
+            errors.extend({'row': row, 'error': f'not saved: {str(e)}'} for row, _, _ in chunk)
+    errors.sort(key=lambda error: error['row'])
+    return created, errors
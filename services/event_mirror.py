@@ -0,0 +1,115 @@
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from services.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Path of the on-disk mirror; unset disables it and caches cold-start from Firestore
+MIRROR_PATH = os.environ.get('VOL_LINK_EVENT_MIRROR')
+# Fields never written to local disk
+EXCLUDED_FIELDS = {'organizations': {'password'}}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS organizations (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    collection TEXT PRIMARY KEY,
+    watermark TEXT
+);
+"""
+
+
+class EventMirror:
+    """SQLite (WAL) copy of the events and organizations catalogues
+
+    Rows hold the raw Firestore data as JSON so the in-memory caches parse them exactly
+    as they would a snapshot. Each collection's delta-sync watermark is stored alongside
+    so a restarted process resumes with a delta query instead of a full stream.
+    """
+
+    COLLECTIONS = ('events', 'organizations')
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def _row(self, collection, doc_id, data):
+        excluded = EXCLUDED_FIELDS.get(collection, ())
+        return (doc_id, dumps({key: value for key, value in data.items() if key not in excluded}))
+
+    def _upsert_sql(self, collection):
+        return f'INSERT OR REPLACE INTO {collection} (id, data) VALUES (?, ?)'
+
+    def load(self, collection):
+        """Return ({doc_id: data}, watermark) for `collection`; empty dict if never mirrored"""
+        with self._lock:
+            state = self._conn.execute(
+                'SELECT watermark FROM sync_state WHERE collection = ?', (collection,)).fetchone()
+            if state is None:
+                return {}, None
+            rows = self._conn.execute(f'SELECT id, data FROM {collection}').fetchall()
+        watermark = datetime.fromisoformat(state[0]) if state[0] else None
+        return {doc_id: loads(data) for doc_id, data in rows}, watermark
+
+    def replace(self, collection, docs, watermark):
+        """Overwrite the mirror of `collection` after a full load"""
+        with self._lock, self._conn:
+            self._conn.execute(f'DELETE FROM {collection}')
+            self._conn.executemany(self._upsert_sql(collection),
+                                   [self._row(collection, doc_id, data) for doc_id, data in docs.items()])
+            self._set_watermark(collection, watermark)
+
+    def apply(self, collection, upserts, deletes, watermark):
+        """Write one delta sync's changes in a single transaction"""
+        with self._lock, self._conn:
+            if upserts:
+                self._conn.executemany(self._upsert_sql(collection),
+                                       [self._row(collection, doc_id, data) for doc_id, data in upserts.items()])
+            if deletes:
+                self._conn.executemany(f'DELETE FROM {collection} WHERE id = ?', [(doc_id,) for doc_id in deletes])
+            self._set_watermark(collection, watermark)
+
+    def _set_watermark(self, collection, watermark):
+        self._conn.execute('INSERT OR REPLACE INTO sync_state (collection, watermark) VALUES (?, ?)',
+                           (collection, watermark.isoformat() if watermark else None))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    """The process-wide mirror, or None when VOL_LINK_EVENT_MIRROR is not set"""
+    global _mirror
+    if not MIRROR_PATH:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            try:
+                _mirror = EventMirror(MIRROR_PATH)
+                logger.info(f'Event mirror opened at {MIRROR_PATH}')
+            except sqlite3.Error as e:
+                logger.error(f'Error opening event mirror {MIRROR_PATH}: {str(e)}')
+                return None
+    return _mirror
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+from services import sync
+from services.batch_writer import BatchWriter
+from services.models import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Map field on each application holding the event fields My Events and conflict checks use
+SNAPSHOT_FIELD = 'event_snapshot'
+SNAPSHOT_FIELDS = ('date', 'duration_hours', 'location', 'status')
+CHECKPOINT_PATH = os.environ.get('VOL_LINK_SNAPSHOT_CHECKPOINT', os.path.join('data', 'event_snapshots.json'))
+PAGE_SIZE = 300
+# Firestore caps the number of values in an 'in' filter
+IN_QUERY_LIMIT = 30
+
+
+def snapshot_from_data(data, version=None):
+    """Snapshot of a raw event document; `version` is the event's updated_at it was taken from"""
+    return {
+        'date': data.get('date'),
+        'duration_hours': data.get('duration_hours'),
+        'location': data.get('location'),
+        'status': data.get('status', 'active'),
+        'version': version,
+    }
+
+
+def snapshot_from_event(event):
+    """Snapshot of an Event model, written when a volunteer applies"""
+    return {'date': event.date, 'duration_hours': event.duration_hours, 'location': event.location,
+            'status': event.status, 'version': None}
+
+
+def is_current(snapshot, event_data):
+    """True when an application's snapshot already shows the event's date, location and status"""
+    if not snapshot or 'version' not in snapshot:
+        return False
+    return (to_naive_utc(snapshot.get('date')) == to_naive_utc(event_data.get('date'))
+            and snapshot.get('duration_hours') == event_data.get('duration_hours')
+            and snapshot.get('location') == event_data.get('location')
+            and snapshot.get('status') == event_data.get('status', 'active'))
+
+
+class SnapshotPropagator:
+    """Copies event changes into the snapshots on their applications
+
+    Follows events by updated_at from a watermark kept in a JSON checkpoint. Applications
+    whose snapshot already matches are not rewritten, so replaying a page is harmless.
+    """
+
+    def __init__(self, db, checkpoint_path=CHECKPOINT_PATH, page_size=PAGE_SIZE):
+        self.db = db
+        self.checkpoint_path = checkpoint_path
+        self.page_size = page_size
+        self.watermark = self._load()
+
+    def _load(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                watermark = json.load(f).get('watermark')
+            return datetime.fromisoformat(watermark) if watermark else None
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f'Error reading snapshot checkpoint {self.checkpoint_path}, starting over: {str(e)}')
+            return None
+
+    def _save(self):
+        """Atomically rewrite the checkpoint so a crash never leaves it half written"""
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'watermark': self.watermark.isoformat() if self.watermark else None,
+                       'updated_at': datetime.now().isoformat()}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _query(self, after):
+        query = self.db.collection('events')
+        if self.watermark is not None:
+            # >= so events sharing the watermark's timestamp are never skipped; they re-check as no-ops
+            query = query.where('updated_at', '>=', self.watermark)
+        query = query.order_by('updated_at').order_by('__name__')
+        if after is not None:
+            query = query.start_after(after)
+        return list(query.limit(self.page_size).stream())
+
+    def _propagate(self, events, writer):
+        by_id = {event.id: event.to_dict() or {} for event in events}
+        written = 0
+        event_ids = list(by_id)
+        for start in range(0, len(event_ids), IN_QUERY_LIMIT):
+            chunk = event_ids[start:start + IN_QUERY_LIMIT]
+            for application in self.db.collection('applications').where('event_id', 'in', chunk).stream():
+                application_data = application.to_dict() or {}
+                event_data = by_id[application_data.get('event_id')]
+                if is_current(application_data.get(SNAPSHOT_FIELD), event_data):
+                    continue
+                writer.update(application.reference, sync.stamped({
+                    SNAPSHOT_FIELD: snapshot_from_data(event_data, version=event_data.get('updated_at')),
+                }))
+                written += 1
+        return written
+
+    def run(self):
+        """Propagate every event changed since the watermark; returns counts of events and applications"""
+        totals = {'events': 0, 'applications': 0}
+        after = None
+        while True:
+            events = self._query(after)
+            if not events:
+                break
+            with BatchWriter(self.db) as writer:
+                totals['applications'] += self._propagate(events, writer)
+            totals['events'] += len(events)
+            after = events[-1]
+            updated_at = to_naive_utc((after.to_dict() or {}).get('updated_at'))
+            if updated_at is not None:
+                self.watermark = updated_at
+                self._save()
+            if len(events) < self.page_size:
+                break
+        return totals
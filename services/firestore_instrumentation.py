@@ -0,0 +1,264 @@
+import contextvars
+import functools
+import logging
+import time
+
+from google.cloud.firestore_v1 import (async_batch, async_client, async_collection, async_document, async_query,
+                                      batch, client, collection, document, query, transaction)
+from google.cloud.firestore_v1.types import StructuredQuery
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+_installed = False
+# Set while an instrumented call is running so calls it makes internally are not counted twice
+_in_call = contextvars.ContextVar('vol_link_firestore_in_call', default=False)
+
+
+def _document_collection(path):
+    """Collection id from a document path or full resource name"""
+    parts = path.split('/')
+    return parts[-2] if len(parts) >= 2 else path
+
+
+def query_shape(q):
+    """Describe a query without its values, e.g. `applications where event_id==, status== limit`"""
+    collection_id = q._parent.id if q._parent is not None else '?'
+    shape = collection_id
+    filters = []
+    for filter_pb in q._field_filters:
+        filters.extend(_describe_filter(filter_pb))
+    if filters:
+        shape += ' where ' + ', '.join(filters)
+    if q._orders:
+        shape += ' order_by ' + ', '.join(order.field.field_path for order in q._orders)
+    if q._limit is not None:
+        shape += ' limit'
+    if getattr(q, '_start_at', None) or getattr(q, '_end_at', None):
+        shape += ' cursor'
+    return collection_id, shape
+
+
+def _describe_filter(filter_pb):
+    if isinstance(filter_pb, StructuredQuery.FieldFilter):
+        return [f'{filter_pb.field.field_path}{_op_symbol(filter_pb.op)}']
+    if isinstance(filter_pb, StructuredQuery.UnaryFilter):
+        return [f'{filter_pb.field.field_path} {filter_pb.op.name.lower()}']
+    if isinstance(filter_pb, StructuredQuery.CompositeFilter):
+        described = []
+        for sub_filter in filter_pb.filters:
+            inner = sub_filter.field_filter if 'field_filter' in sub_filter else sub_filter.unary_filter
+            described.extend(_describe_filter(inner))
+        return described
+    return ['?']
+
+
+_OP_SYMBOLS = {
+    'LESS_THAN': '<',
+    'LESS_THAN_OR_EQUAL': '<=',
+    'EQUAL': '==',
+    'NOT_EQUAL': '!=',
+    'GREATER_THAN_OR_EQUAL': '>=',
+    'GREATER_THAN': '>',
+    'ARRAY_CONTAINS': ' array_contains',
+    'IN': ' in',
+    'NOT_IN': ' not-in',
+    'ARRAY_CONTAINS_ANY': ' array_contains_any',
+}
+
+
+def _op_symbol(op):
+    return _OP_SYMBOLS.get(op.name, f' {op.name.lower()}')
+
+
+def _writes_collections(write_pbs):
+    names = set()
+    for write_pb in write_pbs:
+        name = write_pb.update.name or write_pb.delete or write_pb.transform.document
+        if name:
+            names.add(_document_collection(name))
+    return ','.join(sorted(names)) or '?'
+
+
+def _record(op, collection_id, shape, started, documents):
+    metrics.record_firestore(op, collection_id, shape, time.perf_counter() - started, documents)
+
+
+def _wrap_call(original, describe, count=lambda result: 1):
+    """Time a blocking call; `describe(self, *args)` returns (op, collection, shape)"""
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        if _in_call.get():
+            return original(self, *args, **kwargs)
+        token = _in_call.set(True)
+        started = time.perf_counter()
+        documents = 0
+        try:
+            result = original(self, *args, **kwargs)
+            documents = count(result)
+            return result
+        finally:
+            _in_call.reset(token)
+            try:
+                op, collection_id, shape = describe(self, *args, **kwargs)
+                _record(op, collection_id, shape, started, documents)
+            except Exception as e:
+                logger.debug(f'Could not record Firestore call: {str(e)}')
+    return wrapper
+
+
+def _wrap_generator(original, describe):
+    """Time a streaming call, counting only time spent waiting on the stream"""
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        if _in_call.get():
+            return (yield from original(self, *args, **kwargs))
+        op, collection_id, shape = describe(self, *args, **kwargs)
+        inner = original(self, *args, **kwargs)
+        waited = 0.0
+        documents = 0
+        try:
+            while True:
+                token = _in_call.set(True)
+                started = time.perf_counter()
+                try:
+                    item = next(inner)
+                except StopIteration as stop:
+                    # Query streams return their explain metrics as the generator result
+                    return stop.value
+                finally:
+                    waited += time.perf_counter() - started
+                    _in_call.reset(token)
+                documents += 1
+                yield item
+        finally:
+            metrics.record_firestore(op, collection_id, shape, waited, documents)
+    return wrapper
+
+
+def _wrap_coroutine(original, describe, count=lambda result: 1):
+    """Async counterpart of _wrap_call for AsyncClient methods"""
+    @functools.wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        if _in_call.get():
+            return await original(self, *args, **kwargs)
+        token = _in_call.set(True)
+        started = time.perf_counter()
+        documents = 0
+        try:
+            result = await original(self, *args, **kwargs)
+            documents = count(result)
+            return result
+        finally:
+            _in_call.reset(token)
+            try:
+                op, collection_id, shape = describe(self, *args, **kwargs)
+                _record(op, collection_id, shape, started, documents)
+            except Exception as e:
+                logger.debug(f'Could not record Firestore call: {str(e)}')
+    return wrapper
+
+
+def _wrap_async_generator(original, describe):
+    """Async counterpart of _wrap_generator; waits include time the loop spent on other tasks"""
+    @functools.wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        if _in_call.get():
+            async for item in original(self, *args, **kwargs):
+                yield item
+            return
+        op, collection_id, shape = describe(self, *args, **kwargs)
+        inner = original(self, *args, **kwargs).__aiter__()
+        waited = 0.0
+        documents = 0
+        try:
+            while True:
+                token = _in_call.set(True)
+                started = time.perf_counter()
+                try:
+                    item = await inner.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    waited += time.perf_counter() - started
+                    _in_call.reset(token)
+                documents += 1
+                yield item
+        finally:
+            metrics.record_firestore(op, collection_id, shape, waited, documents)
+    return wrapper
+
+
+def _describe_document(op):
+    def describe(ref, *args, **kwargs):
+        collection_id = _document_collection('/'.join(ref._path))
+        return op, collection_id, f'{collection_id}/{{id}}'
+    return describe
+
+
+def _describe_query(q, *args, **kwargs):
+    collection_id, shape = query_shape(q)
+    return 'query', collection_id, shape
+
+
+def _describe_add(collection_ref, *args, **kwargs):
+    return 'add', collection_ref.id, f'{collection_ref.id}/{{auto-id}}'
+
+
+def _describe_get_all(client_obj, references, *args, **kwargs):
+    if not isinstance(references, (list, tuple)):
+        # Never consume a generator the real call still needs
+        return 'get_all', '?', 'get_all[?]'
+    collections = sorted({ref._path[-2] for ref in references if len(ref._path) >= 2})
+    return 'get_all', ','.join(collections) or '?', f"get_all[{','.join(collections)}]"
+
+
+def _describe_batch(batch_obj, *args, **kwargs):
+    collections = _writes_collections(batch_obj._write_pbs)
+    return 'batch', collections, f'batch[{collections}]'
+
+
+def _describe_transaction(transaction_obj, *args, **kwargs):
+    collections = _writes_collections(transaction_obj._write_pbs)
+    return 'transaction', collections, f'transaction[{collections}]'
+
+
+def install():
+    """Patch the Firestore client so every call is timed into services.metrics
+
+    Idempotent; pages call it on every rerun right after creating their client.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    document.DocumentReference.get = _wrap_call(
+        document.DocumentReference.get, _describe_document('get'))
+    for op in ('create', 'set', 'update', 'delete'):
+        setattr(document.DocumentReference, op, _wrap_call(
+            getattr(document.DocumentReference, op), _describe_document(op)))
+    collection.CollectionReference.add = _wrap_call(collection.CollectionReference.add, _describe_add)
+
+    # Newer clients build the stream in _make_stream and wrap it in a StreamGenerator
+    stream_attr = '_make_stream' if hasattr(query.Query, '_make_stream') else 'stream'
+    setattr(query.Query, stream_attr, _wrap_generator(getattr(query.Query, stream_attr), _describe_query))
+    client.Client.get_all = _wrap_generator(client.Client.get_all, _describe_get_all)
+
+    batch.WriteBatch.commit = _wrap_call(
+        batch.WriteBatch.commit, _describe_batch, count=lambda results: len(results or []))
+    transaction.Transaction._commit = _wrap_call(
+        transaction.Transaction._commit, _describe_transaction, count=lambda results: len(results or []))
+
+    # The AsyncClient used through services.aio shares describers and metrics with the sync client
+    for op in ('get', 'create', 'set', 'update', 'delete'):
+        setattr(async_document.AsyncDocumentReference, op, _wrap_coroutine(
+            getattr(async_document.AsyncDocumentReference, op), _describe_document(op)))
+    async_collection.AsyncCollectionReference.add = _wrap_coroutine(
+        async_collection.AsyncCollectionReference.add, _describe_add)
+    async_query.AsyncQuery._make_stream = _wrap_async_generator(async_query.AsyncQuery._make_stream, _describe_query)
+    async_client.AsyncClient.get_all = _wrap_async_generator(async_client.AsyncClient.get_all, _describe_get_all)
+    async_batch.AsyncWriteBatch.commit = _wrap_coroutine(
+        async_batch.AsyncWriteBatch.commit, _describe_batch, count=lambda results: len(results or []))
+    logger.info('Firestore instrumentation installed')
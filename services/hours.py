@@ -0,0 +1,163 @@
+import logging
+from datetime import datetime
+
+from firebase_admin import firestore
+
+from services import parallel, sync
+from services.batch_writer import MAX_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Append-only: one entry per credited application, keyed by the application id
+LEDGER_COLLECTION = 'hours_ledger'
+# Running totals per volunteer and per organization, e.g. hours_totals/volunteer__{id}
+TOTALS_COLLECTION = 'hours_totals'
+
+
+def volunteer_totals_ref(db, volunteer_id):
+    return db.collection(TOTALS_COLLECTION).document(f'volunteer__{volunteer_id}')
+
+
+def org_totals_ref(db, org_id):
+    return db.collection(TOTALS_COLLECTION).document(f'org__{org_id}')
+
+
+def credit_attendance(db, application_id, application_data, event, now=None, org_totals=True):
+    """Credit an attended application's hours to the ledger and both totals in one transaction
+
+    Returns the hours credited, or 0 if the application was already credited (the ledger
+    entry is keyed by application id, so retries and double confirmations are no-ops).
+    With org_totals=False the organization's totals are left to add_org_totals, and the
+    ledger entry is flagged org_counted=False until they are.
+    """
+    now = now or datetime.now()
+    hours = float(event.duration_hours)
+    volunteer_id = application_data.get('volunteer_id')
+    volunteer_name = application_data.get('volunteer_name', 'Volunteer')
+    org_id = event.org_id
+    ledger_ref = db.collection(LEDGER_COLLECTION).document(application_id)
+
+    @firestore.transactional
+    def credit(transaction):
+        if ledger_ref.get(transaction=transaction).exists:
+            return 0
+        transaction.create(ledger_ref, {
+            'application_id': application_id,
+            'volunteer_id': volunteer_id,
+            'volunteer_name': volunteer_name,
+            'org_id': org_id,
+            'event_id': event.id,
+            'event_title': event.title,
+            'event_date': event.date,
+            'skills': list(event.skills_required),
+            'hours': hours,
+            'credited_at': now,
+            'org_counted': org_totals,
+        })
+        by_skill = {skill: firestore.Increment(hours) for skill in event.skills_required}
+        transaction.set(volunteer_totals_ref(db, volunteer_id), {
+            'volunteer_id': volunteer_id,
+            'volunteer_name': volunteer_name,
+            'total_hours': firestore.Increment(hours),
+            'events': firestore.Increment(1),
+            'by_org': {org_id: firestore.Increment(hours)},
+            'org_names': {org_id: event.org_name or ''},
+            'by_skill': by_skill,
+            'updated_at': now,
+        }, merge=True)
+        if org_totals:
+            transaction.set(org_totals_ref(db, org_id), _org_increments(
+                org_id, [(volunteer_id, volunteer_name, hours, event.skills_required)], now), merge=True)
+        transaction.update(db.collection('applications').document(application_id), sync.stamped({'hours_credited': hours}))
+        return hours
+
+    return credit(db.transaction())
+
+
+def _org_increments(org_id, credits, now):
+    """Org totals update adding (volunteer_id, volunteer_name, hours, skills) credits"""
+    by_volunteer, volunteer_names, by_skill = {}, {}, {}
+    for volunteer_id, volunteer_name, hours, skills in credits:
+        by_volunteer[volunteer_id] = by_volunteer.get(volunteer_id, 0.0) + hours
+        volunteer_names[volunteer_id] = volunteer_name
+        for skill in skills:
+            by_skill[skill] = by_skill.get(skill, 0.0) + hours
+    return {
+        'org_id': org_id,
+        'total_hours': firestore.Increment(sum(hours for _, _, hours, _ in credits)),
+        'events': firestore.Increment(len(credits)),
+        'by_volunteer': {volunteer_id: firestore.Increment(hours) for volunteer_id, hours in by_volunteer.items()},
+        'volunteer_names': volunteer_names,
+        'by_skill': {skill: firestore.Increment(hours) for skill, hours in by_skill.items()},
+        'updated_at': now,
+    }
+
+
+def add_org_totals(db, event, now=None):
+    """Add the event's ledger entries flagged org_counted=False to the org's totals; returns how many
+
+    One write per batch of entries instead of one per volunteer, so confirming a large
+    event does not contend on the org's totals document. Each batch clears the flags in
+    the same commit, so a failed batch is picked up again by the next call.
+    """
+    now = now or datetime.now()
+    entries = list(db.collection(LEDGER_COLLECTION)
+                   .where('event_id', '==', event.id)
+                   .where('org_counted', '==', False)
+                   .stream())
+    # One slot of each batch holds the totals update
+    for start in range(0, len(entries), MAX_BATCH_SIZE - 1):
+        chunk = entries[start:start + MAX_BATCH_SIZE - 1]
+        batch = db.batch()
+        credits = []
+        for entry in chunk:
+            data = entry.to_dict() or {}
+            credits.append((data.get('volunteer_id'), data.get('volunteer_name', 'Volunteer'),
+                            data.get('hours', 0.0), data.get('skills') or ()))
+            batch.update(entry.reference, {'org_counted': True})
+        batch.set(org_totals_ref(db, event.org_id), _org_increments(event.org_id, credits, now), merge=True)
+        batch.commit()
+    return len(entries)
+
+
+def _try_credit(db, application_id, data, event, now):
+    try:
+        return credit_attendance(db, application_id, data, event, now, org_totals=False)
+    except Exception as e:
+        logger.error(f'Error crediting hours for application {application_id}: {str(e)}')
+        return None
+
+
+def credit_event(db, event, applications, now=None):
+    """Credit every attended, uncredited application of `event`; returns (credited, hours, failed)
+
+    `applications` are (application_id, data) pairs. Each credit is its own small
+    transaction covering the ledger and volunteer totals, run a few at a time on the
+    shared read pool; the org's totals are then added once for the whole event.
+    """
+    now = now or datetime.now()
+    due = [(application_id, data) for application_id, data in applications
+           if data.get('attendance') == 'present' and not data.get('hours_credited')]
+    results = parallel.run_parallel(*[
+        (lambda application_id=application_id, data=data: _try_credit(db, application_id, data, event, now))
+        for application_id, data in due
+    ]) if due else []
+    credited = [hours for hours in results if hours]
+    failed = sum(1 for hours in results if hours is None)
+    # Also picks up entries a previous confirmation credited but could not add to the org
+    try:
+        add_org_totals(db, event, now)
+    except Exception as e:
+        logger.error(f'Error adding event {event.id} to organization totals: {str(e)}')
+        # Reported as failures so the page asks for another confirmation, which retries them
+        failed += len(credited) or 1
+    logger.info(f'Credited {len(credited)} volunteers with {sum(credited):g} hours for event {event.id}')
+    return len(credited), float(sum(credited)), failed
+
+
+def leaderboard(totals, key='by_volunteer', names='volunteer_names', limit=10):
+    """Top (name, hours) pairs from a totals document's map, highest first"""
+    hours_by_id = (totals or {}).get(key) or {}
+    name_by_id = (totals or {}).get(names) or {}
+    ranked = sorted(hours_by_id.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [(name_by_id.get(item_id) or item_id, hours) for item_id, hours in ranked]
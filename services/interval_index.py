@@ -0,0 +1,83 @@
+import bisect
+import time
+from datetime import timedelta
+
+import streamlit as st
+
+from services.models import Application
+
+# Application statuses that commit the volunteer's time
+BUSY_STATUSES = ('pending', 'accepted')
+# Seconds before a session's index is rebuilt, to pick up accept/reject/cancel made elsewhere
+INDEX_TTL = 300
+
+
+class IntervalIndex:
+    """Time intervals sorted by start, answering overlap queries with bisect
+
+    Intervals starting more than the longest stored duration before a query window cannot
+    reach it, so a query only looks at the starts inside [window start - longest, window end):
+    O(log n + k) for k candidates. Insertions and removals keep the lists sorted in place.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._entries = []
+        self._start_by_key = {}
+        self._longest = timedelta(0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key, start, end, label=''):
+        """Add or replace the interval for `key` (an event id)"""
+        self.remove(key)
+        position = bisect.bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._entries.insert(position, (start, end, key, label))
+        self._start_by_key[key] = start
+        self._longest = max(self._longest, end - start)
+
+    def remove(self, key):
+        start = self._start_by_key.pop(key, None)
+        if start is None:
+            return False
+        position = bisect.bisect_left(self._starts, start)
+        while self._entries[position][2] != key:
+            position += 1
+        del self._starts[position]
+        del self._entries[position]
+        return True
+
+    def overlapping(self, start, end, exclude=None):
+        """(key, label, start, end) of stored intervals overlapping [start, end)"""
+        first = bisect.bisect_left(self._starts, start - self._longest)
+        last = bisect.bisect_left(self._starts, end)
+        return [(key, label, entry_start, entry_end)
+                for entry_start, entry_end, key, label in self._entries[first:last]
+                if entry_end > start and key != exclude]
+
+
+def build(applications):
+    """Index of the events behind a volunteer's pending and accepted applications
+
+    Uses the applications' event snapshots, so building it reads no event documents;
+    applications without a dated snapshot are left out.
+    """
+    index = IntervalIndex()
+    for application in applications:
+        if application.status in BUSY_STATUSES and application.event_date is not None:
+            index.add(application.event_id, application.event_date, application.event_end, application.event_title)
+    return index
+
+
+def for_volunteer(db, volunteer_id):
+    """The session's index for `volunteer_id`, built with one applications query at most every INDEX_TTL"""
+    cached = st.session_state.get('_interval_index')
+    if cached is not None and cached[0] == volunteer_id and time.monotonic() - cached[1] < INDEX_TTL:
+        return cached[2]
+    applications = [Application.from_snapshot(snapshot) for snapshot in
+                    db.collection('applications').where('volunteer_id', '==', volunteer_id).stream()]
+    index = build(applications)
+    st.session_state['_interval_index'] = (volunteer_id, time.monotonic(), index)
+    return index
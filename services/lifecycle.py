@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime
+
+from services import event_snapshots, sync
+from services.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# Event statuses the sweep moves to 'completed' once the event date has passed
+OPEN_EVENT_STATUSES = ['active', 'inactive']
+# Application status that becomes 'completed' along with its event
+COMPLETABLE_APPLICATION_STATUS = 'accepted'
+# Firestore caps the number of values in an 'in' filter
+IN_QUERY_LIMIT = 30
+SWEEP_PAGE_SIZE = 500
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def complete_applications(db, event_ids, writer, now):
+    """Queue accepted applications of `event_ids` for completion; returns how many were queued"""
+    completed = 0
+    for chunk in _chunks(list(event_ids), IN_QUERY_LIMIT):
+        applications_ref = (db.collection('applications')
+                            .where('event_id', 'in', chunk)
+                            .where('status', '==', COMPLETABLE_APPLICATION_STATUS)
+                            .stream())
+        for application in applications_ref:
+            writer.update(application.reference, sync.stamped({
+                'status': 'completed',
+                'completed_at': now,
+                f'{event_snapshots.SNAPSHOT_FIELD}.status': 'completed',
+            }))
+            completed += 1
+    return completed
+
+
+def sweep_completed_events(db, now=None, page_size=SWEEP_PAGE_SIZE):
+    """Mark every open event dated before `now` as completed, along with its accepted applications
+
+    Works a page at a time: each page of events is committed before the next query,
+    so the completed events drop out of the `status in [...]` filter and the loop ends
+    once no past open events remain. Needs the (status, date) composite index.
+    Returns a dict with the number of events and applications completed.
+    """
+    now = now or datetime.now()
+    totals = {'events': 0, 'applications': 0}
+    while True:
+        events = list(db.collection('events')
+                      .where('status', 'in', OPEN_EVENT_STATUSES)
+                      .where('date', '<', now)
+                      .order_by('date')
+                      .limit(page_size)
+                      .stream())
+        if not events:
+            break
+        with BatchWriter(db) as writer:
+            for event in events:
+                writer.update(event.reference, sync.stamped({'status': 'completed', 'completed_at': now}))
+            totals['applications'] += complete_applications(db, [event.id for event in events], writer, now)
+        totals['events'] += len(events)
+        logger.info(f'Completed {len(events)} past events')
+        if len(events) < page_size:
+            break
+    return totals
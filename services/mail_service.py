@@ -1,10 +1,13 @@
 import smtplib
+from email.mime.application import MIMEApplication
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 import logging
+import time
 from datetime import datetime
 import streamlit as st
+from services import metrics
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +16,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class BulkSend:
+    """Per-message bookkeeping of one send_bulk run, shared by the sync and async services
+
+    The service owns the SMTP session: while `remaining`, it sends `next()` and reports the
+    outcome with `sent()` or `failed()`, and asks `reconnect()` whether to retry after a drop.
+    """
+
+    def __init__(self, service, messages):
+        self.messages = list(messages)
+        self.results = [False] * len(self.messages)
+        self.index = 0
+        self.reconnected = False
+        self._started = None
+        if self.messages and (not service.sender_email or not service.app_password):
+            logger.error('Email credentials not properly configured; bulk send skipped')
+            self.index = len(self.messages)
+
+    @property
+    def remaining(self):
+        return len(self.messages) - self.index
+
+    def next(self):
+        """(to_email, subject, body, attachments) of the message to send now"""
+        to_email, subject, body, *attachments = self.messages[self.index]
+        self._started = time.perf_counter()
+        return to_email, subject, body, attachments[0] if attachments else ()
+
+    def _record(self, success):
+        to_email, subject = self.messages[self.index][:2]
+        self.results[self.index] = success
+        metrics.record_smtp(to_email, subject, time.perf_counter() - self._started, success)
+        self.index += 1
+
+    def sent(self):
+        self._record(True)
+
+    def failed(self, error):
+        logger.error(f'Error sending bulk email to {self.messages[self.index][0]}: {str(error)}')
+        self._record(False)
+
+    def reconnect(self, error):
+        """True if the session should be re-opened after the server dropped it"""
+        if self.reconnected:
+            logger.error(f'SMTP server disconnected again, giving up on {self.remaining} emails: {str(error)}')
+            return False
+        logger.warning(f'SMTP server disconnected, reconnecting: {str(error)}')
+        self.reconnected = True
+        return True
+
+    def finish(self):
+        if self.messages:
+            logger.info(f'Bulk send finished: {sum(self.results)} of {len(self.messages)} emails sent')
+        return self.results
+
+
 class EmailService:
     def __init__(self):
         self.sender_email = st.secrets['VOL_LINK_EMAIL']
@@ -20,15 +78,25 @@ class EmailService:
         self.smtp_server = 'smtp.gmail.com'
         self.smtp_port = 465
 
-    def _create_message(self, to_email, subject, body):
+    def _create_message(self, to_email, subject, body, attachments=()):
         message = MIMEMultipart()
         message['From'] = self.sender_email
         message['To'] = to_email
         message['Subject'] = subject
         message.attach(MIMEText(body, 'plain'))
+        for filename, content in attachments:
+            part = MIMEApplication(content, Name=filename)
+            part['Content-Disposition'] = f'attachment; filename="{filename}"'
+            message.attach(part)
         return message
 
     def _send_email(self, to_email, subject, body):
+        started = time.perf_counter()
+        success = self._deliver(to_email, subject, body)
+        metrics.record_smtp(to_email, subject, time.perf_counter() - started, success)
+        return success
+
+    def _deliver(self, to_email, subject, body):
         try:
             if not self.sender_email or not self.app_password:
                 logger.error(f'Email credentials not properly configured. Sender: {self.sender_email is not None}, Password: {self.app_password is not None}')
@@ -63,6 +131,118 @@ class EmailService:
             logger.error(f'Unexpected error while sending email to {to_email}: {str(e)}')
             return False
 
+    def send_bulk(self, messages):
+        """Send many (to_email, subject, body[, attachments]) messages over a single SMTP session
+
+        `attachments` are (filename, bytes) pairs. Returns a list of booleans in the same order as `messages`. The connection is
+        re-opened once if the server drops it mid-run.
+        """
+        run = BulkSend(self, messages)
+        while run.remaining:
+            try:
+                logger.info(f'Opening SMTP session for {run.remaining} bulk emails')
+                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=10) as server:
+                    server.login(self.sender_email, self.app_password)
+                    while run.remaining:
+                        to_email, subject, body, attachments = run.next()
+                        try:
+                            server.send_message(self._create_message(to_email, subject, body, attachments))
+                            run.sent()
+                        except smtplib.SMTPServerDisconnected:
+                            raise
+                        except smtplib.SMTPException as e:
+                            run.failed(e)
+            except smtplib.SMTPServerDisconnected as e:
+                if not run.reconnect(e):
+                    break
+            except smtplib.SMTPAuthenticationError as e:
+                logger.error(f'SMTP Authentication failed. Please check your email and app password. Error: {str(e)}')
+                break
+            except Exception as e:
+                logger.error(f'Unexpected error during bulk send: {str(e)}')
+                break
+        return run.finish()
+
+    def send_event_reminders(self, recipients, event_data, org_name, hours_before):
+        """Remind accepted volunteers of an upcoming event; `recipients` are (email, name) pairs"""
+        title = event_data.get("title", "Untitled Event")
+        when = '1 hour' if hours_before == 1 else f'{hours_before:g} hours'
+        subject = f'Reminder: {title} starts in {when}'
+        messages = []
+        for volunteer_email, volunteer_name in recipients:
+            body = f"""Dear {volunteer_name},
+
+This is a reminder that {title} starts in {when}.
+
+Event Details:
+Date: {event_data.get("date", "TBD")}
+Location: {event_data.get("location", "TBD")}
+Organization: {org_name}
+
+If you can no longer attend, please let the organization know as soon as possible.
+
+Best regards,
+Volunteer Management Team"""
+            messages.append((volunteer_email, subject, body))
+        return self.send_bulk(messages)
+
+    def send_certificates(self, certificates, org_name):
+        """Email each volunteer their certificate; `certificates` are (email, name, filename, pdf bytes)"""
+        subject = f'Your Certificate of Appreciation from {org_name}'
+        messages = []
+        for volunteer_email, volunteer_name, filename, pdf in certificates:
+            body = f"""Dear {volunteer_name},
+
+Thank you for volunteering with {org_name}! Your certificate of appreciation is attached.
+
+Best regards,
+Volunteer Management Team"""
+            messages.append((volunteer_email, subject, body, [(filename, pdf)]))
+        return self.send_bulk(messages)
+
+    def send_event_update_notifications(self, recipients, event_data, org_name, changes):
+        """Tell applicants an event changed; `changes` are (label, new value) pairs"""
+        title = event_data.get("title", "Untitled Event")
+        subject = f'Event Updated - {title}'
+        changed_lines = '\n'.join(f'{label}: {value}' for label, value in changes)
+        messages = []
+        for volunteer_email, volunteer_name in recipients:
+            body = f"""Dear {volunteer_name},
+
+{org_name} has updated the details of {title}, an event you applied for.
+
+What changed:
+{changed_lines}
+
+Event Details:
+Date: {event_data.get("date", "TBD")}
+Location: {event_data.get("location", "TBD")}
+
+If you can no longer attend, please let the organization know as soon as possible.
+
+Best regards,
+Volunteer Management Team"""
+            messages.append((volunteer_email, subject, body))
+        return self.send_bulk(messages)
+
+    def send_event_cancellation_notifications(self, recipients, event_data, org_name, reason=''):
+        """Tell applicants an event was cancelled; `recipients` are (email, name) pairs"""
+        title = event_data.get("title", "Untitled Event")
+        subject = f'Event Cancelled - {title}'
+        reason_line = f'\nReason: {reason}\n' if reason else ''
+        messages = []
+        for volunteer_email, volunteer_name in recipients:
+            body = f"""Dear {volunteer_name},
+
+We are sorry to let you know that {org_name} has cancelled {title}, scheduled for {event_data.get("date", "TBD")}.
+{reason_line}
+Thank you for your willingness to help. We encourage you to explore other volunteering opportunities on our platform.
+
+Best regards,
+Volunteer Management Team"""
+            messages.append((volunteer_email, subject, body))
+        return self.send_bulk(messages)
+
     def send_event_registration_confirmation(self, volunteer_email, volunteer_name, event_data, org_name):
         subject = f'Event Registration Confirmation - {event_data.get("title", "Untitled Event")}'
         body = f"""Dear {volunteer_name},
@@ -0,0 +1,273 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from services import query_stats
+from services.query_stats import escape_label
+
+logger = logging.getLogger(__name__)
+
+# Optional export targets; unset means metrics stay in memory only
+METRICS_JSONL_PATH = os.environ.get('VOL_LINK_METRICS_JSONL')
+METRICS_PROM_PATH = os.environ.get('VOL_LINK_METRICS_PROM')
+PROM_WRITE_INTERVAL = float(os.environ.get('VOL_LINK_METRICS_PROM_INTERVAL', '10'))
+DEBUG_PANEL_ENABLED = os.environ.get('VOL_LINK_DEBUG_PANEL', '1') != '0'
+DEBUG_QUERY_PARAM = 'debug'
+DEBUG_QUERY_VALUE = 'perf'
+
+_current_rerun = contextvars.ContextVar('vol_link_rerun', default=None)
+
+
+class RerunMetrics:
+    """Timings and Firestore/SMTP calls collected during one script rerun"""
+
+    def __init__(self, page, session_id=None):
+        self.page = page
+        self.session_id = session_id
+        self.branch = None
+        self.started = time.perf_counter()
+        self.last_activity = self.started
+        self.started_at = datetime.now()
+        self.branch_started = None
+        self.branch_seconds = None
+        self.total_seconds = None
+        self.interrupted = False
+        self.firestore_calls = []
+        self.smtp_sends = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def to_dict(self):
+        return {
+            'page': self.page,
+            'session_id': self.session_id,
+            'branch': self.branch,
+            'started_at': self.started_at.isoformat(),
+            'total_seconds': self.total_seconds if self.total_seconds is not None else self.elapsed(),
+            'branch_seconds': self.branch_seconds,
+            'interrupted': self.interrupted,
+            'firestore_calls': self.firestore_calls,
+            'smtp_sends': self.smtp_sends,
+        }
+
+
+class MetricsRegistry:
+    """Process-wide counters behind the Prometheus export"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns = defaultdict(lambda: [0, 0.0])
+        self.firestore = defaultdict(lambda: [0, 0.0, 0])
+        self.smtp = defaultdict(lambda: [0, 0.0])
+        self._last_prom_write = 0.0
+
+    def observe_rerun(self, page, branch, seconds):
+        with self._lock:
+            entry = self.reruns[(page, branch or 'none')]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def observe_firestore(self, op, shape, seconds, documents):
+        with self._lock:
+            entry = self.firestore[(op, shape)]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += documents
+
+    def observe_smtp(self, status, seconds):
+        with self._lock:
+            entry = self.smtp[status]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def to_prometheus(self):
+        """Render the counters in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP vol_link_reruns_total Script reruns per page branch.')
+            lines.append('# TYPE vol_link_reruns_total counter')
+            for (page, branch), (count, _) in sorted(self.reruns.items()):
+                lines.append(f'vol_link_reruns_total{{page="{page}",branch="{branch}"}} {count}')
+            lines.append('# HELP vol_link_rerun_seconds_total Time spent in script reruns per page branch.')
+            lines.append('# TYPE vol_link_rerun_seconds_total counter')
+            for (page, branch), (_, seconds) in sorted(self.reruns.items()):
+                lines.append(f'vol_link_rerun_seconds_total{{page="{page}",branch="{branch}"}} {seconds:.6f}')
+
+            lines.append('# HELP vol_link_firestore_calls_total Firestore calls per operation and query shape.')
+            lines.append('# TYPE vol_link_firestore_calls_total counter')
+            for (op, shape), (count, _, _) in sorted(self.firestore.items()):
+                lines.append(f'vol_link_firestore_calls_total{{op="{op}",shape="{escape_label(shape)}"}} {count}')
+            lines.append('# HELP vol_link_firestore_seconds_total Time spent in Firestore calls.')
+            lines.append('# TYPE vol_link_firestore_seconds_total counter')
+            for (op, shape), (_, seconds, _) in sorted(self.firestore.items()):
+                lines.append(f'vol_link_firestore_seconds_total{{op="{op}",shape="{escape_label(shape)}"}} {seconds:.6f}')
+            lines.append('# HELP vol_link_firestore_documents_total Documents read or written by Firestore calls.')
+            lines.append('# TYPE vol_link_firestore_documents_total counter')
+            for (op, shape), (_, _, documents) in sorted(self.firestore.items()):
+                lines.append(f'vol_link_firestore_documents_total{{op="{op}",shape="{escape_label(shape)}"}} {documents}')
+
+            lines.append('# HELP vol_link_smtp_sends_total SMTP sends by outcome.')
+            lines.append('# TYPE vol_link_smtp_sends_total counter')
+            for status, (count, _) in sorted(self.smtp.items()):
+                lines.append(f'vol_link_smtp_sends_total{{status="{status}"}} {count}')
+            lines.append('# HELP vol_link_smtp_seconds_total Time spent sending email.')
+            lines.append('# TYPE vol_link_smtp_seconds_total counter')
+            for status, (_, seconds) in sorted(self.smtp.items()):
+                lines.append(f'vol_link_smtp_seconds_total{{status="{status}"}} {seconds:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, force=False):
+        """Atomically rewrite a node_exporter textfile, at most once per PROM_WRITE_INTERVAL"""
+        now = time.monotonic()
+        if not force and now - self._last_prom_write < PROM_WRITE_INTERVAL:
+            return
+        self._last_prom_write = now
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+            f.write(query_stats.STATS.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+_jsonl_lock = threading.Lock()
+
+
+def current_rerun():
+    return _current_rerun.get()
+
+
+def start_rerun(page):
+    """Begin collecting metrics for this script run of `page`"""
+    previous = st.session_state.get('_rerun_metrics')
+    if previous is not None and previous.total_seconds is None:
+        # The last run ended in st.rerun()/st.switch_page() before reaching finish_rerun()
+        previous.interrupted = True
+        _finalize(previous, ended=previous.last_activity)
+    ctx = get_script_run_ctx()
+    rerun = RerunMetrics(page, session_id=ctx.session_id if ctx else None)
+    st.session_state['_rerun_metrics'] = rerun
+    _current_rerun.set(rerun)
+    return rerun
+
+
+def start_branch(branch):
+    """Mark the page branch (feed, search, dashboard, ...) selected for this rerun"""
+    rerun = current_rerun()
+    if rerun is not None:
+        rerun.branch = branch
+        rerun.branch_started = rerun.last_activity = time.perf_counter()
+
+
+def finish_rerun():
+    rerun = current_rerun()
+    if rerun is not None and rerun.total_seconds is None:
+        _finalize(rerun)
+    return rerun
+
+
+def _finalize(rerun, ended=None):
+    now = ended or time.perf_counter()
+    rerun.total_seconds = now - rerun.started
+    if rerun.branch_started is not None:
+        rerun.branch_seconds = now - rerun.branch_started
+    REGISTRY.observe_rerun(rerun.page, rerun.branch, rerun.total_seconds)
+    try:
+        if METRICS_JSONL_PATH:
+            line = json.dumps(rerun.to_dict(), default=str)
+            with _jsonl_lock, open(METRICS_JSONL_PATH, 'a') as f:
+                f.write(line + '\n')
+        if METRICS_PROM_PATH:
+            REGISTRY.write_prometheus(METRICS_PROM_PATH)
+    except OSError as e:
+        logger.error(f'Error exporting rerun metrics: {str(e)}')
+
+
+def record_firestore(op, collection, shape, seconds, documents):
+    REGISTRY.observe_firestore(op, shape, seconds, documents)
+    rerun = current_rerun()
+    query_stats.observe(op, shape, seconds, documents,
+                        page=rerun.page if rerun else None,
+                        session_id=rerun.session_id if rerun else None)
+    if rerun is not None:
+        rerun.last_activity = time.perf_counter()
+        rerun.firestore_calls.append({
+            'op': op,
+            'collection': collection,
+            'shape': shape,
+            'seconds': seconds,
+            'documents': documents,
+        })
+
+
+def record_smtp(to_email, subject, seconds, success):
+    status = 'sent' if success else 'failed'
+    REGISTRY.observe_smtp(status, seconds)
+    rerun = current_rerun()
+    if rerun is not None:
+        rerun.last_activity = time.perf_counter()
+        # Only the domain: reruns are exported as JSONL and must not carry addresses
+        rerun.smtp_sends.append({
+            'to_domain': to_email.rpartition('@')[2].lower() if to_email else None,
+            'subject': subject,
+            'seconds': seconds,
+            'status': status,
+        })
+
+
+def debug_panel_requested():
+    return DEBUG_PANEL_ENABLED and st.query_params.get(DEBUG_QUERY_PARAM) == DEBUG_QUERY_VALUE
+
+
+def render_debug_panel():
+    """Show this rerun's timings when the page is opened with ?debug=perf"""
+    rerun = current_rerun()
+    if rerun is None or not debug_panel_requested():
+        return
+
+    branch_seconds = time.perf_counter() - rerun.branch_started if rerun.branch_started else None
+    firestore_seconds = sum(call['seconds'] for call in rerun.firestore_calls)
+    smtp_seconds = sum(send['seconds'] for send in rerun.smtp_sends)
+
+    with st.expander("🛠️ Performance (this rerun)", expanded=True):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Rerun", f"{rerun.elapsed() * 1000:.0f} ms")
+        col2.metric(f"Branch: {rerun.branch or '-'}", f"{branch_seconds * 1000:.0f} ms" if branch_seconds else "-")
+        col3.metric("Firestore", f"{len(rerun.firestore_calls)} calls / {firestore_seconds * 1000:.0f} ms")
+        col4.metric("SMTP", f"{len(rerun.smtp_sends)} sends / {smtp_seconds * 1000:.0f} ms")
+
+        if rerun.firestore_calls:
+            by_shape = {}
+            for call in rerun.firestore_calls:
+                entry = by_shape.setdefault((call['op'], call['shape']), {
+                    'op': call['op'], 'shape': call['shape'], 'calls': 0, 'ms': 0.0, 'documents': 0})
+                entry['calls'] += 1
+                entry['ms'] += call['seconds'] * 1000
+                entry['documents'] += call['documents']
+            rows = sorted(by_shape.values(), key=lambda row: row['ms'], reverse=True)
+            for row in rows:
+                # The same shape issued over and over in one rerun is the usual N+1 signature
+                row['n_plus_1'] = '⚠️' if row['calls'] > 3 else ''
+                row['ms'] = round(row['ms'], 1)
+            st.markdown("**Firestore calls by shape**")
+            st.dataframe(rows, use_container_width=True)
+
+        if rerun.smtp_sends:
+            st.markdown("**SMTP sends**")
+            st.dataframe([dict(send, seconds=round(send['seconds'], 3)) for send in rerun.smtp_sends],
+                         use_container_width=True)
+
+        summary = query_stats.STATS.summary()
+        if summary:
+            st.markdown(f"**Firestore latency by shape since process start** "
+                        f"(slow threshold {query_stats.SLOW_QUERY_MS:.0f} ms)")
+            st.dataframe(summary, use_container_width=True)
@@ -0,0 +1,186 @@
+import importlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from services.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# Versioned scripts live in <repo>/migrations as NNNN_name.py and run in version order
+MIGRATIONS_PACKAGE = 'migrations'
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), MIGRATIONS_PACKAGE)
+# One document per version holding its status, per-collection cursors and counts
+STATE_COLLECTION = 'schema_migrations'
+PAGE_SIZE = 300
+NAME_PATTERN = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+@dataclass(slots=True)
+class MigrationScript:
+    """A migrations/NNNN_name.py module
+
+    The module's docstring describes it, COLLECTIONS lists what it walks, and
+    migrate(db, writer, snapshot) queues the writes for one document and returns
+    True if it queued any. A script that needs reads per document defines
+    migrate_page(db, writer, page) instead, which handles a whole page (so it can batch
+    those reads) and returns how many documents it migrated. Either must be idempotent:
+    a resumed run repeats at most the page that was in progress.
+    """
+    version: str
+    name: str
+    description: str
+    collections: tuple
+    migrate: object = None
+    migrate_page: object = None
+
+    def run_page(self, db, writer, page):
+        if self.migrate_page is not None:
+            return self.migrate_page(db, writer, page)
+        return sum(1 for snapshot in page if self.migrate(db, writer, snapshot))
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Migration scripts in `directory`, ordered by version"""
+    scripts = []
+    for filename in sorted(os.listdir(directory)):
+        match = NAME_PATTERN.match(filename)
+        if not match:
+            continue
+        module = importlib.import_module(f'{MIGRATIONS_PACKAGE}.{filename[:-3]}')
+        if not hasattr(module, 'migrate') and not hasattr(module, 'migrate_page'):
+            raise ValueError(f'{filename} defines neither migrate nor migrate_page')
+        scripts.append(MigrationScript(
+            version=match.group(1),
+            name=match.group(2),
+            description=(module.__doc__ or '').strip().splitlines()[0] if module.__doc__ else '',
+            collections=tuple(module.COLLECTIONS),
+            migrate=getattr(module, 'migrate', None),
+            migrate_page=getattr(module, 'migrate_page', None),
+        ))
+    versions = [script.version for script in scripts]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f'Duplicate migration versions in {directory}')
+    return scripts
+
+
+class DryRunWriter:
+    """Stands in for BatchWriter on a dry run: counts the writes a migration would make"""
+
+    def __init__(self):
+        self.writes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def set(self, ref, data, merge=False):
+        self.writes += 1
+
+    def create(self, ref, data):
+        self.writes += 1
+
+    def update(self, ref, data):
+        self.writes += 1
+
+    def delete(self, ref):
+        self.writes += 1
+
+
+class MigrationRunner:
+    """Runs migration scripts over their collections by document-id cursor
+
+    Each page of `page_size` documents is written in BatchWriter chunks and then
+    checkpointed to schema_migrations/{version}, so a stopped run resumes after the
+    last committed page. `rate` caps documents scanned per second to spread the load.
+    """
+
+    def __init__(self, db, page_size=PAGE_SIZE, rate=None, dry_run=False):
+        self.db = db
+        self.page_size = page_size
+        self.rate = rate
+        self.dry_run = dry_run
+
+    def _state_ref(self, script):
+        return self.db.collection(STATE_COLLECTION).document(script.version)
+
+    def state(self, script):
+        snapshot = self._state_ref(script).get()
+        return snapshot.to_dict() if snapshot.exists else {}
+
+    def _checkpoint(self, script, state):
+        if not self.dry_run:
+            self._state_ref(script).set({**state, 'updated_at': datetime.now()})
+
+    def _page(self, collection, cursor):
+        collection_ref = self.db.collection(collection)
+        query = collection_ref.order_by('__name__')
+        if cursor is not None:
+            query = query.where('__name__', '>', collection_ref.document(cursor))
+        return list(query.limit(self.page_size).stream())
+
+    def _throttle(self, scanned, started):
+        if self.rate:
+            delay = scanned / self.rate - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+    def run(self, script):
+        """Run (or resume) one migration; returns {'scanned', 'migrated', 'writes'} for this run"""
+        state = self.state(script)
+        if state.get('status') == 'complete':
+            logger.info(f'Migration {script.version} already complete')
+            return {'scanned': 0, 'migrated': 0, 'writes': 0}
+        state.update({'name': script.name, 'status': 'running'})
+        state.setdefault('cursors', {})
+        state.setdefault('done', [])
+        state.setdefault('started_at', datetime.now())
+        totals = {'scanned': 0, 'migrated': 0, 'writes': 0}
+        started = time.monotonic()
+        logger.info(f"{'Dry run of' if self.dry_run else 'Running'} migration {script.version}_{script.name}: {script.description}")
+        for collection in script.collections:
+            if collection in state['done']:
+                continue
+            while True:
+                page = self._page(collection, state['cursors'].get(collection))
+                writer = DryRunWriter() if self.dry_run else BatchWriter(self.db)
+                with writer:
+                    migrated = script.run_page(self.db, writer, page)
+                totals['scanned'] += len(page)
+                totals['migrated'] += migrated
+                totals['writes'] += writer.writes
+                if page:
+                    state['cursors'][collection] = page[-1].id
+                if len(page) < self.page_size:
+                    state['done'].append(collection)
+                state['scanned'] = state.get('scanned', 0) + len(page)
+                state['migrated'] = state.get('migrated', 0) + migrated
+                self._checkpoint(script, state)
+                self._throttle(totals['scanned'], started)
+                if len(page) < self.page_size:
+                    break
+            logger.info(f"Migration {script.version}: finished '{collection}'")
+        state['status'] = 'complete'
+        state['completed_at'] = datetime.now()
+        self._checkpoint(script, state)
+        logger.info(f"Migration {script.version} {'would migrate' if self.dry_run else 'migrated'} "
+                    f"{totals['migrated']} of {totals['scanned']} documents ({totals['writes']} writes) "
+                    f"in {time.monotonic() - started:.1f}s")
+        return totals
+
+    def pending(self, scripts, target=None):
+        return [script for script in scripts
+                if (target is None or script.version <= target) and self.state(script).get('status') != 'complete']
+
+    def run_pending(self, scripts, target=None):
+        """Run every incomplete migration up to `target` in version order, stopping at the first failure"""
+        pending = self.pending(scripts, target)
+        if not pending:
+            logger.info('No pending migrations')
+        for script in pending:
+            self.run(script)
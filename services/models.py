@@ -0,0 +1,221 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+# Sort key for documents without a usable date, matching the pages' MIN_DATETIME
+MIN_DATETIME = datetime(2000, 1, 1)
+# Length assumed for events created before they had a duration
+DEFAULT_DURATION_HOURS = 2
+
+
+def to_naive_utc(value):
+    """Normalize a Firestore timestamp to a naive UTC datetime; anything else becomes None"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass(slots=True)
+class Event:
+    id: str
+    title: str
+    description: str
+    date: datetime | None
+    location: str
+    required_volunteers: object
+    skills_required: tuple
+    org_id: str | None
+    org_name: str | None
+    org_email: str | None
+    status: str
+    applications_count: int
+    created_at: datetime | None
+    sort_key: datetime
+    search_text: str
+    series_id: str | None
+    duration_hours: float
+    end_date: datetime | None
+
+    @classmethod
+    def from_dict(cls, doc_id, data):
+        event_date = to_naive_utc(data.get('date'))
+        duration_hours = data.get('duration_hours') or DEFAULT_DURATION_HOURS
+        raw_title = data.get('title', '')
+        raw_description = data.get('description', '')
+        return cls(
+            id=doc_id,
+            title=raw_title or 'Event Title',
+            description=raw_description or 'No description available.',
+            date=event_date,
+            location=data.get('location', 'Location TBD'),
+            required_volunteers=data.get('required_volunteers', 'Not specified'),
+            skills_required=tuple(data.get('skills_required') or ()),
+            org_id=data.get('org_id'),
+            org_name=data.get('org_name'),
+            org_email=data.get('org_email'),
+            status=data.get('status', 'active'),
+            applications_count=len(data.get('applications', [])),
+            created_at=to_naive_utc(data.get('created_at')),
+            sort_key=event_date or MIN_DATETIME,
+            # Lower-cased once so substring search does no per-keystroke string work
+            search_text=f"{raw_title}\n{raw_description}".lower(),
+            series_id=data.get('series_id'),
+            duration_hours=duration_hours,
+            end_date=event_date + timedelta(hours=duration_hours) if event_date else None,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls.from_dict(snapshot.id, snapshot.to_dict() or {})
+
+    def email_data(self):
+        """Fields EmailService templates read from an event"""
+        return {'title': self.title, 'date': self.date, 'location': self.location}
+
+
+@dataclass(slots=True)
+class Application:
+    id: str
+    event_id: str | None
+    volunteer_id: str | None
+    volunteer_name: str
+    volunteer_email: str | None
+    volunteer_phone: str | None
+    event_title: str
+    org_id: str | None
+    organization_name: str
+    status: str
+    applied_at: datetime | None
+    sort_key: datetime
+    # From the event snapshot (services.event_snapshots); event_status is None without a complete one
+    event_date: datetime | None
+    event_location: str | None
+    event_status: str | None
+    event_end: datetime | None
+
+    @classmethod
+    def from_dict(cls, doc_id, data):
+        applied_at = to_naive_utc(data.get('created_at') or data.get('applied_at'))
+        snapshot = data.get('event_snapshot') or {}
+        complete = 'version' in snapshot
+        event_date = to_naive_utc(snapshot.get('date')) if complete else None
+        return cls(
+            id=doc_id,
+            event_id=data.get('event_id'),
+            volunteer_id=data.get('volunteer_id'),
+            volunteer_name=data.get('volunteer_name', 'Volunteer'),
+            volunteer_email=data.get('volunteer_email'),
+            volunteer_phone=data.get('volunteer_phone'),
+            event_title=data.get('event_title', 'Unknown Event'),
+            org_id=data.get('org_id'),
+            organization_name=data.get('organization_name', 'Unknown Organization'),
+            status=data.get('status', 'pending'),
+            applied_at=applied_at,
+            sort_key=applied_at or MIN_DATETIME,
+            event_date=event_date,
+            event_location=snapshot.get('location') if complete else None,
+            event_status=snapshot.get('status') if complete else None,
+            event_end=(event_date + timedelta(hours=snapshot.get('duration_hours') or DEFAULT_DURATION_HOURS)
+                       if complete and event_date else None),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls.from_dict(snapshot.id, snapshot.to_dict() or {})
+
+
+@dataclass(slots=True)
+class Notification:
+    id: str
+    title: str
+    message: str
+    type: str
+    read: bool
+    timestamp: datetime | None
+    event_id: str | None
+    volunteer_id: str | None
+    org_id: str | None
+    sort_key: datetime
+
+    @classmethod
+    def from_dict(cls, doc_id, data):
+        timestamp = to_naive_utc(data.get('timestamp'))
+        return cls(
+            id=doc_id,
+            title=data.get('title', 'Notification'),
+            message=data.get('message', ''),
+            type=data.get('type', 'general'),
+            read=data.get('read', False),
+            timestamp=timestamp,
+            event_id=data.get('event_id'),
+            volunteer_id=data.get('volunteer_id'),
+            org_id=data.get('org_id'),
+            sort_key=timestamp or MIN_DATETIME,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls.from_dict(snapshot.id, snapshot.to_dict() or {})
+
+    @property
+    def type_label(self):
+        return self.type.replace('_', ' ').title()
+
+    @property
+    def time_label(self):
+        return self.timestamp.strftime('%d-%m-%Y %H:%M:%S') if self.timestamp else 'Recent'
+
+
+@dataclass(slots=True)
+class Volunteer:
+    id: str
+    name: str
+    email: str
+    phone: str
+    contact_number: str
+    bio: str
+    skills: tuple
+
+    @classmethod
+    def from_dict(cls, doc_id, data):
+        return cls(
+            id=doc_id,
+            name=data.get('name', ''),
+            email=data.get('email', ''),
+            phone=data.get('phone', ''),
+            contact_number=data.get('contact_number', ''),
+            bio=data.get('bio', ''),
+            skills=tuple(data.get('skills') or ()),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls.from_dict(snapshot.id, snapshot.to_dict() or {})
+
+
+@dataclass(slots=True)
+class Organization:
+    id: str
+    name: str
+    email: str
+    phone: str
+    contact_number: str
+    description: str
+    website: str
+
+    @classmethod
+    def from_dict(cls, doc_id, data):
+        return cls(
+            id=doc_id,
+            name=data.get('name', ''),
+            email=data.get('email', ''),
+            phone=data.get('phone', ''),
+            contact_number=data.get('contact_number', ''),
+            description=data.get('description', ''),
+            website=data.get('website', ''),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls.from_dict(snapshot.id, snapshot.to_dict() or {})
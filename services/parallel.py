@@ -0,0 +1,54 @@
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Shared by every session in the process, so concurrent reruns cannot open unbounded threads
+MAX_WORKERS = int(os.environ.get('VOL_LINK_READ_WORKERS', '8'))
+# Firestore accepts at most this many documents per BatchGetDocuments call
+GET_ALL_CHUNK = 300
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='vol-link-read')
+    return _executor
+
+
+def run_parallel(*calls):
+    """Run independent zero-argument callables concurrently and return their results in order
+
+    Each call runs in a copy of the caller's context, so Firestore calls made on the pool
+    are still attributed to the current rerun's metrics. The first exception is re-raised.
+    """
+    if len(calls) == 1:
+        return [calls[0]()]
+    futures = [executor().submit(contextvars.copy_context().run, call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def stream_list(query):
+    """Materialize a query on the calling thread; use as `lambda: stream_list(q)` in run_parallel"""
+    return list(query.stream())
+
+
+def get_documents(db, collection, doc_ids):
+    """Fetch documents by id with batched get_all calls; returns {doc_id: snapshot} for those that exist"""
+    unique_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id))
+    if not unique_ids:
+        return {}
+    collection_ref = db.collection(collection)
+    chunks = [unique_ids[start:start + GET_ALL_CHUNK] for start in range(0, len(unique_ids), GET_ALL_CHUNK)]
+    results = run_parallel(*[
+        (lambda chunk=chunk: list(db.get_all([collection_ref.document(doc_id) for doc_id in chunk])))
+        for chunk in chunks
+    ])
+    return {snapshot.id: snapshot for snapshots in results for snapshot in snapshots if snapshot.exists}
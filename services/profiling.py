@@ -0,0 +1,144 @@
+import cProfile
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get(
+    'VOL_LINK_PROFILE_DIR',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'profiles'))
+)
+# Limits that keep the hook safe to leave enabled in production
+MAX_PROFILES_PER_HOUR = int(os.environ.get('VOL_LINK_PROFILE_MAX_PER_HOUR', '6'))
+MAX_PROFILE_FILES = int(os.environ.get('VOL_LINK_PROFILE_MAX_FILES', '50'))
+SAMPLING_INTERVAL = float(os.environ.get('VOL_LINK_PROFILE_INTERVAL', '0.001'))
+PROFILE_QUERY_PARAM = 'profile'
+PROFILER_QUERY_PARAM = 'profiler'
+
+_recent_profiles = deque()
+_rate_lock = threading.Lock()
+
+
+def _profile_token():
+    try:
+        token = st.secrets.get('VOL_LINK_PROFILE_TOKEN')
+    except Exception:
+        token = None
+    return token or os.environ.get('VOL_LINK_PROFILE_TOKEN')
+
+
+def _is_admin_request():
+    """Only requests carrying the configured admin token may profile"""
+    expected = _profile_token()
+    supplied = st.query_params.get(PROFILE_QUERY_PARAM)
+    return bool(expected and supplied and hmac.compare_digest(str(supplied), str(expected)))
+
+
+def _take_rate_slot():
+    now = time.monotonic()
+    with _rate_lock:
+        while _recent_profiles and now - _recent_profiles[0] > 3600:
+            _recent_profiles.popleft()
+        if len(_recent_profiles) >= MAX_PROFILES_PER_HOUR:
+            return False
+        _recent_profiles.append(now)
+        return True
+
+
+class RerunProfile:
+    """One profiled rerun: pyinstrument (flame graph HTML) or cProfile (pstats)"""
+
+    def __init__(self, page, kind):
+        self.page = page
+        self.kind = kind
+        self.started_at = datetime.now()
+        self.path = None
+        if kind == 'pyinstrument':
+            self._profiler = SamplingProfiler(interval=SAMPLING_INTERVAL)
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stem = os.path.join(PROFILE_DIR, f"{self.page}-{self.started_at.strftime('%Y%m%d-%H%M%S-%f')}")
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            self.path = f'{stem}.html'
+            with open(self.path, 'w') as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            self.path = f'{stem}.pstats'
+            self._profiler.dump_stats(self.path)
+        _prune_old_profiles()
+        logger.info(f'Saved {self.kind} profile of {self.page} to {self.path}')
+        return self.path
+
+
+def _prune_old_profiles():
+    files = sorted(
+        (os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR)
+         if name.endswith(('.html', '.pstats'))),
+        key=os.path.getmtime
+    )
+    for path in files[:-MAX_PROFILE_FILES]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.error(f'Error pruning profile {path}: {str(e)}')
+
+
+def start_if_requested(page):
+    """Start profiling this rerun when an admin opened the page with ?profile=<token>
+
+    The query parameter is consumed, so exactly one rerun is captured per request.
+    """
+    previous = st.session_state.pop('_rerun_profile', None)
+    if previous is not None:
+        # Previous rerun ended early (st.rerun/st.switch_page); keep what it captured
+        try:
+            previous.stop()
+        except Exception as e:
+            logger.error(f'Error saving interrupted profile: {str(e)}')
+
+    if not _is_admin_request():
+        return None
+    kind = st.query_params.get(PROFILER_QUERY_PARAM, 'pyinstrument' if SamplingProfiler else 'cprofile')
+    del st.query_params[PROFILE_QUERY_PARAM]
+    if kind == 'pyinstrument' and SamplingProfiler is None:
+        kind = 'cprofile'
+    if not _take_rate_slot():
+        logger.warning(f'Profile of {page} skipped: limit of {MAX_PROFILES_PER_HOUR} per hour reached')
+        st.session_state['_rerun_profile_message'] = "Profiling limit reached; try again later."
+        return None
+    profile = RerunProfile(page, kind)
+    st.session_state['_rerun_profile'] = profile
+    return profile
+
+
+def finish():
+    """Stop and save the active rerun profile, if any"""
+    profile = st.session_state.pop('_rerun_profile', None)
+    message = st.session_state.pop('_rerun_profile_message', None)
+    if profile is not None:
+        try:
+            message = f"Profile saved to {profile.stop()}"
+        except Exception as e:
+            message = f"Error saving profile: {str(e)}"
+            logger.error(message)
+    if message:
+        st.caption(f"🧪 {message}")
@@ -0,0 +1,126 @@
+import bisect
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('vol_link.slow_query')
+
+SLOW_QUERY_MS = float(os.environ.get('VOL_LINK_SLOW_QUERY_MS', '500'))
+SLOW_QUERY_LOG_PATH = os.environ.get('VOL_LINK_SLOW_QUERY_LOG')
+
+# Upper bounds in milliseconds; Firestore round trips live between a few ms and a few seconds
+BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf')]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, cheap enough to update on every call"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Estimate the q-quantile (0..1) by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS_MS[i - 1] if i else 0.0
+                upper = BUCKETS_MS[i] if BUCKETS_MS[i] != float('inf') else self.max_ms
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max_ms)
+            seen += bucket_count
+        return self.max_ms
+
+
+class QueryStats:
+    """Per (operation, query shape) latency histograms for the whole process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, op, shape, ms):
+        with self._lock:
+            histogram = self.histograms.get((op, shape))
+            if histogram is None:
+                histogram = self.histograms[(op, shape)] = LatencyHistogram()
+            histogram.observe(ms)
+
+    def summary(self):
+        """Rows of count/p50/p95/p99/max per shape, slowest p95 first"""
+        with self._lock:
+            rows = [{
+                'op': op,
+                'shape': shape,
+                'count': histogram.count,
+                'p50_ms': round(histogram.percentile(0.50), 1),
+                'p95_ms': round(histogram.percentile(0.95), 1),
+                'p99_ms': round(histogram.percentile(0.99), 1),
+                'max_ms': round(histogram.max_ms, 1),
+                'mean_ms': round(histogram.sum_ms / histogram.count, 1),
+            } for (op, shape), histogram in self.histograms.items()]
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def to_prometheus(self):
+        lines = [
+            '# HELP vol_link_firestore_latency_ms Firestore call latency per query shape.',
+            '# TYPE vol_link_firestore_latency_ms histogram',
+        ]
+        with self._lock:
+            for (op, shape), histogram in sorted(self.histograms.items()):
+                labels = f'op="{op}",shape="{escape_label(shape)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS_MS, histogram.counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                    lines.append(f'vol_link_firestore_latency_ms_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'vol_link_firestore_latency_ms_sum{{{labels}}} {histogram.sum_ms:.3f}')
+                lines.append(f'vol_link_firestore_latency_ms_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+STATS = QueryStats()
+_log_lock = threading.Lock()
+
+
+def escape_label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def observe(op, shape, seconds, documents, page=None, session_id=None):
+    """Feed one Firestore call into the histograms and the slow-query log"""
+    ms = seconds * 1000
+    STATS.observe(op, shape, ms)
+    if ms < SLOW_QUERY_MS:
+        return
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'op': op,
+        'shape': shape,
+        'ms': round(ms, 1),
+        'documents': documents,
+        'page': page,
+        'session_id': session_id,
+    }
+    slow_query_logger.warning(
+        f"Slow Firestore {op} ({ms:.0f} ms, {documents} docs) on page={page} session={session_id}: {shape}")
+    if SLOW_QUERY_LOG_PATH:
+        try:
+            with _log_lock, open(SLOW_QUERY_LOG_PATH, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            logger.error(f'Error writing slow query log: {str(e)}')
@@ -0,0 +1,192 @@
+import calendar
+import logging
+import os
+from datetime import datetime, timedelta
+
+from firebase_admin import firestore
+
+from services import event_changes, parallel, sync
+from services.batch_writer import BatchWriter
+from services.models import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+SERIES_COLLECTION = 'series'
+FREQUENCIES = ('weekly', 'monthly')
+# Occurrences are materialized as event documents only this far ahead; the scheduler rolls it forward
+HORIZON_WEEKS = int(os.environ.get('VOL_LINK_SERIES_HORIZON_WEEKS', '8'))
+# Safety net for rules without an end
+MAX_OCCURRENCES = 520
+
+
+def make_rule(freq, interval=1, until=None, count=None):
+    """RRULE-style rule as stored on a series document"""
+    if freq not in FREQUENCIES:
+        raise ValueError(f'Unsupported frequency: {freq}')
+    if interval < 1:
+        raise ValueError('interval must be at least 1')
+    if count is not None and count < 1:
+        raise ValueError('count must be at least 1')
+    return {'freq': freq, 'interval': int(interval), 'until': until, 'count': int(count) if count else None}
+
+
+def _add_months(start, months):
+    """`start` moved by whole months, or None when that month has no such day (e.g. the 31st)"""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+def occurrences(start, rule):
+    """Every occurrence of `rule` from `start`, in order; skipped month days do not count"""
+    until = to_naive_utc(rule.get('until'))
+    count = rule.get('count') or MAX_OCCURRENCES
+    interval = rule.get('interval', 1)
+    produced = 0
+    step = 0
+    while produced < count:
+        if rule['freq'] == 'weekly':
+            occurrence = start + timedelta(weeks=interval * step)
+        else:
+            occurrence = _add_months(start, interval * step)
+        step += 1
+        if occurrence is None:
+            continue
+        if until is not None and occurrence > until:
+            return
+        produced += 1
+        yield occurrence
+
+
+def occurrence_id(series_id, occurrence):
+    """Deterministic event id, so re-running an expansion overwrites instead of duplicating"""
+    return f"{series_id}_{occurrence.strftime('%Y%m%d%H%M')}"
+
+
+def create_series(db, event_data, start, rule, now=None):
+    """Store a series and expand its first horizon of events; returns (series_id, events created)"""
+    now = now or datetime.now()
+    template = {key: value for key, value in event_data.items() if key not in ('date', 'created_at')}
+    series_ref = db.collection(SERIES_COLLECTION).document()
+    series_data = {
+        'org_id': event_data.get('org_id'),
+        'template': template,
+        'start': start,
+        'rule': rule,
+        'status': 'active',
+        'generated_until': None,
+        'generated_count': 0,
+        'created_at': now,
+    }
+    series_ref.set(series_data)
+    return series_ref.id, expand_series(db, series_ref.id, series_data, now=now)
+
+
+def expand_series(db, series_id, series_data, now=None, horizon_weeks=HORIZON_WEEKS):
+    """Create the series' events that fall inside the horizon and were not generated yet"""
+    now = now or datetime.now()
+    horizon_end = now + timedelta(weeks=horizon_weeks)
+    start = to_naive_utc(series_data['start'])
+    generated_until = to_naive_utc(series_data.get('generated_until'))
+    generated_count = series_data.get('generated_count', 0)
+    created = 0
+    last = generated_until
+    exhausted = True
+    with BatchWriter(db) as writer:
+        for occurrence in occurrences(start, series_data['rule']):
+            if occurrence > horizon_end:
+                exhausted = False
+                break
+            if generated_until is not None and occurrence <= generated_until:
+                continue
+            event_data = {**series_data['template'], 'date': occurrence, 'created_at': now,
+                          'series_id': series_id, 'applications': []}
+            writer.set(db.collection('events').document(occurrence_id(series_id, occurrence)), sync.stamped(event_data))
+            created += 1
+            last = occurrence
+        progress = {}
+        if created:
+            # Queued after the events, so the watermark never gets ahead of what was written
+            progress.update({'generated_until': last, 'generated_count': generated_count + created})
+        if exhausted:
+            # Until/count reached: the scheduler no longer needs to look at this series
+            progress['status'] = 'completed'
+        if progress:
+            writer.update(db.collection(SERIES_COLLECTION).document(series_id), progress)
+    if created:
+        logger.info(f'Expanded series {series_id} by {created} events up to {last}')
+    return created
+
+
+def extend_all_series(db, now=None, horizon_weeks=HORIZON_WEEKS):
+    """Roll every active series forward to the horizon; returns the number of events created"""
+    now = now or datetime.now()
+    created = 0
+    for snapshot in db.collection(SERIES_COLLECTION).where('status', '==', 'active').stream():
+        try:
+            created += expand_series(db, snapshot.id, snapshot.to_dict(), now=now, horizon_weeks=horizon_weeks)
+        except Exception as e:
+            logger.error(f'Error expanding series {snapshot.id}: {str(e)}')
+    return created
+
+
+def future_events(db, series_id, start=None):
+    """Event snapshots of a series dated at or after `start` (default now), in date order"""
+    start = start or datetime.now()
+    snapshots = [snapshot for snapshot in db.collection('events').where('series_id', '==', series_id).stream()
+                 if (to_naive_utc((snapshot.to_dict() or {}).get('date')) or start) >= start]
+    return sorted(snapshots, key=lambda snapshot: to_naive_utc((snapshot.to_dict() or {}).get('date')) or start)
+
+
+def _applications_by_event(db, snapshots):
+    results = parallel.run_parallel(*[
+        (lambda event_id=snapshot.id: event_changes.active_applications(db, event_id)) for snapshot in snapshots
+    ]) if snapshots else []
+    return dict(zip((snapshot.id for snapshot in snapshots), results))
+
+
+def update_series(db, series_id, changes, start=None, now=None):
+    """Apply `changes` to the template and to every event of the series from `start` on
+
+    Each event's applications are updated and notified as event_changes.edit_event does;
+    events before `start` keep their data. A date is per occurrence, so it cannot be
+    changed series-wide. Returns (events updated, applications touched, email recipients).
+    """
+    if 'date' in changes:
+        raise ValueError('A date change applies to a single event, not a whole series')
+    now = now or datetime.now()
+    snapshots = future_events(db, series_id, start)
+    applications = _applications_by_event(db, snapshots)
+    with BatchWriter(db) as writer:
+        for snapshot in snapshots:
+            event_changes.queue_edit(db, writer, snapshot.id, (snapshot.to_dict() or {}).get('title', ''),
+                                     changes, applications[snapshot.id], now)
+        # Last, so occurrences generated from now on only pick the change up once the events have it
+        writer.update(db.collection(SERIES_COLLECTION).document(series_id),
+                      {f'template.{key}': value for key, value in changes.items()})
+    touched = [application for event_applications in applications.values() for application in event_applications]
+    logger.info(f'Updated series {series_id}: {len(snapshots)} events, {len(touched)} applications notified')
+    return len(snapshots), len(touched), event_changes.recipients(touched)
+
+
+def end_series(db, series_id, start=None, reason='', now=None):
+    """Stop generating a series and cancel its events from `start` on, with their applications
+
+    Active applicants are cancelled and notified as event_changes.cancel_event does.
+    Returns (events cancelled, applications cancelled, email recipients).
+    """
+    now = now or datetime.now()
+    snapshots = [snapshot for snapshot in future_events(db, series_id, start)
+                 if (snapshot.to_dict() or {}).get('status') != 'cancelled']
+    applications = _applications_by_event(db, snapshots)
+    with BatchWriter(db) as writer:
+        writer.update(db.collection(SERIES_COLLECTION).document(series_id),
+                      {'status': 'ended', 'ended_at': firestore.SERVER_TIMESTAMP})
+        for snapshot in snapshots:
+            event_changes.queue_cancel(db, writer, snapshot.id, (snapshot.to_dict() or {}).get('title', ''),
+                                       reason, applications[snapshot.id], now)
+    cancelled = [application for event_applications in applications.values() for application in event_applications]
+    logger.info(f'Ended series {series_id}: {len(snapshots)} events and {len(cancelled)} applications cancelled')
+    return len(snapshots), len(cancelled), event_changes.recipients(cancelled)
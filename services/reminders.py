@@ -0,0 +1,164 @@
+import heapq
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from services.models import Application, Event
+
+logger = logging.getLogger(__name__)
+
+# Hours before an event starts at which accepted volunteers are reminded
+REMINDER_OFFSETS_HOURS = [
+    float(hours) for hours in os.environ.get('VOL_LINK_REMINDER_OFFSETS', '24,2').split(',') if hours.strip()
+]
+# How far past the largest offset each refresh looks; only this window of events is loaded
+REMINDER_HORIZON = timedelta(hours=float(os.environ.get('VOL_LINK_REMINDER_HORIZON_HOURS', '6')))
+REMINDER_CHECKPOINT_PATH = os.environ.get(
+    'VOL_LINK_REMINDER_CHECKPOINT',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'reminders.json'))
+)
+
+
+class ReminderCheckpoint:
+    """Which (event, offset) reminders were already sent, persisted as JSON across restarts"""
+
+    def __init__(self, path):
+        self.path = path
+        self.sent = {}
+        self._load()
+
+    @staticmethod
+    def key(event_id, offset_hours):
+        return f'{event_id}:{offset_hours:g}'
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                self.sent = json.load(f).get('sent', {})
+        except FileNotFoundError:
+            self.sent = {}
+        except (OSError, ValueError) as e:
+            logger.error(f'Error reading reminder checkpoint {self.path}, starting empty: {str(e)}')
+            self.sent = {}
+
+    def is_sent(self, event_id, offset_hours):
+        return self.key(event_id, offset_hours) in self.sent
+
+    def mark_sent(self, event_id, offset_hours, event_date):
+        # Stores the event date so entries can be pruned once the event is over
+        self.sent[self.key(event_id, offset_hours)] = event_date.isoformat()
+        self.save()
+
+    def prune(self, now):
+        self.sent = {key: event_date for key, event_date in self.sent.items()
+                     if datetime.fromisoformat(event_date) >= now}
+
+    def save(self):
+        """Atomically rewrite the checkpoint so a crash never leaves it half written"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'sent': self.sent, 'updated_at': datetime.now().isoformat()}, f)
+        os.replace(tmp_path, self.path)
+
+
+class ReminderScheduler:
+    """Fires event reminders from a min-heap of (send_at, event, offset) entries
+
+    Instead of polling the whole `events` collection, each refresh loads only the active
+    events starting within the next max(offset) + horizon and rebuilds the heap; between
+    refreshes the loop sleeps until the earliest reminder is due.
+    """
+
+    def __init__(self, db, email_service, offsets=None, horizon=REMINDER_HORIZON,
+                 checkpoint_path=REMINDER_CHECKPOINT_PATH):
+        self.db = db
+        self.email_service = email_service
+        self.offsets = sorted(offsets or REMINDER_OFFSETS_HOURS, reverse=True)
+        self.horizon = horizon
+        self.checkpoint = ReminderCheckpoint(checkpoint_path)
+        self._heap = []
+        self._events = {}
+
+    def window_end(self, now):
+        return now + timedelta(hours=max(self.offsets)) + self.horizon
+
+    def refresh(self, now=None):
+        """Reload upcoming events and rebuild the reminder heap"""
+        now = now or datetime.now()
+        events_ref = (self.db.collection('events')
+                      .where('status', '==', 'active')
+                      .where('date', '>', now)
+                      .where('date', '<=', self.window_end(now))
+                      .stream())
+        self._events = {}
+        heap = []
+        for snapshot in events_ref:
+            event = Event.from_snapshot(snapshot)
+            if event.date is None:
+                continue
+            self._events[event.id] = event
+            for offset in self.offsets:
+                if not self.checkpoint.is_sent(event.id, offset):
+                    # Reminders missed while the scheduler was down fire right away
+                    heap.append((event.date - timedelta(hours=offset), event.id, offset))
+        heapq.heapify(heap)
+        self._heap = heap
+        self.checkpoint.prune(now)
+        logger.info(f'Reminder heap holds {len(heap)} reminders for {len(self._events)} upcoming events')
+
+    def next_due(self):
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now=None):
+        """Send every reminder whose time has come; returns the number of emails sent"""
+        now = now or datetime.now()
+        sent = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, event_id, offset = heapq.heappop(self._heap)
+            event = self._events.get(event_id)
+            if event is None or event.date <= now or self.checkpoint.is_sent(event_id, offset):
+                continue
+            if any(event.date - timedelta(hours=closer) <= now for closer in self.offsets if closer < offset):
+                # Overdue after downtime and a closer reminder is due too; only that one is sent
+                self.checkpoint.mark_sent(event_id, offset, event.date)
+                continue
+            sent += self.send_reminders(event, offset)
+            self.checkpoint.mark_sent(event_id, offset, event.date)
+        return sent
+
+    def send_reminders(self, event, offset):
+        applications_ref = (self.db.collection('applications')
+                            .where('event_id', '==', event.id)
+                            .where('status', '==', 'accepted')
+                            .stream())
+        recipients = []
+        for snapshot in applications_ref:
+            application = Application.from_snapshot(snapshot)
+            if application.volunteer_email:
+                recipients.append((application.volunteer_email, application.volunteer_name))
+        if not recipients:
+            return 0
+        results = self.email_service.send_event_reminders(
+            recipients, event.email_data(), event.org_name or 'the organization', offset)
+        logger.info(f'Sent {sum(results)} of {len(recipients)} {offset:g}h reminders for event {event.id}')
+        return sum(results)
+
+    def run_forever(self, stop, refresh_interval=900):
+        """Loop until `stop` (a threading.Event) is set, refreshing every `refresh_interval` seconds"""
+        next_refresh = datetime.now()
+        while not stop.is_set():
+            now = datetime.now()
+            try:
+                if now >= next_refresh:
+                    self.refresh(now)
+                    next_refresh = now + timedelta(seconds=refresh_interval)
+                self.run_due(now)
+            except Exception as e:
+                logger.error(f'Reminder run failed: {str(e)}')
+            wake_at = min(filter(None, [self.next_due(), next_refresh]))
+            stop.wait(max(1.0, (wake_at - datetime.now()).total_seconds()))
+
@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+
+from google.cloud.firestore_v1 import DocumentReference, GeoPoint
+
+# JSON for Firestore document data kept on local disk (event mirror, archives, backups);
+# timestamps round-trip as {"$dt": iso} so they come back as datetimes rather than strings.
+# Geopoints round-trip as {"$geo": [lat, lng]}; references are stored as {"$ref": path} and
+# come back as references when loads() is given a client, otherwise as the path string.
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    if isinstance(value, GeoPoint):
+        return {'$geo': [value.latitude, value.longitude]}
+    if isinstance(value, DocumentReference):
+        return {'$ref': value.path}
+    raise TypeError(f'Cannot serialize value of type {type(value).__name__}')
+
+
+def _decoder(db):
+    def decode(obj):
+        if len(obj) == 1:
+            if '$dt' in obj:
+                return datetime.fromisoformat(obj['$dt'])
+            if '$geo' in obj:
+                return GeoPoint(*obj['$geo'])
+            if '$ref' in obj:
+                return db.document(obj['$ref']) if db is not None else obj['$ref']
+        return obj
+    return decode
+
+
+def dumps(data):
+    return json.dumps(data, default=_encode)
+
+
+def loads(text, db=None):
+    return json.loads(text, object_hook=_decoder(db))
@@ -0,0 +1,193 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from services import browser_cookies
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# sqlite:///data/sessions.db or redis://host:6379/0; unset keeps sessions in-process only
+SESSION_STORE_URL = os.environ.get('VOL_LINK_SESSION_STORE')
+SESSION_TTL = int(os.environ.get('VOL_LINK_SESSION_TTL', str(7 * 24 * 3600)))
+COOKIE_NAME = 'vol_link_sid'
+# Session state that must survive a request landing on another replica
+PERSISTED_KEYS = (
+    'authenticated', 'user_type',
+    'volunteer_id', 'volunteer_name', 'volunteer_email',
+    'org_id', 'org_name',
+    'current_page', 'selected_tab',
+)
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file shared by replicas on one machine (or a shared volume)"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS sessions '
+                           '(sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at)')
+
+    def load(self, sid):
+        with self._lock:
+            row = self._conn.execute('SELECT data, expires_at FROM sessions WHERE sid = ?', (sid,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def save(self, sid, data, ttl):
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)',
+                               (sid, json.dumps(data), time.time() + ttl))
+            # Opportunistic cleanup keeps the table from growing without a cron job
+            self._conn.execute('DELETE FROM sessions WHERE expires_at < ?', (time.time(),))
+
+    def delete(self, sid):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+
+class RedisSessionStore:
+    """Sessions in Redis (or any server speaking its protocol) for replicas on many machines"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError('redis is not installed; pip install redis to use a redis:// session store')
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, sid):
+        return f'vol-link:session:{sid}'
+
+    def load(self, sid):
+        raw = self._client.get(self._key(sid))
+        return json.loads(raw) if raw else None
+
+    def save(self, sid, data, ttl):
+        self._client.set(self._key(sid), json.dumps(data), ex=ttl)
+
+    def delete(self, sid):
+        self._client.delete(self._key(sid))
+
+
+def open_store(url):
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        return RedisSessionStore(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteSessionStore(url[len('sqlite:///'):])
+    raise ValueError(f'Unsupported session store URL: {url}')
+
+
+@st.cache_resource
+def get_store():
+    """The process-wide session store, or None when VOL_LINK_SESSION_STORE is not set"""
+    if not SESSION_STORE_URL:
+        return None
+    try:
+        return open_store(SESSION_STORE_URL)
+    except Exception as e:
+        logger.error(f'Error opening session store: {str(e)}')
+        return None
+
+
+def _session_secret():
+    try:
+        secret = st.secrets.get('VOL_LINK_SESSION_SECRET')
+    except Exception:
+        secret = None
+    return secret or os.environ.get('VOL_LINK_SESSION_SECRET')
+
+
+def sign(sid, secret):
+    signature = hmac.new(secret.encode(), sid.encode(), hashlib.sha256).hexdigest()
+    return f'{sid}.{signature}'
+
+
+def verify(token, secret):
+    """Return the session id from a signed token, or None if it was tampered with"""
+    sid, _, signature = (token or '').partition('.')
+    if not sid or not signature:
+        return None
+    return sid if hmac.compare_digest(sign(sid, secret), token) else None
+
+
+def _snapshot():
+    return {key: st.session_state[key] for key in PERSISTED_KEYS if key in st.session_state}
+
+
+def restore():
+    """Reload auth and navigation state saved by another replica; call before auth checks"""
+    store = get_store()
+    secret = _session_secret()
+    if store is None or not secret or st.session_state.get('authenticated') or st.session_state.get('org_id'):
+        return False
+    sid = verify(browser_cookies.read_cookie(COOKIE_NAME), secret)
+    if sid is None:
+        return False
+    try:
+        data = store.load(sid)
+    except Exception as e:
+        logger.error(f'Error loading session: {str(e)}')
+        return False
+    if not data:
+        return False
+    for key, value in data.items():
+        if key in PERSISTED_KEYS:
+            st.session_state[key] = value
+    st.session_state['_session_id'] = sid
+    st.session_state['_session_saved'] = data
+    st.session_state['_session_cookie_set'] = True
+    return True
+
+
+def persist():
+    """Save persisted keys when they changed and hand the browser its signed cookie once"""
+    store = get_store()
+    secret = _session_secret()
+    if store is None or not secret:
+        return
+    data = _snapshot()
+    if not data.get('authenticated') and not data.get('org_id'):
+        return
+    sid = st.session_state.get('_session_id')
+    if sid is None:
+        sid = st.session_state['_session_id'] = secrets.token_urlsafe(32)
+    if data != st.session_state.get('_session_saved'):
+        try:
+            store.save(sid, data, SESSION_TTL)
+            st.session_state['_session_saved'] = data
+        except Exception as e:
+            logger.error(f'Error saving session: {str(e)}')
+            return
+    if not st.session_state.get('_session_cookie_set'):
+        browser_cookies.write_cookie(COOKIE_NAME, sign(sid, secret), SESSION_TTL)
+        st.session_state['_session_cookie_set'] = True
+
+
+def logout():
+    """Forget the stored session so its cookie no longer restores anything"""
+    store = get_store()
+    sid = st.session_state.get('_session_id')
+    if store is None or sid is None:
+        return
+    try:
+        store.delete(sid)
+    except Exception as e:
+        logger.error(f'Error deleting session: {str(e)}')
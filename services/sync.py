@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+from firebase_admin import firestore
+
+from services import event_mirror
+from services.models import Event, Organization, to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Collections whose writes are stamped with updated_at and can be delta-synced
+SYNCED_COLLECTIONS = ('events', 'applications', 'organizations')
+TOMBSTONES_COLLECTION = 'tombstones'
+# Fallback watermark lag for collections whose documents predate updated_at stamping
+CLOCK_SKEW = timedelta(minutes=1)
+# Minimum seconds between delta queries for a shared cache; reruns inside the window read nothing
+SYNC_INTERVAL = float(os.environ.get('VOL_LINK_SYNC_INTERVAL', '2'))
+READY_TIMEOUT = 60
+
+
+def stamped(data):
+    """Return `data` with updated_at set to the commit time, for writes to synced collections"""
+    return {**data, 'updated_at': firestore.SERVER_TIMESTAMP}
+
+
+def delete_with_tombstone(writer, ref):
+    """Delete `ref` and leave a tombstone so delta-synced caches drop it too
+
+    `writer` is anything with set()/delete(), e.g. a WriteBatch, Transaction or BatchWriter.
+    """
+    collection_id = ref.parent.id
+    tombstone_ref = ref._client.collection(TOMBSTONES_COLLECTION).document(f'{collection_id}__{ref.id}')
+    writer.set(tombstone_ref, {
+        'collection': collection_id,
+        'doc_id': ref.id,
+        'updated_at': firestore.SERVER_TIMESTAMP,
+    })
+    writer.delete(ref)
+
+
+class DeltaCache:
+    """In-memory copy of a collection kept current with `updated_at > watermark` queries
+
+    The first sync streams the whole collection. Later syncs read only the documents
+    changed since the newest updated_at seen, plus tombstones for deletions, so a
+    steady-state refresh of an unchanged catalogue costs a single empty query.
+    Documents written before updated_at existed are picked up by the initial load only.
+
+    With a `mirror` (services.event_mirror), a cold start serves the last mirrored copy
+    straight from disk and reconciles with Firestore on a background thread; every
+    change applied afterwards is written through to the mirror.
+    """
+
+    def __init__(self, collection, parse=lambda doc_id, data: data, mirror=None):
+        self.collection = collection
+        self.parse = parse
+        self.mirror = mirror
+        self.docs = {}
+        self.versions = {}
+        self.watermark = None
+        self.last_sync = 0.0
+        self._lock = threading.Lock()
+        self._syncing = False
+        # Set once the first copy (mirror or Firestore) is in memory
+        self._ready = threading.Event()
+
+    def _advance(self, updated_at):
+        if updated_at is not None and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def _apply(self, doc_id, data):
+        updated_at = to_naive_utc(data.get('updated_at'))
+        self.docs[doc_id] = self.parse(doc_id, data)
+        self.versions[doc_id] = updated_at
+        self._advance(updated_at)
+
+    def sync(self, db, min_interval=0.0):
+        """Apply changes since the last sync; returns the number of documents changed"""
+        with self._lock:
+            busy = self._syncing or (self.last_sync and time.monotonic() - self.last_sync < min_interval)
+            if not busy:
+                self._syncing = True
+                cold = self.last_sync == 0.0
+        if busy:
+            # Another session is doing the cold load; wait for it rather than render an empty catalogue
+            self._ready.wait(timeout=READY_TIMEOUT)
+            return 0
+        try:
+            if cold and self._load_mirror():
+                threading.Thread(target=self._reconcile, args=(db,), name=f'vol-link-sync-{self.collection}',
+                                 daemon=True).start()
+                return len(self.docs)
+            changed = self._full_load(db) if cold else self._delta_load(db)
+        except Exception:
+            with self._lock:
+                self._syncing = False
+            self._ready.set()
+            raise
+        with self._lock:
+            self.last_sync = time.monotonic()
+            self._syncing = False
+        self._ready.set()
+        return changed
+
+    def _load_mirror(self):
+        """Serve the on-disk copy at cold start; False when there is none"""
+        if self.mirror is None:
+            return False
+        try:
+            docs, watermark = self.mirror.load(self.collection)
+        except Exception as e:
+            logger.error(f'Error reading {self.collection} mirror: {str(e)}')
+            return False
+        if watermark is None:
+            return False
+        with self._lock:
+            for doc_id, data in docs.items():
+                self._apply(doc_id, data)
+            self.watermark = watermark
+            self.last_sync = time.monotonic()
+        self._ready.set()
+        logger.info(f'Served {len(docs)} {self.collection} from the local mirror; reconciling in background')
+        return True
+
+    def _reconcile(self, db):
+        try:
+            self._delta_load(db)
+        except Exception as e:
+            logger.error(f'Background reconcile of {self.collection} failed: {str(e)}')
+        finally:
+            with self._lock:
+                self.last_sync = time.monotonic()
+                self._syncing = False
+
+    def _full_load(self, db):
+        loaded_at = datetime.utcnow()
+        raw = {snapshot.id: snapshot.to_dict() or {} for snapshot in db.collection(self.collection).stream()}
+        with self._lock:
+            self.docs = {}
+            self.versions = {}
+            for doc_id, data in raw.items():
+                self._apply(doc_id, data)
+            if self.watermark is None:
+                # Nothing stamped yet: watch from (roughly) now so the next sync is a delta too
+                self.watermark = loaded_at - CLOCK_SKEW
+            watermark = self.watermark
+        if self.mirror is not None:
+            self._write_mirror(self.mirror.replace, raw, watermark)
+        logger.info(f'Loaded {len(raw)} {self.collection} into delta cache')
+        return len(raw)
+
+    def _delta_load(self, db):
+        watermark = self.watermark
+        # Network reads happen outside the lock so readers are never blocked on Firestore
+        upserts = {snapshot.id: snapshot.to_dict() or {} for snapshot in (
+            db.collection(self.collection).where('updated_at', '>', watermark).order_by('updated_at').stream())}
+        tombstones = [snapshot.to_dict() or {} for snapshot in (
+            db.collection(TOMBSTONES_COLLECTION)
+            .where('collection', '==', self.collection)
+            .where('updated_at', '>', watermark)
+            .stream())]
+
+        deletes = []
+        with self._lock:
+            for doc_id, data in upserts.items():
+                self._apply(doc_id, data)
+            for tombstone in tombstones:
+                doc_id = tombstone.get('doc_id')
+                deleted_at = to_naive_utc(tombstone.get('updated_at'))
+                version = self.versions.get(doc_id)
+                # A document re-created after its deletion is newer than the tombstone; keep it
+                if doc_id in self.docs and (version is None or deleted_at is None or deleted_at >= version):
+                    del self.docs[doc_id]
+                    self.versions.pop(doc_id, None)
+                    deletes.append(doc_id)
+                self._advance(deleted_at)
+            new_watermark = self.watermark
+        changed = len(upserts) + len(deletes)
+        if changed and self.mirror is not None:
+            self._write_mirror(self.mirror.apply, upserts, deletes, new_watermark)
+        if changed:
+            logger.info(f'Delta sync applied {changed} changes to {self.collection}')
+        return changed
+
+    def _write_mirror(self, method, *args):
+        try:
+            method(self.collection, *args)
+        except Exception as e:
+            # The mirror only speeds up cold starts; never fail a sync because of it
+            logger.error(f'Error writing {self.collection} mirror: {str(e)}')
+
+    def values(self):
+        with self._lock:
+            return list(self.docs.values())
+
+    def get(self, doc_id, default=None):
+        return self.docs.get(doc_id, default)
+
+
+@st.cache_resource
+def _shared_cache(collection):
+    parsers = {'events': Event.from_dict, 'organizations': Organization.from_dict}
+    mirror = event_mirror.get_mirror() if collection in event_mirror.EventMirror.COLLECTIONS else None
+    return DeltaCache(collection, parse=parsers.get(collection, lambda doc_id, data: data), mirror=mirror)
+
+
+def shared_cache(db, collection, min_interval=SYNC_INTERVAL):
+    """Process-wide DeltaCache for `collection`, delta-synced at most every `min_interval` seconds"""
+    cache = _shared_cache(collection)
+    cache.sync(db, min_interval=min_interval)
+    return cache